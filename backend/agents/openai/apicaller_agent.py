@@ -10,9 +10,14 @@ Need for this file (5th-grader explanation):
 then wraps each tool’s name and its response into neat little boxes so
 ReportingAgent can easily read them. Every executed step is its own object,
 not just a string, so nothing gets lost in translation!”
+
+The calls go through the tool engine (backend/tools/engine.py): tools
+configured in backend/tools/registry.yaml are called over pooled HTTP
+clients; the rest are mocked as before.
 """
 
 from ..base import Agent
+from ...tools.engine import get_tool_engine
 
 class APICallerAgent(Agent):
     def run(self, payload: dict) -> dict:
@@ -23,33 +28,29 @@ class APICallerAgent(Agent):
             "tools": List[str],
             "deliverable": str,
             "time_estimate": str,
-            "plan": List[str]
+            "plan": List[str],
+            "depends_on": { step: [ steps it waits for ] }   (optional)
         }
         :return: {
             "status": "success"|"error",
             "details": {
                 "executed": List[ { "tool": str } ],
-                "responses": { tool_name: { ...mock response... } }
+                "responses": { tool_name: { "result": "ok"|"error", "tool": str, ... } }
             }
         }
+        Steps run in order and stop at the first failed tool ("error" status).
+        With "depends_on", independent steps run concurrently (every step not
+        listed there waits for nothing) and only dependents of a failed step
+        are skipped.
         """
         plan = payload.get("plan", [])
-        executed = []
-        responses = {}
-
-        for tool in plan:
-            # Record the tool as an object
-            executed.append({"tool": tool})
+        request = {k: v for k, v in payload.items() if k not in ("plan", "depends_on")}
 
-            # In a real agent, you'd call the tool’s SDK or HTTP API here.
-            # For now, we mock a successful response.
-            responses[tool] = {
-                "result": "ok",
-                "tool":   tool
-            }
+        engine = get_tool_engine()
+        ok, executed, responses = engine.run(engine.execute_plan(plan, request, payload.get("depends_on")))
 
         return {
-            "status": "success",
+            "status": "success" if ok else "error",
             "details": {
                 "executed":  executed,
                 "responses": responses
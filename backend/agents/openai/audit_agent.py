@@ -14,6 +14,7 @@ our safety inspector so the whole pipeline runs cleanly!”
 import os, json
 from jsonschema import validate, ValidationError
 from ..base import Agent
+from backend.observability.metrics import AUDIT_RESULTS
 
 class AuditAgent(Agent):
     def run(self, payload: dict) -> dict:
@@ -37,10 +38,13 @@ class AuditAgent(Agent):
         try:
             schema = json.load(open(schema_path))
         except FileNotFoundError:
+            AUDIT_RESULTS.inc(agent=agent_key, phase=phase, result="fail")
             return {"errors": [f"Schema not found: {agent_key}_{phase}.json"]}
 
         try:
             validate(instance=data, schema=schema)
+            AUDIT_RESULTS.inc(agent=agent_key, phase=phase, result="pass")
             return {"errors": []}
         except ValidationError as e:
+            AUDIT_RESULTS.inc(agent=agent_key, phase=phase, result="fail")
             return {"errors": [e.message]}
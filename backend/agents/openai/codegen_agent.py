@@ -53,7 +53,7 @@ class CodeGenAgent(Agent):
         ]
 
         # Call the LLM
-        response = chat_completion(messages, model="gpt-4o", temperature=0)
+        response = chat_completion(messages, model="gpt-4o", temperature=0, agent="codegen")
         code = response.choices[0].message.content.strip()
 
         # Strip Markdown fences if present
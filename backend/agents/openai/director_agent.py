@@ -3,6 +3,7 @@
 
 import uuid
 import json
+import os
 import time
 from typing import Dict, Any, List
 
@@ -12,10 +13,29 @@ from .audit_agent import AuditAgent
 import logging
 from backend.observability.factory import create_logger, create_tracker
 from backend.observability.interfaces import Logger, Tracker
+from backend.observability.metrics import QUEUE_DEPTH, record_cache_lookup
+from backend.campaigns.repository import get_campaign_repository
+from backend.blueprints.model import Blueprint
+from backend.tools.engine import plan_dependencies
 
 # Initialize the audit agent
 audit_agent = AuditAgent()
 
+# Workflow options. The registry builds the director without a config, so the
+# defaults come from the environment; a campaign payload can override them
+# with "options": {...}.
+# blueprint_format: "nested" legacy levels, or "table" for the compact node table
+# subtasks_from_blueprint: use the blueprint's L4 subitems instead of MicroDecompAgent
+#   for every L3 task whose subitems pass the micro_decomp output audit
+# micro_decomp_batch: decompose the remaining L3 tasks with MicroDecompAgent.run_batch
+# execution_batch: plan every subtask up front with ExecutionAgent.run_batch
+DEFAULT_OPTIONS = {
+    "blueprint_format": os.getenv("DIRECTOR_BLUEPRINT_FORMAT", "nested"),
+    "subtasks_from_blueprint": os.getenv("DIRECTOR_SUBTASKS_FROM_BLUEPRINT", "0") != "0",
+    "micro_decomp_batch": os.getenv("DIRECTOR_MICRO_DECOMP_BATCH", "0") != "0",
+    "execution_batch": os.getenv("DIRECTOR_EXECUTION_BATCH", "0") != "0",
+}
+
 class DirectorAgent(Agent):
     """
     Need for this file (5th-grader explanation):
@@ -28,7 +48,9 @@ class DirectorAgent(Agent):
 
     def __init__(self, config=None):
         """Initialize the Director Agent with observability tools."""
-        super().__init__(config)
+        super().__init__()
+        # DEFAULT_OPTIONS overridden by the config, then by each payload's "options"
+        self.config = {**DEFAULT_OPTIONS, **(config or {})}
         
         # Initialize observability components
         self.agent_name = "director_agent"
@@ -38,6 +60,9 @@ class DirectorAgent(Agent):
         # Legacy logger for backward compatibility
         self.legacy_logger = logging.getLogger("blueprint_maker.director_agent")
 
+        # Campaign records and results shared with the dashboard API
+        self.campaigns = get_campaign_repository()
+
     def _audit_or_raise(self, phase: str, agent_name: str, payload: dict):
         """
         Run the audit for a given phase/agent/payload.
@@ -74,16 +99,43 @@ class DirectorAgent(Agent):
                     self.tracker.record_exception(e)
                 raise
 
+    def _blueprint_subtasks(self, blueprint: Blueprint, task_idx: int):
+        """
+        The L4 subitems of the ``task_idx``-th L3 task as a micro_decomp
+        output, or None when they are missing or fail its audit.
+        """
+        try:
+            subtasks = blueprint.children("L3", task_idx)
+        except (KeyError, IndexError, TypeError, AttributeError):
+            return None
+        if not subtasks:
+            return None
+        res = {"subtasks": subtasks}
+        if audit_agent.run({"phase": "output", "agent": "micro_decomp", "payload": res}).get("errors"):
+            return None
+        return res
+
     def run(self, payload: dict) -> dict:
         """
         Process a campaign through the entire workflow, coordinating all agents.
         
         Args:
-            payload: Input data for the campaign
+            payload: Input data for the campaign, optionally with "options"
+                overriding DEFAULT_OPTIONS for this campaign
             
         Returns:
             Dict containing the complete campaign results
+            
+        Raises:
+            ValueError: If "options" names an unknown option
         """
+        options = payload.get("options") or {}
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown director options: {sorted(unknown)}")
+        options = {**self.config, **options}
+        payload = {k: v for k, v in payload.items() if k != "options"}
+
         # Generate a campaign ID
         campaign_id = str(uuid.uuid4())
         
@@ -96,13 +148,21 @@ class DirectorAgent(Agent):
                 # Track campaign status
                 self.tracker.add_event("campaign_status_change", 
                                      {"campaign_id": campaign_id, "status": "started"})
+                self.campaigns.upsert(
+                    campaign_id,
+                    name=str(payload.get("name") or payload.get("goals") or campaign_id)[:80],
+                    client=str(payload.get("client") or payload.get("client_brief") or "")[:80],
+                    status="active"
+                )
                 
                 # Execute the workflow and return results
-                campaign_package = self._execute_workflow(campaign_id, payload, campaign_span)
+                campaign_package = self._execute_workflow(campaign_id, payload, campaign_span, options)
                 
                 # Update final status
                 self.tracker.add_event("campaign_status_change", 
                                      {"campaign_id": campaign_id, "status": "completed"})
+                self.campaigns.save_results(campaign_id, campaign_package)
+                self.campaigns.set_status(campaign_id, "completed")
                 
                 self.logger.info(f"Successfully completed campaign {campaign_id}")
                 return {"campaign_package": campaign_package}
@@ -111,12 +171,14 @@ class DirectorAgent(Agent):
                 # Update status on error
                 self.tracker.add_event("campaign_status_change", 
                                      {"campaign_id": campaign_id, "status": "failed"})
+                self.campaigns.set_status(campaign_id, "failed")
                 
                 self.logger.error(f"Error processing campaign {campaign_id}: {str(e)}")
                 self.tracker.record_exception(e)
                 raise
     
-    def _execute_workflow(self, campaign_id: str, payload: dict, parent_span) -> Dict[str, Any]:
+    def _execute_workflow(self, campaign_id: str, payload: dict, parent_span,
+                          options: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute the complete workflow by running each agent in sequence.
         
@@ -124,6 +186,7 @@ class DirectorAgent(Agent):
             campaign_id: Unique identifier for the campaign
             payload: Input data for the campaign
             parent_span: Parent span for tracking
+            options: Workflow options (see DEFAULT_OPTIONS)
             
         Returns:
             Dict containing the complete campaign package
@@ -201,6 +264,8 @@ class DirectorAgent(Agent):
                 self._audit_or_raise("input", "decomp", blueprint_input)
                 blueprint = get_agent("decomp").run(blueprint_input)
                 self._audit_or_raise("output", "decomp", blueprint)
+                # Held as a node table; L3 tasks are read through a level view
+                blueprint = Blueprint.from_dict(blueprint)
                 
                 # Record metrics
                 exec_time = time.time() - start_time
@@ -212,12 +277,18 @@ class DirectorAgent(Agent):
                 self.tracker.record_exception(e)
                 raise
 
+        # Serialized once and shared by both packages
+        if options.get("blueprint_format") == "table":
+            blueprint_data = blueprint.to_compact()
+        else:
+            blueprint_data = blueprint.to_dict()
+
         # Create initial campaign package
         campaign_package = {
             "campaign_id": campaign_id,
             "campaign_spec": spec,
             "strategy": strategy,
-            "blueprint": blueprint
+            "blueprint": blueprint_data
         }
 
         # 4. Micro-Decomposition Agent
@@ -228,41 +299,73 @@ class DirectorAgent(Agent):
             
             micro = get_agent("micro_decomp")
             micro_results = []
+            from_blueprint = bool(options.get("subtasks_from_blueprint"))
+            reused = 0
 
             try:
                 # Grab every L3 task from the blueprint
-                tasks = blueprint.get("levels", {}).get("L3", [])
+                tasks = blueprint.level("L3")
                 if not tasks:
                     error_msg = "No tasks (L3) found in blueprint"
                     self.logger.error(error_msg)
                     raise RuntimeError(error_msg)
                 
                 span.add_attribute("task_count", len(tasks))
-                
-                for task_idx, task in enumerate(tasks):
+
+                # Build the exact payloads our MicroDecompAgent schema expects
+                task_inputs = [
+                    {
+                        "name":           task.get("name"),
+                        "role":           task.get("role"),
+                        "tools":          task.get("tools"),
+                        "deliverable":    task.get("deliverable"),
+                        "time_estimate":  task.get("time_estimate")
+                    }
+                    for task in tasks
+                ]
+                for task_input in task_inputs:
+                    self._audit_or_raise("input", "micro_decomp", task_input)
+
+                # Usable blueprint subitems first; the rest from the LLM, batched or one by one
+                blueprint_res = {}
+                if from_blueprint:
+                    for task_idx in range(len(tasks)):
+                        res = self._blueprint_subtasks(blueprint, task_idx)
+                        record_cache_lookup("blueprint_subtasks", res is not None)
+                        if res is not None:
+                            blueprint_res[task_idx] = res
+                batched_res = {}
+                pending = [task_idx for task_idx in range(len(tasks)) if task_idx not in blueprint_res]
+                if options.get("micro_decomp_batch") and pending:
+                    with self.tracker.start_span(f"micro_decomp_batch.{campaign_id}",
+                                             {"campaign_id": campaign_id, "task_count": len(pending)}):
+                        QUEUE_DEPTH.set(len(pending), queue="micro_decomp")
+                        batched_res = dict(zip(pending, micro.run_batch([task_inputs[i] for i in pending])))
+
+                for task_idx, task_input in enumerate(task_inputs):
+                    QUEUE_DEPTH.set(len(tasks) - task_idx, queue="micro_decomp")
                     # Create child span for each task
                     with self.tracker.start_span(f"micro_decomp_task.{task_idx}.{campaign_id}", 
                                              {"campaign_id": campaign_id, "task_idx": task_idx}) as task_span:
-                        # Build the exact payload our MicroDecompAgent schema expects
-                        task_input = {
-                            "name":           task.get("name"),
-                            "role":           task.get("role"),
-                            "tools":          task.get("tools"),
-                            "deliverable":    task.get("deliverable"),
-                            "time_estimate":  task.get("time_estimate")
-                        }
-                        
-                        task_span.add_attribute("task_name", task.get("name", "unnamed"))
-                        
-                        self._audit_or_raise("input", "micro_decomp", task_input)
-                        res = micro.run(task_input)
+                        task_span.add_attribute("task_name", task_input.get("name") or "unnamed")
+
+                        res = blueprint_res.get(task_idx)
+                        if from_blueprint:
+                            task_span.add_attribute("subtasks_from_blueprint", res is not None)
+                        if res is not None:
+                            reused += 1
+                        else:
+                            # No usable blueprint subitems: ask the LLM (unless the batch already did)
+                            res = batched_res.get(task_idx) or micro.run(task_input)
+                            self._audit_or_raise("output", "micro_decomp", res)
                         subtasks = res.get("subtasks", [])
-                        self._audit_or_raise("output", "micro_decomp", res)
                         
                         # Collect for the campaign package
                         micro_results.append({**task_input, "subtasks": subtasks})
                         task_span.add_attribute("subtask_count", len(subtasks))
                 
+                QUEUE_DEPTH.set(0, queue="micro_decomp")
+                
                 # Add micro decomposition results to campaign package
                 campaign_package["micro_decomposition"] = micro_results
                 
@@ -271,6 +374,7 @@ class DirectorAgent(Agent):
                 span.add_attribute("execution_time", exec_time)
                 span.add_attribute("success", True)
                 span.add_attribute("total_subtasks", sum(len(task.get("subtasks", [])) for task in micro_results))
+                span.add_attribute("tasks_from_blueprint", reused)
                 self.logger.info(f"Micro decomposition completed for campaign {campaign_id} in {exec_time:.2f}s")
             except Exception as e:
                 span.add_attribute("success", False)
@@ -290,10 +394,27 @@ class DirectorAgent(Agent):
             try:
                 total_subtasks = sum(len(task.get("subtasks", [])) for task in campaign_package["micro_decomposition"])
                 exec_phase_span.add_attribute("total_subtasks", total_subtasks)
-                
+
+                # Optionally plan every subtask up front with a few batched calls
+                planned = {}
+                if options.get("execution_batch"):
+                    batch_inputs = {}
+                    for micro_idx, micro_entry in enumerate(campaign_package["micro_decomposition"]):
+                        for subtask_idx, subtask in enumerate(micro_entry.get("subtasks", [])):
+                            batch_input = {key: subtask[key] for key in
+                                           ("name", "role", "tools", "deliverable", "time_estimate")}
+                            self._audit_or_raise("input", "execute", batch_input)
+                            batch_inputs[f"{micro_idx}.{subtask_idx}"] = batch_input
+                    with self.tracker.start_span(f"execute_batch.{campaign_id}",
+                                             {"campaign_id": campaign_id, "subtask_count": len(batch_inputs)}):
+                        planned = exec_agent.run_batch(batch_inputs)
+
                 # Loop over each L3 task's subtasks
+                remaining = total_subtasks
                 for micro_idx, micro_entry in enumerate(campaign_package["micro_decomposition"]):
                     for subtask_idx, subtask in enumerate(micro_entry.get("subtasks", [])):
+                        QUEUE_DEPTH.set(remaining, queue="execution")
+                        remaining -= 1
                         # Create span for this subtask execution
                         with self.tracker.start_span(f"subtask.{micro_idx}.{subtask_idx}.{campaign_id}", 
                                                  {"campaign_id": campaign_id, 
@@ -316,7 +437,10 @@ class DirectorAgent(Agent):
                                     "time_estimate": subtask["time_estimate"]
                                 }
                                 self._audit_or_raise("input", "execute", exec_input)
-                                exec_res = exec_agent.run(exec_input)
+                                # Failed batch plans are planned again alone, like without batching
+                                exec_res = planned.get(f"{micro_idx}.{subtask_idx}")
+                                if not exec_res or exec_res.get("status") != "success":
+                                    exec_res = exec_agent.run(exec_input)
                                 self._audit_or_raise("output", "execute", exec_res)
                                 execute_span.add_attribute("steps_count", len(exec_res["details"]["steps_executed"]))
                             
@@ -326,6 +450,14 @@ class DirectorAgent(Agent):
                                                       "subtask": subtask_name}) as api_span:
                                 # Build & audit APICallerAgent input
                                 api_input = {**exec_input, "plan": exec_res["details"]["steps_executed"]}
+                                depends_on = exec_res["details"].get("depends_on")
+                                if depends_on:
+                                    try:
+                                        plan_dependencies(api_input["plan"], depends_on)
+                                        api_input["depends_on"] = depends_on
+                                    except ValueError as e:
+                                        # Unusable annotations: run the plan step by step
+                                        self.logger.error(f"Ignoring depends_on of {subtask_name}: {e}")
                                 
                                 self._audit_or_raise("input", "apicaller", api_input)
                                 api_res = api_agent.run(api_input)
@@ -352,6 +484,8 @@ class DirectorAgent(Agent):
                                 "api":     api_res
                             })
                 
+                QUEUE_DEPTH.set(0, queue="execution")
+                
                 # Record metrics for full execution phase
                 exec_time = time.time() - start_time
                 exec_phase_span.add_attribute("execution_time", exec_time)
@@ -410,7 +544,7 @@ class DirectorAgent(Agent):
             "campaign_id":      campaign_id,
             "spec":             spec,
             "strategy":         strategy,
-            "blueprint":        blueprint,
+            "blueprint":        blueprint_data,
             "executions":       micro_results,
             "real_executions":  execution_results,
             "report":           report_output
@@ -11,13 +11,40 @@ API, or explains exactly which API call to make with what parameters.
 Then it reports back ‘success’ and any IDs or URLs it created.”
 """
 
-import re, json
+import os, re, json, logging
 from ..base import Agent
+from .audit_agent import AuditAgent
+from ...planning.memo import get_plan_memo
 from ...utils.openai_client import chat_completion
+from ...utils.batching import TokenBudget, estimate_tokens
+
+logger = logging.getLogger("blueprint_maker.execution")
+
+# Plans are a few tool names each, so dozens fit in one prompt
+BATCH_TOKEN_BUDGET = int(os.getenv("EXECUTION_BATCH_TOKENS", "8000"))
+BATCH_MAX_SUBTASKS = int(os.getenv("EXECUTION_BATCH_MAX_SUBTASKS", "40"))
+OUTPUT_TOKENS_PER_SUBTASK = 40
+
+_budget = TokenBudget(BATCH_TOKEN_BUDGET, OUTPUT_TOKENS_PER_SUBTASK, BATCH_MAX_SUBTASKS)
+_audit = AuditAgent()
+
+# Answer repeated (role, tools) subtasks from plans learned from audited answers
+USE_PLAN_MEMO = os.getenv("EXECUTION_PLAN_MEMO", "1") != "0"
+
+def _strip_fences(content: str) -> str:
+    content = re.sub(r"^```(?:json)?\s*", "", content.strip())
+    return re.sub(r"\s*```$", "", content)
 
 class ExecutionAgent(Agent):
+    def __init__(self):
+        self.memo = get_plan_memo() if USE_PLAN_MEMO else None
+
     def run(self, payload: dict) -> dict:
         """
+        Plan one subtask: from the plan memo when it is confident about the
+        subtask's (role, tools), otherwise with the LLM (and the audited
+        answer is learned).
+
         :param payload: {
             "name": str,
             "role": str,
@@ -28,16 +55,26 @@ class ExecutionAgent(Agent):
         :return: {
             "status": "success"|"error",
             "details": {
-                "steps_executed": [ <tool names> ]
+                "steps_executed": [ <tool names> ],
+                "depends_on": { step: [ steps it waits for ] }   (optional)
             }
         }
         """
+        memoized = self._from_memo(payload)
+        if memoized is not None:
+            return memoized
+        return self._learn(payload, self._plan(payload))
+
+    def _plan(self, payload: dict) -> dict:
         prompt = (
             "You are ExecutionAgent for an AI-native ad agency.\n"
             "Your ONLY job is to list which tools you would invoke to complete this subtask.\n"
             "Return a JSON object with exactly two keys:\n"
             "  \"status\": \"success\" or \"error\",\n"
             "  \"details\": { \"steps_executed\": [ <tool names as strings> ] }\n"
+            "If some steps do not need each other's results, \"details\" may also have\n"
+            "  \"depends_on\": { <step>: [ <steps it must wait for> ] }\n"
+            "so they can run at the same time; leave it out to run the steps in order.\n"
             "Do NOT include any other fields, nested objects, comments, or example code.\n\n"
             "Subtask:\n"
             f"{json.dumps(payload, indent=2)}\n"
@@ -48,12 +85,10 @@ class ExecutionAgent(Agent):
             {"role": "user",   "content": prompt}
         ]
 
-        resp = chat_completion(messages, model="gpt-4o", temperature=0)
-        content = resp.choices[0].message.content.strip()
+        resp = chat_completion(messages, model="gpt-4o", temperature=0, agent="execute")
 
         # Strip markdown fences
-        content = re.sub(r"^```(?:json)?\s*", "", content)
-        content = re.sub(r"\s*```$", "", content)
+        content = _strip_fences(resp.choices[0].message.content)
 
         try:
             return json.loads(content)
@@ -67,6 +102,106 @@ class ExecutionAgent(Agent):
                 }
             }
 
+    def run_batch(self, subtasks: dict) -> dict:
+        """
+        Plan many subtasks with few calls, packed into prompts sized by a
+        token budget.
+
+        :param subtasks: { <subtask id>: <run payload>, ... }
+        :return: { <subtask id>: <run result>, ... } for every id. A subtask
+            the batch answer leaves out or garbles is planned alone with
+            ``run``; if that raises too, only its result is an error
+            (``{"status": "error", "details": {"steps_executed": [], "error": ...}}``),
+            so callers should reuse only "success" results.
+        """
+        ids = list(subtasks)
+        results = {}
+        for sid in ids:
+            memoized = self._from_memo(subtasks[sid])
+            if memoized is not None:
+                results[sid] = memoized
+        pending = [sid for sid in ids if sid not in results]
+
+        for batch in _budget.chunks([subtasks[i] for i in pending], cost=estimate_tokens):
+            batch_ids = [pending[i] for i in batch]
+            if len(batch_ids) == 1:
+                continue
+            try:
+                plans = self._plan_batch({sid: subtasks[sid] for sid in batch_ids})
+            except Exception as e:
+                logger.warning("Execution planning batch of %d subtasks failed, planning them alone: %s",
+                               len(batch_ids), e)
+                continue
+            for sid in batch_ids:
+                steps, depends_on = plans.get(sid), None
+                if isinstance(steps, dict):
+                    steps, depends_on = steps.get("steps_executed"), steps.get("depends_on")
+                if isinstance(steps, list) and all(isinstance(t, str) for t in steps):
+                    details = {"steps_executed": steps}
+                    if isinstance(depends_on, dict) and depends_on:
+                        details["depends_on"] = depends_on
+                    results[sid] = self._learn(subtasks[sid], {"status": "success", "details": details})
+
+        for sid in ids:
+            if sid in results:
+                continue
+            try:
+                results[sid] = self._learn(subtasks[sid], self._plan(subtasks[sid]))
+            except Exception as e:
+                logger.error("Execution planning failed for subtask %s: %s", sid, e)
+                results[sid] = {"status": "error", "details": {"steps_executed": [], "error": str(e)}}
+        return {sid: results[sid] for sid in ids}
+
+    # ---------- plan memo ----------
+
+    def _from_memo(self, payload: dict):
+        """A memoized plan (with its ``depends_on``, if any) as a ``run`` result, or None on a miss."""
+        if self.memo is None:
+            return None
+        details = self.memo.lookup_details(payload.get("role"), payload.get("tools"))
+        if details is None:
+            return None
+        if self.memo.should_check():
+            # Spot-check the memo against the LLM for the disagreement rate
+            try:
+                checked = self._learn(payload, self._plan(payload))
+                if checked.get("status") == "success":
+                    self.memo.compare(payload.get("tools"), details["steps_executed"],
+                                      checked["details"]["steps_executed"], details.get("depends_on"),
+                                      checked["details"].get("depends_on"))
+            except Exception as e:
+                logger.warning("Plan memo spot check failed: %s", e)
+        return {"status": "success", "details": details}
+
+    def _learn(self, payload: dict, result: dict) -> dict:
+        """Teach the memo a successful answer that passes the output audit; returns ``result``."""
+        if (self.memo is not None and isinstance(result, dict) and result.get("status") == "success"
+                and not _audit.run({"phase": "output", "agent": "execute", "payload": result}).get("errors")):
+            self.memo.learn(payload.get("role"), payload.get("tools"), result["details"]["steps_executed"],
+                            result["details"].get("depends_on"))
+        return result
+
+    def _plan_batch(self, subtasks: dict) -> dict:
+        prompt = (
+            "You are ExecutionAgent for an AI-native ad agency.\n"
+            "Your ONLY job is to list which tools you would invoke to complete each subtask below.\n"
+            "Return a JSON object mapping every subtask id to an array of tool names (strings),\n"
+            "or to {\"steps_executed\": [...], \"depends_on\": { <step>: [ <steps it must wait for> ] }}\n"
+            "when some of its steps can run at the same time.\n"
+            "Do NOT include any other fields, nested objects, comments, or example code.\n\n"
+            "Subtasks:\n"
+            f"{json.dumps(subtasks, indent=2)}\n"
+        )
+        messages = [
+            {"role": "system", "content": "You are a precise execution planner."},
+            {"role": "user",   "content": prompt}
+        ]
+        resp = chat_completion(messages, model="gpt-4o", temperature=0, agent="execute")
+        usage = getattr(resp, "usage", None)
+        _budget.observe(len(subtasks), getattr(usage, "completion_tokens", 0) or 0)
+        data = json.loads(_strip_fences(resp.choices[0].message.content))
+        return data if isinstance(data, dict) else {}
+
 # Self-test
 if __name__ == "__main__":
     agent = ExecutionAgent()
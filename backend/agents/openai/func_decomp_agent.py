@@ -12,27 +12,155 @@ the tables all know exactly what goes where—no steps get hidden under the wron
 heading!”
 """
 
+import os
 import re
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from backend.utils.openai_client import chat_completion
 from backend.agents.base import Agent
+from backend.blueprints.model import Blueprint, levels_from_tree
+from backend.blueprints.lazy import get_lazy_blueprints
+from backend.blueprints.store import get_blueprint_store, key_id, normalize_key
+from backend.blueprints.taxonomy import get_taxonomy_index
 
 logger = logging.getLogger("blueprint_maker.func_decomp")
 
+# Bump whenever the prompt or post-processing changes, so stored blueprints
+# made by the old prompt are no longer served
+PROMPT_VERSION = "1"
+
+# "single": one call for all five levels. "hierarchical": L0–L2 first, then
+# each L2 activity expanded into L3/L4 concurrently. "lazy" (run() only):
+# L0–L1 now, deeper levels one node at a time (see backend/blueprints/lazy.py).
+MODES = ("single", "hierarchical")
+DEFAULT_MODE = os.getenv("FUNC_DECOMP_MODE", "single")
+
+# Concurrent activity expansions, and attempts per activity on malformed JSON
+BRANCH_WORKERS = int(os.getenv("FUNC_DECOMP_BRANCH_WORKERS", "8"))
+BRANCH_ATTEMPTS = 2
+
+# Take L1/L2 from the offline framework taxonomy when the function is in it
+# (the LLM then only fills in roles, tools, deliverables and time estimates)
+USE_TAXONOMY = os.getenv("FUNC_DECOMP_TAXONOMY", "1") != "0"
+
+ITEM_FIELDS_TEXT = "name, role, tools (array of strings), deliverable, time_estimate"
+LEVEL_NAMES = ("Function", "Process", "Activity", "Task", "Subtask")
+
 class FuncArchAgent(Agent):
+    def __init__(self):
+        self.store = get_blueprint_store()
+        self.taxonomy = get_taxonomy_index()
+
     def run(self, payload: dict) -> dict:
         fn = payload["function_name"]
         fw = payload["framework"]
-        return self.decompose(fn, fw)
+        # "taxonomy": false always asks the LLM for the whole structure
+        use_taxonomy = payload.get("taxonomy")
+        # "refresh": true skips the blueprint store and regenerates
+        if payload.get("mode") == "lazy":
+            return self.lazy(fn, fw, node_id=payload.get("expand"), use_taxonomy=use_taxonomy,
+                             refresh=bool(payload.get("refresh")))
+        return self.decompose(fn, fw, refresh=bool(payload.get("refresh")), mode=payload.get("mode"),
+                              use_taxonomy=use_taxonomy)
 
     def decompose(
         self,
         function_name: str,
         framework: str = "APQC",
-        context: str = "AI-native ad agency"
+        context: str = "AI-native ad agency",
+        refresh: bool = False,
+        mode: str = None,
+        use_taxonomy: bool = None
     ) -> dict:
+        """L0–L4 blueprint for a function in the legacy ``{"levels": ...}`` shape."""
+        return self.decompose_blueprint(function_name, framework, context, refresh, mode, use_taxonomy).to_dict()
+
+    def decompose_blueprint(
+        self,
+        function_name: str,
+        framework: str = "APQC",
+        context: str = "AI-native ad agency",
+        refresh: bool = False,
+        mode: str = None,
+        use_taxonomy: bool = None
+    ) -> Blueprint:
+        """
+        L0–L4 blueprint as a node table, served from the blueprint store when
+        one was already generated for the same function, framework, context
+        and prompt version. Functions found in the framework taxonomy get
+        their L1/L2 from it.
+
+        Raises:
+            ValueError: On an unknown mode
+        """
+        mode = mode or DEFAULT_MODE
+        if mode not in MODES:
+            raise ValueError(f"Unknown decomposition mode: {mode}")
+        skeleton = self.skeleton(function_name, framework, use_taxonomy)
+        # Each mode (and taxonomy version) has its own prompts, so its own store entries
+        version = PROMPT_VERSION if mode == "single" else f"{PROMPT_VERSION}-{mode}"
+        version += self._taxonomy_suffix(framework, skeleton)
+        key = normalize_key(function_name, framework, context, version)
+        stored = self.store.get(key)
+        if stored is not None and _incomplete(stored["blueprint"]):
+            # A hierarchical blueprint with failed branches is served once, then regenerated
+            refresh = True
+        entry = self.store.get_or_generate(
+            key, lambda: self.generate(function_name, framework, context, mode, skeleton).to_compact(),
+            refresh=refresh
+        )
+        return Blueprint.from_compact(entry["blueprint"])
+
+    def lazy(
+        self,
+        function_name: str,
+        framework: str = "APQC",
+        context: str = "AI-native ad agency",
+        node_id: str = None,
+        use_taxonomy: bool = None,
+        refresh: bool = False
+    ) -> dict:
+        """
+        Blueprint served on demand: without ``node_id`` the L0–L1 outline
+        ``{"blueprint_id", "levels": {"L0", "L1"}}``; with it, that node's
+        subitems ``{"blueprint_id", "node_id", "subitems"}``. Expansions are
+        cached per node id and likely branches are prefetched. ``refresh``
+        (without ``node_id``) regenerates the outline and drops its expansions.
+
+        Raises:
+            KeyError: If ``node_id`` is not a node of this blueprint
+        """
+        service = get_lazy_blueprints(self._lazy_outline, self._lazy_expand, store=self.store)
+        skeleton = self.skeleton(function_name, framework, use_taxonomy)
+        version = f"{PROMPT_VERSION}-lazy" + self._taxonomy_suffix(framework, skeleton)
+        key = normalize_key(function_name, framework, context, version)
+        if node_id is None:
+            request = {"function_name": function_name, "framework": framework, "context": context,
+                       "taxonomy": skeleton is not None}
+            return service.open(key, request, refresh=refresh)
+        subitems = service.expand(key, str(node_id))
+        return {"blueprint_id": key_id(key), "node_id": str(node_id), "subitems": subitems}
+
+    def generate(
+        self,
+        function_name: str,
+        framework: str = "APQC",
+        context: str = "AI-native ad agency",
+        mode: str = "single",
+        skeleton: dict = None
+    ) -> Blueprint:
+        """
+        Generate a blueprint with the LLM; ``skeleton`` (from ``skeleton()``)
+        fixes L0–L2 so only their details and the L3/L4 levels are asked for.
+        """
+        if mode == "hierarchical":
+            return self._generate_hierarchical(function_name, framework, context, skeleton)
+        if skeleton is not None:
+            root = self.describe(function_name, framework, context, [skeleton], 0, with_tasks=True)[0]
+            return Blueprint.from_dict(levels_from_tree(root))
+
         # 1) Build the prompt
         prompt = (
             f"Use the {framework} process classification framework. "
@@ -47,50 +175,249 @@ class FuncArchAgent(Agent):
             "- \"L4\": an array of each subtask (from every L3[].subitems), each with fields name, role, tools, deliverable, time_estimate (no subitems).\n\n"
             "Do not include any other keys or explanatory text—just the JSON."
         )
+
+        # 2–4) Call the LLM and parse its JSON
+        data = self._ask_json(prompt)
+
+        # 5) Normalize (every level, tools and subitems become lists) into a node table
+        return Blueprint.from_dict(data)
+
+    def _ask_json(self, prompt: str) -> dict:
         messages = [
             {"role": "system", "content": "You are an expert process architect."},
             {"role": "user",   "content": prompt},
         ]
 
-        # 2) Call the LLM
-        resp = chat_completion(messages, model="gpt-4o", temperature=0)
+        # Call the LLM
+        resp = chat_completion(messages, model="gpt-4o", temperature=0, agent="decomp")
 
-        # 3) Strip markdown fences
+        # Strip markdown fences
         content = resp.choices[0].message.content.strip()
         content = re.sub(r"^```(?:json)?\s*", "", content)
         content = re.sub(r"\s*```$", "", content)
 
-        # 4) Parse JSON
+        # Parse JSON
         try:
             data = json.loads(content)
         except json.JSONDecodeError as e:
             logger.error("JSON parse error: %s\nRaw content:\n%s", e, content)
             raise RuntimeError(f"Failed to parse JSON:\n{e}\n\nRaw content:\n{content}")
+        # Every prompt asks for an object; an array or scalar is as malformed as bad JSON
+        if not isinstance(data, dict):
+            logger.error("Expected a JSON object, got %s:\n%s", type(data).__name__, content)
+            raise RuntimeError(f"Expected a JSON object, got {type(data).__name__}:\n{content}")
+        return data
+
+    # ---------- hierarchical mode ----------
+
+    def _generate_hierarchical(self, function_name: str, framework: str, context: str,
+                               skeleton: dict = None) -> Blueprint:
+        """
+        L0–L2 in one call, then every L2 activity expanded into L3 tasks and
+        L4 subtasks by its own smaller call, all activities concurrently.
 
-        # 5) Normalize: ensure each L0–L4 is a list
-        levels = data.get("levels", {})
-        for lvl in ["L0", "L1", "L2", "L3", "L4"]:
-            if lvl in levels and not isinstance(levels[lvl], list):
-                levels[lvl] = [levels[lvl]]
-        data["levels"] = levels
-
-        # 6) Normalize each item's tools and subitems recursively
-        def normalize_item(item: dict):
-            if "tools" in item and not isinstance(item["tools"], list):
-                item["tools"] = [item["tools"]]
-            # Subitems might be missing or a single object
-            subs = item.get("subitems")
-            if subs is None:
-                item["subitems"] = []
+        An activity whose expansion fails keeps no subitems and an
+        ``expansion_error``; the blueprint then lists it under ``incomplete``
+        (and is regenerated on its next request). Only if every activity
+        fails is the error raised.
+        """
+        if skeleton is not None:
+            root = self.describe(function_name, framework, context, [skeleton], 0)[0]
+        else:
+            root = self.outline(function_name, framework, context, depth=2)
+        branches = [
+            (process, activity)
+            for process in _items(root.get("subitems"))
+            for activity in _items(process.get("subitems"))
+        ]
+
+        workers = max(1, min(BRANCH_WORKERS, len(branches)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decomp-branch") as pool:
+            futures = [
+                pool.submit(self.expand_item, function_name, framework, context, list(branch), "L2")
+                for branch in branches
+            ]
+        failed = []
+        for (_, activity), future in zip(branches, futures):
+            error = future.exception()
+            if error is None:
+                activity["subitems"] = future.result()
             else:
-                if not isinstance(subs, list):
-                    subs = [subs]
-                item["subitems"] = subs
-                for child in item["subitems"]:
-                    normalize_item(child)
+                logger.warning("Expansion of activity %r failed: %s", activity.get("name"), error)
+                activity["subitems"] = []
+                activity["expansion_error"] = str(error)
+                failed.append(activity.get("name"))
+        if failed and len(failed) == len(branches):
+            raise RuntimeError(f"Every activity expansion failed; first error: {futures[0].exception()}")
 
-        for lvl in ["L0", "L1", "L2", "L3", "L4"]:
-            for itm in data["levels"].get(lvl, []):
-                normalize_item(itm)
+        # Same flat-and-nested "levels" layout as a single-call answer
+        data = levels_from_tree(root)
+        if failed:
+            data["incomplete"] = failed
+        return Blueprint.from_dict(data)
 
-        return data
+    def outline(self, function_name: str, framework: str, context: str, depth: int = 2) -> dict:
+        """The L0 item with its subitems down to level ``depth`` (1: processes, 2: activities)."""
+        names = [f"L{k} ({LEVEL_NAMES[k]})" for k in range(depth + 1)]
+        nesting = "Each process has the same fields and subitems (its activities); activities" if depth == 2 \
+            else "Processes"
+        outline = self._ask_json(
+            f"Use the {framework} process classification framework. "
+            f"Decompose the function '{function_name}' in the context of a {context} "
+            f"into {len(names)} levels: {', '.join(names)}.\n\n"
+            "Return ONLY valid JSON with a top-level key \"function\": one object with fields "
+            f"{ITEM_FIELDS_TEXT}, and subitems (its processes). {nesting} have the same fields and no subitems.\n\n"
+            "Do not include any other keys or explanatory text—just the JSON."
+        )
+        return outline.get("function") if isinstance(outline.get("function"), dict) else outline
+
+    def expand_item(self, function_name: str, framework: str, context: str,
+                    lineage: list, level: str) -> list:
+        """
+        Subitems of one item: ``lineage`` is its chain of ancestors below L0
+        followed by the item itself, which sits at ``level`` (L1–L3). An L2
+        activity is expanded into L3 tasks together with their L4 subtasks.
+        """
+        depth = int(level[1])
+        item = {k: v for k, v in lineage[-1].items() if k != "subitems"}
+        path = "".join(f", {LEVEL_NAMES[k + 1].lower()} '{a.get('name')}'" for k, a in enumerate(lineage[:-1]))
+        child = f"L{depth + 1} {LEVEL_NAMES[depth + 1].lower()}s"
+        if depth == 2:
+            target = f"{child} and L4 subtasks"
+            shape = "and subitems (its subtasks, with the same fields and no subitems)"
+        else:
+            target, shape = child, "and no subitems"
+        prompt = (
+            f"Use the {framework} process classification framework. Within the function "
+            f"'{function_name}' ({context}){path}, decompose this "
+            f"{level} {LEVEL_NAMES[depth].lower()} into {target}:\n{json.dumps(item)}\n\n"
+            "Return ONLY valid JSON with a top-level key \"items\": an array with fields "
+            f"{ITEM_FIELDS_TEXT}, {shape}.\n\n"
+            "Do not include any other keys or explanatory text—just the JSON."
+        )
+        for attempt in range(1, BRANCH_ATTEMPTS + 1):
+            try:
+                return _items(self._ask_json(prompt).get("items"))
+            except RuntimeError:
+                if attempt == BRANCH_ATTEMPTS:
+                    raise
+                logger.warning("Retrying expansion of %r (attempt %d)", item.get("name"), attempt + 1)
+
+    # ---------- taxonomy grounding ----------
+
+    def skeleton(self, function_name: str, framework: str, use_taxonomy: bool = None) -> dict:
+        """
+        L0 with its L1 processes and L2 activities (names only) from the
+        framework taxonomy, or None when the function is not in it.
+        """
+        if not (USE_TAXONOMY if use_taxonomy is None else use_taxonomy):
+            return None
+        function = self.taxonomy.lookup(framework, function_name)
+        if function is None:
+            return None
+        return {
+            "name": function["name"],
+            "subitems": [
+                {"name": process["name"], "subitems": [{"name": a["name"]} for a in process.get("children", [])]}
+                for process in function.get("children", [])
+            ],
+        }
+
+    def _taxonomy_suffix(self, framework: str, skeleton: dict) -> str:
+        return "" if skeleton is None else f"+taxonomy-{self.taxonomy.version(framework)}"
+
+    def describe(self, function_name: str, framework: str, context: str,
+                 items: list, level: int, with_tasks: bool = False) -> list:
+        """
+        Fill in role, tools, deliverable and time_estimate of fixed items
+        (and their subitems), which sit at ``level``. With ``with_tasks``
+        every L2 activity also gets its L3 tasks and L4 subtasks from the
+        same call. Items are changed in place and returned.
+        """
+        numbered = []
+
+        def number(items, level, prefix):
+            for i, item in enumerate(items, 1):
+                item_id = f"{prefix}{i}"
+                numbered.append((item_id, level, item))
+                number(_items(item.get("subitems")), level + 1, f"{item_id}.")
+        number(items, level, "")
+
+        lines = "\n".join(
+            f"{'  ' * (lvl - level)}{item_id} L{lvl} {LEVEL_NAMES[lvl]}: {item['name']}"
+            for item_id, lvl, item in numbered
+        )
+        tasks_text = (
+            ", and a key \"tasks\": an object mapping the id of every L2 activity to an array of its "
+            f"L3 tasks with fields {ITEM_FIELDS_TEXT}, and subitems (its L4 subtasks, with the same "
+            "fields and no subitems)"
+        ) if with_tasks else ""
+        prompt = (
+            f"These {framework} process classification framework items make up the function "
+            f"'{function_name}'. Keep them exactly as listed:\n{lines}\n\n"
+            f"For the context of a {context}, return ONLY valid JSON with a top-level key \"details\": "
+            "an object mapping every id to its role, tools (array of strings), deliverable and "
+            f"time_estimate{tasks_text}.\n\n"
+            "Do not include any other keys or explanatory text—just the JSON."
+        )
+        for attempt in range(1, BRANCH_ATTEMPTS + 1):
+            try:
+                answer = self._ask_json(prompt)
+                break
+            except RuntimeError:
+                if attempt == BRANCH_ATTEMPTS:
+                    raise
+                logger.warning("Retrying taxonomy details for %r (attempt %d)", function_name, attempt + 1)
+
+        details = answer.get("details") if isinstance(answer.get("details"), dict) else {}
+        tasks = answer.get("tasks") if isinstance(answer.get("tasks"), dict) else {}
+        missing = []
+        for item_id, lvl, item in numbered:
+            found = details.get(item_id) if isinstance(details.get(item_id), dict) else {}
+            if not found:
+                missing.append(item_id)
+            tools = found.get("tools") or []
+            item.update({
+                "role": str(found.get("role") or ""),
+                "tools": [str(t) for t in (tools if isinstance(tools, list) else [tools])],
+                "deliverable": str(found.get("deliverable") or ""),
+                "time_estimate": str(found.get("time_estimate") or ""),
+            })
+            if with_tasks and lvl == 2:
+                item["subitems"] = _items(tasks.get(item_id))
+                if not item["subitems"]:
+                    # Answer skipped this activity: expand it on its own
+                    lineage = [i for i_id, _, i in numbered if item_id.startswith(f"{i_id}.")][1:] + [item]
+                    item["subitems"] = self.expand_item(function_name, framework, context, lineage, "L2")
+        if missing:
+            logger.warning("No taxonomy details for %d item(s) of %r: %s", len(missing), function_name, missing)
+        return items
+
+    def _lazy_outline(self, request: dict) -> dict:
+        fn, fw, ctx = request["function_name"], request["framework"], request["context"]
+        skeleton = self.skeleton(fn, fw, request.get("taxonomy"))
+        if skeleton is None:
+            return self.outline(fn, fw, ctx, depth=1)
+        processes = [{"name": p["name"]} for p in skeleton["subitems"]]
+        return self.describe(fn, fw, ctx, [{"name": skeleton["name"], "subitems": processes}], 0)[0]
+
+    def _lazy_expand(self, request: dict, lineage: list, level: str) -> list:
+        fn, fw, ctx = request["function_name"], request["framework"], request["context"]
+        skeleton = self.skeleton(fn, fw, request.get("taxonomy")) if level == "L1" else None
+        if skeleton is not None:
+            for process in skeleton["subitems"]:
+                if process["name"] == lineage[-1].get("name"):
+                    return self.describe(fn, fw, ctx, process["subitems"], 2)
+        return self.expand_item(fn, fw, ctx, lineage, level)
+
+
+def _incomplete(compact: dict) -> list:
+    """Activities whose expansion failed in a stored (``to_compact``) blueprint."""
+    return (compact.get("extra") or compact.get("raw") or {}).get("incomplete") or []
+
+
+def _items(value) -> list:
+    """Subitems as a list of objects (the LLM sometimes returns one object or null)."""
+    if value is None:
+        return []
+    return [v for v in (value if isinstance(value, list) else [value]) if isinstance(v, dict)]
@@ -62,7 +62,7 @@ class IntakeAgent(Agent):
         ]
 
         # Call OpenAI
-        resp = chat_completion(messages, model="gpt-4o", temperature=0)
+        resp = chat_completion(messages, model="gpt-4o", temperature=0, agent="intake")
         content = resp.choices[0].message.content.strip()
 
         # Strip code fences if any
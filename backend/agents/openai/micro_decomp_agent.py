@@ -11,9 +11,26 @@ chops it into 3–6 bite-sized steps—like ‘Write outline,’ ‘Add KPIs,’
 second, third, and so on.”
 """
 
-import re, json
+import os, re, json, logging
 from ..base import Agent
+from .audit_agent import AuditAgent
 from ...utils.openai_client import chat_completion
+from ...utils.batching import TokenBudget, estimate_tokens
+
+logger = logging.getLogger("blueprint_maker.micro_decomp")
+
+# Estimated prompt + answer tokens per batched call, and the starting guess
+# of answer tokens per task (corrected from reported usage as batches run)
+BATCH_TOKEN_BUDGET = int(os.getenv("MICRO_DECOMP_BATCH_TOKENS", "6000"))
+BATCH_MAX_TASKS = int(os.getenv("MICRO_DECOMP_BATCH_MAX_TASKS", "12"))
+OUTPUT_TOKENS_PER_TASK = 400
+
+_budget = TokenBudget(BATCH_TOKEN_BUDGET, OUTPUT_TOKENS_PER_TASK, BATCH_MAX_TASKS)
+_audit = AuditAgent()
+
+def _strip_fences(content: str) -> str:
+    content = re.sub(r"^```(?:json)?\s*", "", content.strip())
+    return re.sub(r"\s*```$", "", content)
 
 class MicroDecompAgent(Agent):
     def run(self, payload: dict) -> dict:
@@ -46,10 +63,8 @@ class MicroDecompAgent(Agent):
             {"role": "user",    "content": prompt}
         ]
 
-        resp = chat_completion(messages, model="gpt-4o", temperature=0.3)
-        content = resp.choices[0].message.content.strip()
-        content = re.sub(r"^```(?:json)?\s*", "", content)
-        content = re.sub(r"\s*```$", "", content)
+        resp = chat_completion(messages, model="gpt-4o", temperature=0.3, agent="micro_decomp")
+        content = _strip_fences(resp.choices[0].message.content)
 
         # The LLM might return either an object {"subtasks":[...]} or just [...]
         data = json.loads(content)
@@ -57,6 +72,73 @@ class MicroDecompAgent(Agent):
             return {"subtasks": data}
         return {"subtasks": data.get("subtasks", [])}
 
+    def run_batch(self, tasks: list) -> list:
+        """
+        Decompose many tasks with few calls: tasks are packed into prompts
+        sized by a token budget, each under a stable id (T1, T2, ... in input
+        order). Every task's answer is audited on its own; a task whose
+        answer is missing, malformed or fails the audit is retried alone
+        with ``run``.
+
+        :param tasks: list of ``run`` payloads
+        :return: list of ``{"subtasks": [...]}``, in the order of ``tasks``
+        """
+        results = [None] * len(tasks)
+        for batch in _budget.chunks(tasks, cost=estimate_tokens):
+            if len(batch) == 1:
+                continue
+            try:
+                answers = self._ask_batch({f"T{i + 1}": tasks[i] for i in batch}, len(batch))
+            except Exception as e:
+                logger.warning("Micro-decomp batch of %d tasks failed, retrying them alone: %s", len(batch), e)
+                continue
+            for i in batch:
+                res = _as_result(answers.get(f"T{i + 1}"))
+                if res is not None and not _audit.run(
+                    {"phase": "output", "agent": "micro_decomp", "payload": res}
+                ).get("errors"):
+                    results[i] = res
+
+        missing = [i for i, res in enumerate(results) if res is None]
+        if missing:
+            logger.info("Micro-decomposing %d of %d tasks alone", len(missing), len(tasks))
+        for i in missing:
+            results[i] = self.run(tasks[i])
+        return results
+
+    def _ask_batch(self, tasks: dict, count: int) -> dict:
+        prompt = (
+            "You are an expert task decomposer.\n"
+            "Below are several tasks from our campaign blueprint, each under an id. "
+            "Decompose every task into 3–6 ordered subtasks. "
+            "Return ONLY a JSON object mapping each id to an array of its subtasks, where each subtask has keys:\n"
+            "  • name: string\n"
+            "  • role: string\n"
+            "  • tools: array of strings\n"
+            "  • deliverable: string\n"
+            "  • time_estimate: string\n\n"
+            "Tasks:\n"
+            f"{json.dumps(tasks, indent=2)}\n\n"
+        )
+        messages = [
+            {"role": "system",  "content": "You are a helpful micro-decomp assistant."},
+            {"role": "user",    "content": prompt}
+        ]
+        resp = chat_completion(messages, model="gpt-4o", temperature=0.3, agent="micro_decomp")
+        usage = getattr(resp, "usage", None)
+        _budget.observe(count, getattr(usage, "completion_tokens", 0) or 0)
+        data = json.loads(_strip_fences(resp.choices[0].message.content))
+        return data if isinstance(data, dict) else {}
+
+
+def _as_result(answer) -> dict:
+    """One task's answer as ``{"subtasks": [...]}``, or None if it has no subtasks."""
+    if isinstance(answer, dict):
+        answer = answer.get("subtasks")
+    if not isinstance(answer, list) or not answer:
+        return None
+    return {"subtasks": answer}
+
 
 # Self-test
 if __name__ == "__main__":
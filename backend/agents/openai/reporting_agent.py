@@ -51,7 +51,7 @@ class ReportingAgent(Agent):
             {"role":"system", "content":"You are a helpful reporting agent."},
             {"role":"user",   "content":prompt}
         ]
-        resp = chat_completion(messages, model="gpt-4o", temperature=0)
+        resp = chat_completion(messages, model="gpt-4o", temperature=0, agent="report")
         content = resp.choices[0].message.content.strip()
         content = re.sub(r"^```(?:json)?\s*","",content)
         content = re.sub(r"\s*```$","",content)
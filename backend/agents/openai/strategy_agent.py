@@ -50,7 +50,7 @@ class StrategyAgent(Agent):
             {"role": "system", "content": "You are a smart marketing strategist."},
             {"role": "user",   "content": prompt}
         ]
-        resp = chat_completion(messages, model="gpt-4o", temperature=0.7)
+        resp = chat_completion(messages, model="gpt-4o", temperature=0.7, agent="strategy")
         content = resp.choices[0].message.content.strip()
         # strip fences
         content = re.sub(r"^```(?:json)?\s*", "", content)
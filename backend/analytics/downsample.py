@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/analytics/downsample.py
+
+Need for this file (5th-grader explanation):
+"A chart only has so many pixels. If we send it 100,000 dots, most of them
+land on top of each other and the browser gets slow. So we pick a few
+hundred dots that still draw the same picture — making sure we keep the
+tall spikes and deep dips — and send only those."
+
+Three ways to reduce a series to at most ``max_points`` points:
+
+- ``lttb``: Largest-Triangle-Three-Buckets; keeps the points that preserve
+  the visual shape (spikes included);
+- ``minmax``: the minimum and maximum point of every bucket;
+- ``sum``: merges adjacent buckets, so totals are preserved exactly.
+
+``lttb`` and ``minmax`` return indices into the original series, so several
+metrics can share the points chosen for one of them.
+
+``source_granularity`` picks the coarsest bucket size that still has at
+least ``max_points`` buckets, so a per-minute chart over months is
+downsampled from the pre-aggregated hourly rollups instead of raw rows.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .store import GRANULARITIES, bucket_count
+
+METHODS = ("lttb", "minmax", "sum")
+
+
+def source_granularity(start: int, end: int, granularity: str, max_points: int) -> str:
+    """Coarsest granularity, no finer than ``granularity``, with at least ``max_points`` buckets."""
+    names = list(GRANULARITIES)
+    chosen = granularity
+    for name in names[names.index(granularity) + 1:]:
+        if bucket_count(start, end, name) < max_points:
+            break
+        chosen = name
+    return chosen
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets."""
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are always kept; the rest is split into equal buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.intp)
+    # Mean of every bucket, used as the third triangle corner for the previous bucket
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``max_points // 2`` buckets, in order."""
+    n = len(y)
+    if max_points >= n:
+        return np.arange(n)
+    buckets = max(max_points // 2, 1)
+    bucket = (np.arange(n) * buckets) // n
+    # Within each bucket, order by value: first row is the min, last is the max
+    order = np.lexsort((np.asarray(y), bucket))
+    ends = np.flatnonzero(np.r_[bucket[order][1:] != bucket[order][:-1], True])
+    starts = np.r_[0, ends[:-1] + 1]
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def sum_groups(series: Dict[str, np.ndarray], max_points: int,
+               time_key: str = "bucket_start") -> Dict[str, np.ndarray]:
+    """Merge adjacent buckets into ``max_points`` groups, summing every metric."""
+    n = len(series[time_key])
+    if max_points >= n:
+        return series
+    starts = np.unique(np.linspace(0, n, max_points, endpoint=False).astype(np.intp))
+    merged = {key: np.add.reduceat(values, starts) for key, values in series.items() if key != time_key}
+    merged[time_key] = series[time_key][starts]
+    return merged
+
+
+def downsample(series: Dict[str, np.ndarray], max_points: int, method: str = "lttb",
+               primary: str = "impressions", time_key: str = "bucket_start") -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Reduce an aggregated series to at most ``max_points`` points.
+
+    Args:
+        series: Column per key (as returned by ``EventStore.aggregate``)
+        max_points: Upper bound on the number of points
+        method: One of METHODS
+        primary: Metric that picks the points for ``lttb``/``minmax``
+        time_key: Column holding the bucket start times
+
+    Returns:
+        (downsampled series, number of points before downsampling)
+
+    Raises:
+        ValueError: On an unknown method
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    n = len(series[time_key])
+    if n <= max_points:
+        return series, n
+    if method == "sum":
+        return sum_groups(series, max_points, time_key), n
+    if method == "lttb":
+        keep = lttb_indices(series[time_key], series[primary], max_points)
+    else:
+        keep = minmax_indices(series[primary], max_points)
+    return {key: values[keep] for key, values in series.items()}, n
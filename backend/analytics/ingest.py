@@ -0,0 +1,397 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/analytics/ingest.py
+
+Need for this file (5th-grader explanation):
+"Ad platforms send us news about impressions, clicks and conversions very
+fast. Instead of running to the filing cabinet for every single note, we
+drop the notes into an inbox and carry the whole stack over a few times a
+second. If the inbox gets too full, we tell the sender 'slow down, try
+again in a moment' instead of dropping notes on the floor."
+
+Two wire formats are accepted by ``POST /api/analytics/events``:
+
+NDJSON (``application/x-ndjson``), one event per line::
+
+    {"ts": 1735689600, "campaign_id": "cam_1", "impressions": 120, "clicks": 4}
+    {"ts": 1735689601, "campaign_id": "cam_2", "event": "conversion"}
+
+``ts`` is epoch seconds (or ISO 8601) and defaults to the time of receipt;
+``event`` counts one impression/click/conversion (times ``count``).
+Optional ``user_id``, ``creative_id`` and ``placement`` feed the reach and
+heavy-hitter sketches (see sketches.py); the binary format carries counts only.
+
+Binary (``application/vnd.agency.events``), little-endian::
+
+    b"AEB1"
+    uint16 number of campaign ids, then per id: uint16 length + UTF-8 bytes
+    uint32 number of records, then packed RECORD_DTYPE records
+
+where a record's ``campaign`` is an index into the id table of the batch.
+
+Campaign ids are turned into store codes only once the whole batch has
+validated, and, when the caller passes ``is_known``, only for campaigns it
+knows; a batch naming any other campaign is rejected. Rejected batches and
+made-up ids therefore never grow the persisted campaign dictionary.
+"""
+
+import logging
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import orjson
+
+from backend.observability.metrics import INGESTED_EVENTS, QUEUE_DEPTH
+from .sketches import Dimension, hash64
+from .store import METRICS, EventStore
+
+logger = logging.getLogger("analytics.ingest")
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+BINARY_CONTENT_TYPE = "application/vnd.agency.events"
+
+BINARY_MAGIC = b"AEB1"
+RECORD_DTYPE = np.dtype([
+    ("ts", "<i8"),
+    ("campaign", "<u2"),
+    ("impressions", "<u4"),
+    ("clicks", "<u4"),
+    ("conversions", "<u4"),
+])
+
+# "event" values in NDJSON and the metric column they count towards
+_EVENT_METRICS = {"impression": "impressions", "click": "clicks", "conversion": "conversions"}
+
+# NDJSON field for each sketch dimension
+_DIMENSION_FIELDS = {"creative": "creative_id", "placement": "placement"}
+
+
+class IngestError(ValueError):
+    """A batch could not be decoded; nothing from it was accepted."""
+
+
+class EventBatch:
+    """Decoded events as columns ready for ``EventStore.append``."""
+
+    __slots__ = ("ts", "codes", "metrics", "user_hashes", "dimensions")
+
+    def __init__(self, ts: np.ndarray, codes: np.ndarray, metrics: Dict[str, np.ndarray],
+                 user_hashes: Optional[np.ndarray] = None, dimensions: Optional[Dict[str, Dimension]] = None):
+        self.ts = ts
+        self.codes = codes
+        self.metrics = metrics
+        # Sketch inputs; only NDJSON batches carry them
+        self.user_hashes = user_hashes
+        self.dimensions = dimensions or {}
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+# ========== DECODING ==========
+
+def decode_batch(body: bytes, content_type: str, store: EventStore,
+                 is_known: Optional[Callable[[str], bool]] = None) -> EventBatch:
+    """
+    Decode a request body in either wire format.
+
+    Args:
+        body: Request body
+        content_type: Media type without parameters
+        store: Store whose campaign codes the batch is written with
+        is_known: Accepts a campaign id; None accepts every id
+
+    Raises:
+        IngestError: On an unsupported content type, a malformed body or an
+            unknown campaign
+    """
+    if content_type == BINARY_CONTENT_TYPE:
+        return decode_binary(body, store, is_known)
+    if content_type in NDJSON_CONTENT_TYPES:
+        return decode_ndjson(body, store, is_known)
+    raise IngestError(f"Unsupported content type: {content_type or 'none'}")
+
+
+def decode_ndjson(body: bytes, store: EventStore,
+                  is_known: Optional[Callable[[str], bool]] = None) -> EventBatch:
+    """Decode newline-delimited JSON events."""
+    lines = [line for line in body.split(b"\n") if line.strip()]
+    if not lines:
+        return _empty_batch()
+    try:
+        # One parser call for the whole batch instead of one per line
+        events = orjson.loads(b"[" + b",".join(lines) + b"]")
+    except orjson.JSONDecodeError as e:
+        raise IngestError(f"Malformed NDJSON: {e}")
+
+    n = len(events)
+    now = int(time.time())
+    ts = np.empty(n, dtype=np.int64)
+    # Index into the batch's own id table; store codes are resolved after validation
+    local = np.empty(n, dtype=np.int32)
+    cols = {m: np.zeros(n, dtype=np.int64) for m in METRICS}
+    ids: Dict[str, int] = {}
+    user_hashes = np.zeros(n, dtype=np.uint64)
+    dimension_codes = {d: np.full(n, -1, dtype=np.int32) for d in _DIMENSION_FIELDS}
+    dimension_values: Dict[str, Dict[str, int]] = {d: {} for d in _DIMENSION_FIELDS}
+
+    for i, e in enumerate(events):
+        try:
+            local[i] = ids.setdefault(str(e["campaign_id"]), len(ids))
+
+            t = e.get("ts", now)
+            ts[i] = t if type(t) is int else _parse_ts(t)
+
+            event = e.get("event")
+            if event is not None:
+                cols[_EVENT_METRICS[event]][i] += e.get("count", 1)
+            for m in METRICS:
+                if m in e:
+                    cols[m][i] += e[m]
+
+            user_id = e.get("user_id")
+            if user_id is not None:
+                user_hashes[i] = hash64(str(user_id))
+            for dimension, field in _DIMENSION_FIELDS.items():
+                value = e.get(field)
+                if value is not None:
+                    values = dimension_values[dimension]
+                    dimension_codes[dimension][i] = values.setdefault(str(value), len(values))
+        except (KeyError, TypeError, ValueError, AttributeError, OverflowError) as exc:
+            raise IngestError(f"Invalid event on line {i + 1}: {exc!r}")
+
+    batch = _checked_batch(ts, local, cols, list(ids), store, is_known)
+    if user_hashes.any():
+        batch.user_hashes = user_hashes
+    batch.dimensions = {
+        d: (dimension_codes[d], list(values)) for d, values in dimension_values.items() if values
+    }
+    return batch
+
+
+def decode_binary(body: bytes, store: EventStore,
+                  is_known: Optional[Callable[[str], bool]] = None) -> EventBatch:
+    """Decode a packed binary batch (see module docstring)."""
+    view = memoryview(body)
+    try:
+        if bytes(view[:4]) != BINARY_MAGIC:
+            raise IngestError("Bad magic; expected AEB1 binary batch")
+        offset = 4
+        (n_ids,) = struct.unpack_from("<H", view, offset)
+        offset += 2
+        campaign_ids = []
+        for _ in range(n_ids):
+            (length,) = struct.unpack_from("<H", view, offset)
+            offset += 2
+            if offset + length > len(view):
+                raise IngestError("Malformed binary batch header: campaign id runs past the end")
+            campaign_ids.append(bytes(view[offset:offset + length]).decode("utf-8"))
+            offset += length
+        (n,) = struct.unpack_from("<I", view, offset)
+        offset += 4
+    except (struct.error, UnicodeDecodeError) as e:
+        raise IngestError(f"Malformed binary batch header: {e}")
+
+    if len(view) - offset != n * RECORD_DTYPE.itemsize:
+        raise IngestError(f"Binary batch declares {n} records but carries {len(view) - offset} bytes")
+    records = np.frombuffer(body, dtype=RECORD_DTYPE, count=n, offset=offset)
+    if n and int(records["campaign"].max()) >= n_ids:
+        raise IngestError("Binary record references an unknown campaign index")
+
+    return _checked_batch(
+        records["ts"].copy(),
+        records["campaign"].astype(np.int32),
+        {m: records[m].astype(np.int64) for m in METRICS},
+        campaign_ids, store, is_known,
+    )
+
+
+def encode_binary(campaign_ids: Sequence[str], ts: np.ndarray, campaign_index: np.ndarray,
+                  metrics: Dict[str, np.ndarray]) -> bytes:
+    """
+    Build a binary batch (the inverse of ``decode_binary``).
+
+    Args:
+        campaign_ids: Id table for the batch
+        ts: Epoch seconds per record
+        campaign_index: Index into ``campaign_ids`` per record
+        metrics: Counts per metric name; missing metrics are 0
+    """
+    header = [BINARY_MAGIC, struct.pack("<H", len(campaign_ids))]
+    for campaign_id in campaign_ids:
+        encoded = campaign_id.encode("utf-8")
+        header.append(struct.pack("<H", len(encoded)) + encoded)
+    records = np.zeros(len(ts), dtype=RECORD_DTYPE)
+    records["ts"] = ts
+    records["campaign"] = campaign_index
+    for m, col in metrics.items():
+        records[m] = col
+    header.append(struct.pack("<I", len(records)))
+    return b"".join(header) + records.tobytes()
+
+
+def _parse_ts(value) -> int:
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value)
+        # Naive values are UTC, like the bucket labels, not the server's local time
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp())
+    return int(value)
+
+
+def _checked_batch(ts: np.ndarray, local: np.ndarray, cols: Dict[str, np.ndarray], campaign_ids: List[str],
+                   store: EventStore, is_known: Optional[Callable[[str], bool]]) -> EventBatch:
+    """Validate counts and campaigns, then map batch-local campaign indexes to store codes."""
+    # Store columns are int32 counts; reject values that would wrap around
+    for m, col in cols.items():
+        if len(col) and (col.min() < 0 or col.max() > np.iinfo(np.int32).max):
+            raise IngestError(f"{m} counts must be between 0 and {np.iinfo(np.int32).max}")
+    if is_known is not None:
+        unknown = [c for c in campaign_ids if store.campaign_code(c, create=False) is None and not is_known(c)]
+        if unknown:
+            shown = ", ".join(unknown[:5]) + (", ..." if len(unknown) > 5 else "")
+            raise IngestError(f"Unknown campaign id(s): {shown}")
+    # The batch is valid: only now may new codes be assigned (and persisted)
+    table = np.array([store.campaign_code(c) for c in campaign_ids], dtype=np.int32)
+    codes = table[local] if len(local) else np.empty(0, np.int32)
+    return EventBatch(ts, codes, {m: col.astype(np.int32) for m, col in cols.items()})
+
+
+def _empty_batch() -> EventBatch:
+    return EventBatch(np.empty(0, np.int64), np.empty(0, np.int32),
+                      {m: np.empty(0, np.int32) for m in METRICS})
+
+
+# ========== BUFFERING ==========
+
+class IngestBuffer:
+    """
+    Bounded in-memory buffer in front of an EventStore.
+
+    Request handlers ``offer()`` decoded batches; a background thread
+    group-commits everything pending into one ``EventStore.append`` call
+    every ``commit_interval`` seconds, or sooner once ``commit_rows`` events
+    are waiting. When accepting a batch would exceed ``capacity`` it is
+    refused, and the API answers 429 so clients back off.
+    """
+
+    def __init__(self, store: EventStore, capacity: int = 2_000_000, commit_rows: int = 200_000,
+                 commit_interval: float = 0.05):
+        """
+        Args:
+            store: Store that receives committed events
+            capacity: Maximum number of buffered (uncommitted) events
+            commit_rows: Pending events that trigger an early commit
+            commit_interval: Maximum seconds between commits
+        """
+        self.store = store
+        self.capacity = capacity
+        self.commit_rows = commit_rows
+        self.commit_interval = commit_interval
+
+        self._pending: List[EventBatch] = []
+        self._pending_rows = 0
+        self._listeners: List[Callable[[EventBatch], None]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[EventBatch], None]) -> None:
+        """Call ``callback(batch)`` for every batch once it is committed to the store."""
+        self._listeners.append(callback)
+
+    @property
+    def pending(self) -> int:
+        return self._pending_rows
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a refused client should wait, as sent in Retry-After."""
+        return max(1, int(round(self.commit_interval * 2)))
+
+    def offer(self, batch: EventBatch) -> bool:
+        """
+        Queue a batch for the next commit.
+
+        Returns:
+            False if the buffer is too full to take the whole batch
+        """
+        n = len(batch)
+        if n == 0:
+            return True
+        with self._lock:
+            if self._pending_rows + n > self.capacity:
+                return False
+            self._pending.append(batch)
+            self._pending_rows += n
+            pending = self._pending_rows
+        QUEUE_DEPTH.set(pending, queue="analytics_ingest")
+        if pending >= self.commit_rows:
+            self._wakeup.set()
+        return True
+
+    def commit(self) -> int:
+        """Write everything pending to the store; returns the number of events."""
+        with self._lock:
+            batches, self._pending = self._pending, []
+        if not batches:
+            return 0
+        if len(batches) == 1:
+            ts, codes, cols = batches[0].ts, batches[0].codes, batches[0].metrics
+        else:
+            ts = np.concatenate([b.ts for b in batches])
+            codes = np.concatenate([b.codes for b in batches])
+            cols = {m: np.concatenate([b.metrics[m] for b in batches]) for m in METRICS}
+        try:
+            n = self.store.append(ts, codes, cols)
+        except Exception:
+            # Keep the events buffered so the next commit retries them
+            with self._lock:
+                self._pending[:0] = batches
+            raise
+        # Rows only leave the buffer count once they are in the store
+        with self._lock:
+            self._pending_rows -= n
+            pending = self._pending_rows
+        QUEUE_DEPTH.set(pending, queue="analytics_ingest")
+        INGESTED_EVENTS.inc(n, result="committed")
+        for batch in batches:
+            for listener in self._listeners:
+                listener(batch)
+        return n
+
+    # ---------- background thread ----------
+
+    def start(self) -> None:
+        """Commit on a daemon thread until ``stop()``."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="analytics-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Commit what is left and seal it to disk."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.commit()
+        self.store.flush()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.commit_interval)
+            self._wakeup.clear()
+            try:
+                self.commit()
+            except Exception:
+                logger.exception("Analytics group commit failed")
@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/analytics/loadgen.py
+
+Need for this file (5th-grader explanation):
+"This is a pretend ad platform that throws lots and lots of fake
+impressions and clicks at our inbox, and then tells us how many per second
+we managed to catch."
+
+Usage:
+    # Against a running server (started with ANALYTICS_REQUIRE_KNOWN_CAMPAIGNS=0,
+    # since the generated cam_<n> campaigns are not in the repository)
+    python -m backend.analytics.loadgen --events 2000000 --format binary
+
+    # Decode + buffer + group commit in this process, without HTTP
+    python -m backend.analytics.loadgen --in-process --format ndjson
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+import numpy as np
+import orjson
+
+from .ingest import BINARY_CONTENT_TYPE, IngestBuffer, decode_batch, encode_binary
+from .store import EventStore
+
+DEFAULT_URL = "http://127.0.0.1:5000/api/analytics/events"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def make_batches(events: int, batch_size: int, campaigns: int, fmt: str,
+                 seed: int = 7) -> List[Tuple[bytes, int]]:
+    """
+    Pre-build request bodies so generation cost is not measured.
+
+    Returns:
+        (body, number of events) per batch
+    """
+    rng = np.random.default_rng(seed)
+    campaign_ids = [f"cam_{i + 1}" for i in range(campaigns)]
+    now = int(time.time())
+    batches = []
+    for first in range(0, events, batch_size):
+        n = min(batch_size, events - first)
+        ts = now - rng.integers(0, 7 * 86400, n)
+        index = rng.integers(0, campaigns, n)
+        impressions = rng.integers(1, 50, n)
+        clicks = rng.binomial(impressions, 0.03)
+        conversions = rng.binomial(clicks, 0.05)
+        if fmt == "binary":
+            body = encode_binary(campaign_ids, ts, index, {
+                "impressions": impressions, "clicks": clicks, "conversions": conversions,
+            })
+        else:
+            users = rng.integers(0, 1_000_000, n)
+            creatives = rng.zipf(1.5, n) % 200
+            body = b"\n".join(
+                orjson.dumps({"ts": int(t), "campaign_id": campaign_ids[c], "impressions": int(i),
+                              "clicks": int(k), "conversions": int(v), "user_id": f"u{u}",
+                              "creative_id": f"cr{cr}"})
+                for t, c, i, k, v, u, cr in zip(ts, index, impressions, clicks, conversions, users, creatives)
+            )
+        batches.append((body, n))
+    return batches
+
+
+def run_in_process(batches: List[Tuple[bytes, int]], fmt: str) -> dict:
+    """Decode, buffer and group-commit every batch on the current thread."""
+    content_type = BINARY_CONTENT_TYPE if fmt == "binary" else NDJSON_CONTENT_TYPE
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        buffer = IngestBuffer(store)
+        started = time.perf_counter()
+        accepted = 0
+        for body, n in batches:
+            batch = decode_batch(body, content_type, store)
+            if not buffer.offer(batch):
+                # Single-threaded: commit inline instead of waiting for the flusher
+                buffer.commit()
+                buffer.offer(batch)
+            accepted += n
+            if buffer.pending >= buffer.commit_rows:
+                buffer.commit()
+        buffer.commit()
+        elapsed = time.perf_counter() - started
+        stored = store.row_count()
+    return {"accepted": accepted, "stored": stored, "seconds": elapsed}
+
+
+def run_http(batches: List[Tuple[bytes, int]], fmt: str, url: str, concurrency: int) -> dict:
+    """POST every batch with ``concurrency`` keep-alive clients, retrying on 429."""
+    import httpx
+
+    content_type = BINARY_CONTENT_TYPE if fmt == "binary" else NDJSON_CONTENT_TYPE
+    stats = {"accepted": 0, "rejected": 0}
+    lock = threading.Lock()
+    next_batch = iter(batches)
+
+    def worker():
+        with httpx.Client(headers={"Content-Type": content_type}, timeout=30) as client:
+            while True:
+                with lock:
+                    item = next(next_batch, None)
+                if item is None:
+                    return
+                body, n = item
+                while True:
+                    response = client.post(url, content=body)
+                    if response.status_code != 429:
+                        response.raise_for_status()
+                        break
+                    # Backpressure: wait as told, then resend the same batch
+                    with lock:
+                        stats["rejected"] += n
+                    time.sleep(float(response.headers.get("Retry-After", 1)))
+                with lock:
+                    stats["accepted"] += n
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generator for /api/analytics/events")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--format", choices=("binary", "ndjson"), default="binary")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--campaigns", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--in-process", action="store_true",
+                        help="Measure decode + group commit without HTTP")
+    args = parser.parse_args()
+
+    print(f"Building {args.events:,} {args.format} events in batches of {args.batch_size:,}...")
+    batches = make_batches(args.events, args.batch_size, args.campaigns, args.format)
+    payload = sum(len(body) for body, _ in batches)
+
+    if args.in_process:
+        stats = run_in_process(batches, args.format)
+    else:
+        stats = run_http(batches, args.format, args.url, args.concurrency)
+
+    rate = stats["accepted"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"Accepted {stats['accepted']:,} events in {stats['seconds']:.2f}s "
+          f"({rate:,.0f} events/s, {payload / stats['seconds'] / 1e6:.1f} MB/s)")
+    if stats.get("rejected"):
+        print(f"Backpressure: {stats['rejected']:,} events refused with 429 and resent")
+    if "stored" in stats:
+        print(f"Rows in store: {stats['stored']:,}")
+
+
+if __name__ == "__main__":
+    main()
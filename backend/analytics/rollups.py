@@ -0,0 +1,232 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/analytics/rollups.py
+
+Need for this file (5th-grader explanation):
+"Instead of counting every marble in the jar each time someone asks 'how
+many?', we keep a running tally on a sticky note and add to it every time
+new marbles drop in. Once in a while we count the jar again to make sure
+the sticky note is still right."
+
+AnalyticsRollups keeps materialized totals for the overview:
+
+- impressions/clicks/conversions per campaign, per client and overall,
+  updated from every ``EventStore.append`` (via ``add_listener``);
+- the number of campaigns in each status, updated on status changes.
+
+Reading them is O(1). ``rebuild()`` recomputes the totals from the stored
+events, reports any drift against the maintained values and replaces them.
+Appends are placed by their row position: a batch the recount already
+covers is not added again when its listener call arrives late, and a batch
+appended after the recount is carried over into the rebuilt totals.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .store import METRICS, EventStore
+
+logger = logging.getLogger("analytics.rollups")
+
+
+class AnalyticsRollups:
+    """Incrementally maintained totals over an EventStore."""
+
+    def __init__(self, store: EventStore):
+        """
+        Args:
+            store: Event store to follow; its existing rows are loaded immediately
+        """
+        self.store = store
+        self._lock = threading.Lock()
+
+        self._campaign = np.zeros((0, len(METRICS)), dtype=np.int64)
+        self._global = np.zeros(len(METRICS), dtype=np.int64)
+        self._client: Dict[str, np.ndarray] = {}
+        self._rows = 0
+        # Rows covered by the last rebuild's recount; later listener calls for them are skipped
+        self._covered = 0
+        # (first_row, rows, per-code sums) applied while a rebuild is recounting
+        self._rebuild_log: Optional[List[Tuple[int, int, np.ndarray]]] = None
+        self._rebuild_lock = threading.Lock()
+
+        self._client_of: Dict[str, str] = {}
+        self._status_of: Dict[str, str] = {}
+        self._status_counts: Dict[str, int] = {}
+
+        self.rebuild(check=False)
+        store.add_listener(self._on_append)
+
+    # ---------- updates ----------
+
+    def _on_append(self, codes: np.ndarray, cols: Dict[str, np.ndarray], first_row: int) -> None:
+        if len(codes) == 0:
+            return
+        n = int(codes.max()) + 1
+        sums = np.stack([
+            np.bincount(codes, weights=cols[m], minlength=n) for m in METRICS
+        ], axis=1).astype(np.int64)
+        touched = np.flatnonzero(sums.any(axis=1))
+
+        with self._lock:
+            if first_row < self._covered:
+                # Already counted by the last rebuild
+                return
+            if self._rebuild_log is not None:
+                self._rebuild_log.append((first_row, len(codes), sums))
+            self._grow(n)
+            self._campaign[:n] += sums
+            self._global += sums.sum(axis=0)
+            self._rows += len(codes)
+            for code in touched:
+                client = self._client_of.get(self.store.campaign_name(int(code)))
+                if client is not None:
+                    self._client_totals(client)[:] += sums[code]
+
+    def set_campaign(self, campaign_id: str, client: Optional[str] = None,
+                     status: Optional[str] = None) -> None:
+        """
+        Register a campaign or update its client and/or status.
+
+        Moving a campaign to another client moves its totals with it.
+        """
+        with self._lock:
+            if client is not None and self._client_of.get(campaign_id) != client:
+                totals = self._totals_of(campaign_id)
+                previous = self._client_of.get(campaign_id)
+                if previous is not None:
+                    self._client[previous] -= totals
+                self._client_totals(client)[:] += totals
+                self._client_of[campaign_id] = client
+            if status is not None:
+                self._set_status(campaign_id, status)
+
+    def set_status(self, campaign_id: str, status: str) -> None:
+        """Record a status change, registering the campaign if it is new."""
+        with self._lock:
+            self._set_status(campaign_id, status)
+
+    def remove_campaign(self, campaign_id: str) -> None:
+        """Stop counting a campaign's status (its event totals stay in the global sums)."""
+        with self._lock:
+            status = self._status_of.pop(campaign_id, None)
+            if status is not None:
+                self._status_counts[status] -= 1
+
+    def _set_status(self, campaign_id: str, status: str) -> None:
+        previous = self._status_of.get(campaign_id)
+        if previous == status:
+            return
+        if previous is not None:
+            self._status_counts[previous] -= 1
+        self._status_counts[status] = self._status_counts.get(status, 0) + 1
+        self._status_of[campaign_id] = status
+
+    def _grow(self, n: int) -> None:
+        if n > len(self._campaign):
+            grown = np.zeros((max(n, 2 * len(self._campaign)), len(METRICS)), dtype=np.int64)
+            grown[:len(self._campaign)] = self._campaign
+            self._campaign = grown
+
+    def _client_totals(self, client: str) -> np.ndarray:
+        totals = self._client.get(client)
+        if totals is None:
+            totals = self._client[client] = np.zeros(len(METRICS), dtype=np.int64)
+        return totals
+
+    def _totals_of(self, campaign_id: str) -> np.ndarray:
+        code = self.store.campaign_code(campaign_id, create=False)
+        if code is None or code >= len(self._campaign):
+            return np.zeros(len(METRICS), dtype=np.int64)
+        return self._campaign[code].copy()
+
+    # ---------- reads ----------
+
+    def totals(self) -> Dict[str, int]:
+        """Global metric totals."""
+        with self._lock:
+            return dict(zip(METRICS, self._global.tolist()))
+
+    def campaign_totals(self, campaign_id: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(zip(METRICS, self._totals_of(campaign_id).tolist()))
+
+    def client_totals(self, client: str) -> Dict[str, int]:
+        with self._lock:
+            totals = self._client.get(client)
+            return dict(zip(METRICS, totals.tolist() if totals is not None else [0] * len(METRICS)))
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: count for status, count in self._status_counts.items() if count}
+
+    def overview(self) -> Dict[str, Any]:
+        """Global totals plus per-status campaign counts, without scanning anything."""
+        with self._lock:
+            totals = dict(zip(METRICS, self._global.tolist()))
+            counts = {status: count for status, count in self._status_counts.items() if count}
+        return {"totals": totals, "status_counts": counts}
+
+    # ---------- rebuild ----------
+
+    def rebuild(self, check: bool = True, attempts: int = 5) -> Dict[str, Any]:
+        """
+        Recompute the event totals from the store and replace the maintained ones.
+
+        Args:
+            check: Compare against the maintained totals and report drift
+            attempts: Retries when events are appended while recomputing
+
+        Returns:
+            {"rows", "campaigns", "drift": [{campaign_id, metric, maintained, recomputed}]}
+        """
+        with self._rebuild_lock:
+            for attempt in range(attempts):
+                with self._lock:
+                    self._rebuild_log = []
+                recomputed, rows = self.store.campaign_totals()
+                with self._lock:
+                    # Batches applied after the recount's snapshot are not in it
+                    later = [entry for entry in self._rebuild_log if entry[0] >= rows]
+                    later_rows = sum(n for _, n, _ in later)
+                    if check and self._rows - later_rows != rows and attempt < attempts - 1:
+                        # Batches the recount covers are still on their way to the listener; try again
+                        continue
+                    self._rebuild_log = None
+                    for _, _, sums in later:
+                        if len(sums) > len(recomputed):
+                            recomputed = np.vstack([recomputed, np.zeros((len(sums) - len(recomputed), len(METRICS)),
+                                                                         dtype=np.int64)])
+                        recomputed[:len(sums)] += sums
+                    drift = self._drift(recomputed) if check else []
+                    self._campaign = recomputed
+                    self._global = recomputed.sum(axis=0)
+                    self._rows = rows + later_rows
+                    self._covered = max(self._covered, rows)
+                    self._client = {}
+                    for campaign_id, client in self._client_of.items():
+                        self._client_totals(client)[:] += self._totals_of(campaign_id)
+                break
+        if drift:
+            logger.warning("Analytics rollups drifted for %d campaign metrics; rebuilt from events",
+                           len(drift))
+        return {"rows": rows, "campaigns": len(recomputed), "drift": drift}
+
+    def _drift(self, recomputed: np.ndarray) -> List[Dict[str, Any]]:
+        maintained = np.zeros_like(recomputed)
+        n = min(len(recomputed), len(self._campaign))
+        maintained[:n] = self._campaign[:n]
+        drift = []
+        for code, j in zip(*np.nonzero(maintained != recomputed)):
+            drift.append({
+                "campaign_id": self.store.campaign_name(int(code)),
+                "metric": METRICS[j],
+                "maintained": int(maintained[code, j]),
+                "recomputed": int(recomputed[code, j]),
+            })
+        return drift
@@ -0,0 +1,559 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/analytics/sketches.py
+
+Need for this file (5th-grader explanation):
+"Counting exactly how many different people saw an ad means remembering
+every single person. Instead we keep tiny 'fingerprint notebooks' that
+can guess the answer very closely while staying the same small size no
+matter how many people show up — and two notebooks can be combined into
+one, so each day and each server can keep its own."
+
+Sketches kept per campaign and per time bucket:
+
+- HyperLogLog: unique users (``user_id``);
+- Count-Min + top-k: impressions per creative and per placement, and the
+  heaviest ones;
+- t-digest: distribution of per-event CTR (clicks / impressions, weighted
+  by impressions).
+
+Every sketch has a fixed size and a ``merge`` that is exact for HLL and
+Count-Min, so buckets (or worker processes) can be combined freely.
+SketchStore keeps ``retention_buckets`` recent buckets per campaign and
+folds older ones into a single accumulator, bounding memory per campaign.
+Campaigns changed since the last save are written out every
+``save_interval_seconds`` by a background thread, so a crash loses at most
+one interval of sketch updates.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+DIMENSIONS = ("creative", "placement")
+
+# Per-row dimension values, factorized: (int codes with -1 for unknown, value per code)
+Dimension = Tuple[np.ndarray, Sequence[str]]
+
+DEFAULT_BUCKET_SECONDS = 86400
+DEFAULT_RETENTION_BUCKETS = 7
+DEFAULT_SAVE_INTERVAL_SECONDS = 60
+
+logger = logging.getLogger("analytics.sketches")
+
+# Odd 64-bit multipliers; row i of a Count-Min sketch hashes with _CMS_SEEDS[i]
+_CMS_SEEDS = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x27D4EB2F165667C5, 0x94D049BB133111EB,
+], dtype=np.uint64)
+
+
+def hash64(value: str) -> int:
+    """Stable 64-bit hash (the same in every process, unlike ``hash()``)."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def hash64_many(values: Iterable[str]) -> np.ndarray:
+    return np.fromiter((hash64(v) for v in values), dtype=np.uint64)
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2**p one-byte registers."""
+
+    def __init__(self, p: int = 12, registers: Optional[np.ndarray] = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining 64 - p bits
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        rank = (64 - self.p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return m * np.log(m / zeros)
+        return float(raw)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(self.m)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class CountMinSketch:
+    """Frequency estimates that never undercount, within total * e / width."""
+
+    def __init__(self, width: int = 512, depth: int = 4, table: Optional[np.ndarray] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            mixed = hashes[None, :] * _CMS_SEEDS[:self.depth, None]
+        return ((mixed >> np.uint64(32)) % np.uint64(self.width)).astype(np.intp)
+
+    def add_hashes(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        columns = self._columns(hashes)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], counts)
+
+    def estimate_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        self.table += other.table
+
+
+class TopK:
+    """The k keys with the highest Count-Min estimates, kept in a min-heap."""
+
+    def __init__(self, k: int = 20, items: Optional[Dict[str, int]] = None):
+        self.k = k
+        self.items: Dict[str, int] = dict(items or {})
+        self._heap: List[Tuple[int, str]] = [(v, key) for key, v in self.items.items()]
+        heapq.heapify(self._heap)
+
+    def offer(self, key: str, estimate: int) -> None:
+        if key not in self.items and len(self.items) >= self.k and estimate <= self._heap[0][0]:
+            return
+        self.items[key] = estimate
+        heapq.heappush(self._heap, (estimate, key))
+        while len(self.items) > self.k:
+            value, evicted = heapq.heappop(self._heap)
+            # Skip stale heap entries left behind by earlier updates
+            if self.items.get(evicted) == value:
+                del self.items[evicted]
+        while self._heap and self.items.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(v, key) for key, v in self.items.items()]
+            heapq.heapify(self._heap)
+
+    def top(self) -> List[Tuple[str, int]]:
+        return sorted(self.items.items(), key=lambda kv: (-kv[1], kv[0]))
+
+
+class HeavyHitters:
+    """Count-Min sketch plus the top-k keys it has seen."""
+
+    def __init__(self, width: int = 512, depth: int = 4, k: int = 20):
+        self.cms = CountMinSketch(width, depth)
+        self.topk = TopK(k)
+
+    def add(self, codes: np.ndarray, values: Sequence[str], counts: np.ndarray) -> None:
+        """
+        Count rows by key.
+
+        Args:
+            codes: Index into ``values`` per row (-1 where unknown)
+            values: Key per code
+            counts: Amount per row
+        """
+        known = codes >= 0
+        if not known.any():
+            return
+        # Pre-aggregate the batch so each distinct key is hashed and offered once
+        totals = np.bincount(codes[known], weights=counts[known], minlength=len(values)).astype(np.int64)
+        present = np.flatnonzero(totals)
+        keys = [values[i] for i in present]
+        hashes = hash64_many(keys)
+        self.cms.add_hashes(hashes, totals[present])
+        for key, estimate in zip(keys, self.cms.estimate_hashes(hashes)):
+            self.topk.offer(key, int(estimate))
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.cms.merge(other.cms)
+        candidates = set(self.topk.items) | set(other.topk.items)
+        keys = sorted(candidates)
+        estimates = self.cms.estimate_hashes(hash64_many(keys)) if keys else []
+        self.topk = TopK(self.topk.k)
+        for key, estimate in zip(keys, estimates):
+            self.topk.offer(key, int(estimate))
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        return self.topk.top()[:k]
+
+
+class TDigest:
+    """
+    Merging t-digest for quantiles of a stream of (value, weight) pairs.
+
+    Points are buffered and compressed in one vectorized pass: sorted points
+    are grouped into clusters whose span on the k1 scale (compression / 2pi *
+    asin(2q - 1)) is at most one, which keeps clusters small in the tails.
+    """
+
+    def __init__(self, compression: float = 100):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._buffered = 0
+
+    @property
+    def total(self) -> float:
+        self._compress()
+        return float(self.weights.sum())
+
+    def add(self, values: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered > 20 * self.compression:
+            self._compress()
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        values = np.concatenate([self.means] + [v for v, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self._buffer, self._buffered = [], 0
+
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q_left = (cumulative - weights) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        cluster = np.floor(k - k[0]).astype(np.intp)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(values * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._compress()
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        # Interpolate between centroid centres, pinned to the observed min and max
+        centres = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centres, self.weights.sum()]
+        values = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q * self.weights.sum(), positions, values))
+
+    def merge(self, other: "TDigest") -> None:
+        other._compress()
+        if len(other.means):
+            self.add(other.means, other.weights)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+
+class CampaignSketch:
+    """All sketches of one campaign for one time bucket."""
+
+    def __init__(self, hll_p: int = 12, cms_width: int = 512, cms_depth: int = 4, top_k: int = 20,
+                 compression: float = 100):
+        self.users = HyperLogLog(hll_p)
+        self.heavy = {d: HeavyHitters(cms_width, cms_depth, top_k) for d in DIMENSIONS}
+        self.ctr = TDigest(compression)
+
+    def update(self, user_hashes: Optional[np.ndarray], dimensions: Dict[str, Dimension],
+               impressions: np.ndarray, clicks: np.ndarray) -> None:
+        """
+        Add one campaign's rows from an ingested batch.
+
+        Args:
+            user_hashes: ``hash64`` of user ids (0 where unknown), or None
+            dimensions: Factorized creative/placement per row
+            impressions: Impressions per row
+            clicks: Clicks per row
+        """
+        if user_hashes is not None:
+            self.users.add_hashes(user_hashes[user_hashes != 0])
+        for dimension, (codes, values) in dimensions.items():
+            self.heavy[dimension].add(codes, values, impressions)
+        served = impressions > 0
+        if served.any():
+            self.ctr.add(clicks[served] / impressions[served], impressions[served])
+
+    def merge(self, other: "CampaignSketch") -> None:
+        self.users.merge(other.users)
+        for dimension in DIMENSIONS:
+            self.heavy[dimension].merge(other.heavy[dimension])
+        self.ctr.merge(other.ctr)
+
+    # ---------- serialization (for persistence and merging across processes) ----------
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        self.ctr._compress()
+        arrays = {
+            f"{prefix}users": self.users.registers,
+            f"{prefix}ctr_means": self.ctr.means,
+            f"{prefix}ctr_weights": self.ctr.weights,
+            f"{prefix}ctr_range": np.array([self.ctr.min, self.ctr.max]),
+        }
+        for dimension, heavy in self.heavy.items():
+            arrays[f"{prefix}{dimension}_cms"] = heavy.cms.table
+            arrays[f"{prefix}{dimension}_top"] = np.array(json.dumps(heavy.topk.items))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], prefix: str, top_k: int = 20,
+                    compression: float = 100) -> "CampaignSketch":
+        registers = np.array(arrays[f"{prefix}users"])
+        cms_depth, cms_width = arrays[f"{prefix}{DIMENSIONS[0]}_cms"].shape
+        sketch = cls(int(np.log2(len(registers))), cms_width, cms_depth, top_k, compression)
+        sketch.users.registers = registers
+        sketch.ctr.means = np.array(arrays[f"{prefix}ctr_means"])
+        sketch.ctr.weights = np.array(arrays[f"{prefix}ctr_weights"])
+        sketch.ctr.min, sketch.ctr.max = (float(x) for x in arrays[f"{prefix}ctr_range"])
+        for dimension, heavy in sketch.heavy.items():
+            heavy.cms.table = np.array(arrays[f"{prefix}{dimension}_cms"])
+            heavy.topk = TopK(top_k, json.loads(str(arrays[f"{prefix}{dimension}_top"])))
+        return sketch
+
+
+class SketchStore:
+    """
+    Per-campaign sketches in fixed-size time buckets.
+
+    Each campaign keeps at most ``retention_buckets`` buckets; older ones
+    are merged into a single "older" sketch, so memory per campaign is
+    bounded by ``retention_buckets + 1`` CampaignSketch instances.
+    """
+
+    def __init__(self, root: Optional[str] = "data/analytics/sketches",
+                 bucket_seconds: int = DEFAULT_BUCKET_SECONDS,
+                 retention_buckets: int = DEFAULT_RETENTION_BUCKETS,
+                 save_interval_seconds: float = DEFAULT_SAVE_INTERVAL_SECONDS):
+        """
+        Args:
+            root: Directory for persisted sketches (None keeps them in memory only)
+            bucket_seconds: Width of a time bucket
+            retention_buckets: Recent buckets kept separately per campaign
+            save_interval_seconds: Time between background saves (see ``start``)
+        """
+        self.root = root
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self.save_interval_seconds = save_interval_seconds
+        self._lock = threading.Lock()
+        # Serializes writers of the .npz files (background thread vs. shutdown)
+        self._save_lock = threading.Lock()
+        # campaign_id -> {bucket_start: sketch}; key None holds everything older
+        self._campaigns: Dict[str, Dict[Optional[int], CampaignSketch]] = {}
+        # Campaigns changed since their file was last written
+        self._dirty: Set[str] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if root:
+            os.makedirs(root, exist_ok=True)
+            self._load()
+
+    # ---------- writes ----------
+
+    def update(self, campaign_codes: np.ndarray, campaign_name: Callable[[int], str], ts: np.ndarray,
+               impressions: np.ndarray, clicks: np.ndarray, user_hashes: Optional[np.ndarray] = None,
+               dimensions: Optional[Dict[str, Dimension]] = None) -> None:
+        """
+        Add a batch of rows.
+
+        Args:
+            campaign_codes: Integer campaign code per row
+            campaign_name: Maps a code to its campaign id
+            ts: Epoch seconds per row
+            impressions: Impressions per row
+            clicks: Clicks per row
+            user_hashes: ``hash64`` of the user per row (0 where unknown)
+            dimensions: Factorized creative/placement per row
+        """
+        if len(ts) == 0:
+            return
+        dimensions = dimensions or {}
+        impressions = np.asarray(impressions)
+        clicks = np.asarray(clicks)
+        buckets = np.asarray(ts, dtype=np.int64) // self.bucket_seconds
+        # One integer key per (campaign, bucket) so grouping is a plain int sort
+        first_bucket = int(buckets.min())
+        span = int(buckets.max()) - first_bucket + 1
+        keys = np.asarray(campaign_codes, dtype=np.int64) * span + (buckets - first_bucket)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+
+        with self._lock:
+            for lo, hi in zip(starts, ends):
+                rows = order[lo:hi]
+                key = int(sorted_keys[lo])
+                bucket_start = (key % span + first_bucket) * self.bucket_seconds
+                campaign_id = campaign_name(key // span)
+                self._dirty.add(campaign_id)
+                sketch = self._bucket(campaign_id, bucket_start)
+                sketch.update(
+                    user_hashes[rows] if user_hashes is not None else None,
+                    {d: (codes[rows], values) for d, (codes, values) in dimensions.items()},
+                    impressions[rows],
+                    clicks[rows],
+                )
+
+    def _bucket(self, campaign_id: str, bucket_start: int) -> CampaignSketch:
+        buckets = self._campaigns.setdefault(campaign_id, {})
+        recent = sorted(b for b in buckets if b is not None)
+        if recent and bucket_start < recent[0] and len(recent) >= self.retention_buckets:
+            # Late data for a bucket that was already folded away
+            return buckets.setdefault(None, CampaignSketch())
+        sketch = buckets.get(bucket_start)
+        if sketch is None:
+            sketch = buckets[bucket_start] = CampaignSketch()
+            recent.append(bucket_start)
+            recent.sort()
+            for expired in recent[:-self.retention_buckets]:
+                older = buckets.setdefault(None, CampaignSketch())
+                older.merge(buckets.pop(expired))
+        return sketch
+
+    def merge_from(self, other: "SketchStore") -> None:
+        """Fold another store (e.g. from a worker process) into this one."""
+        with self._lock:
+            for campaign_id, buckets in other._campaigns.items():
+                self._dirty.add(campaign_id)
+                for bucket_start, sketch in buckets.items():
+                    target = (self._campaigns.setdefault(campaign_id, {}).setdefault(None, CampaignSketch())
+                              if bucket_start is None else self._bucket(campaign_id, bucket_start))
+                    target.merge(sketch)
+
+    # ---------- reads ----------
+
+    def merged(self, campaign_id: str, start: Optional[int] = None,
+               end: Optional[int] = None) -> Optional[CampaignSketch]:
+        """
+        One sketch covering the buckets of a campaign that overlap ``[start, end)``.
+
+        The "older" accumulator is included whenever ``start`` reaches past the
+        retained buckets. Returns None for campaigns with no sketches.
+        """
+        with self._lock:
+            buckets = self._campaigns.get(campaign_id)
+            if not buckets:
+                return None
+            recent = [b for b in buckets if b is not None]
+            oldest = min(recent) if recent else None
+            result = CampaignSketch()
+            for bucket_start, sketch in buckets.items():
+                if bucket_start is None:
+                    if start is None or oldest is None or start < oldest:
+                        result.merge(sketch)
+                elif ((start is None or bucket_start + self.bucket_seconds > start)
+                      and (end is None or bucket_start < end)):
+                    result.merge(sketch)
+            return result
+
+    def memory_bytes(self, campaign_id: str) -> int:
+        """Approximate bytes held by one campaign's sketches."""
+        with self._lock:
+            total = 0
+            for sketch in self._campaigns.get(campaign_id, {}).values():
+                total += sketch.users.registers.nbytes + sketch.ctr.means.nbytes + sketch.ctr.weights.nbytes
+                total += sum(h.cms.table.nbytes for h in sketch.heavy.values())
+            return total
+
+    # ---------- persistence ----------
+
+    def _campaign_file(self, campaign_id: str) -> str:
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in campaign_id)
+        return os.path.join(self.root, f"{safe}.npz")
+
+    def save(self) -> int:
+        """
+        Write the sketches of campaigns changed since the last save to ``root``
+        (one .npz per campaign).
+
+        Returns:
+            Number of campaign files written
+        """
+        if not self.root:
+            return 0
+        with self._save_lock:
+            # Copy under the lock, compress and write outside it so ingest is not held up
+            with self._lock:
+                snapshots = []
+                for campaign_id in self._dirty:
+                    arrays: Dict[str, Any] = {"campaign_id": np.array(campaign_id)}
+                    for bucket_start, sketch in self._campaigns.get(campaign_id, {}).items():
+                        prefix = f"{'older' if bucket_start is None else bucket_start}/"
+                        arrays.update({k: np.array(v) for k, v in sketch.to_arrays(prefix).items()})
+                    snapshots.append((campaign_id, arrays))
+                self._dirty = set()
+            for i, (campaign_id, arrays) in enumerate(snapshots):
+                try:
+                    tmp = self._campaign_file(campaign_id) + ".tmp.npz"
+                    np.savez_compressed(tmp, **arrays)
+                    os.replace(tmp, self._campaign_file(campaign_id))
+                except Exception:
+                    # Keep the unwritten campaigns for the next save
+                    with self._lock:
+                        self._dirty.update(c for c, _ in snapshots[i:])
+                    raise
+            return len(snapshots)
+
+    def start(self) -> None:
+        """Save changed campaigns every ``save_interval_seconds`` on a daemon thread."""
+        if not self.root or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="sketch-saver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write out whatever changed since its last run."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.save_interval_seconds)
+        self.save()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.save_interval_seconds):
+            try:
+                self.save()
+            except Exception:
+                logger.exception("Saving analytics sketches failed")
+
+    def _load(self) -> None:
+        for name in os.listdir(self.root):
+            if not name.endswith(".npz") or name.endswith(".tmp.npz"):
+                continue
+            with np.load(os.path.join(self.root, name)) as data:
+                arrays = {key: data[key] for key in data.files}
+            campaign_id = str(arrays.pop("campaign_id"))
+            prefixes = {key.split("/", 1)[0] for key in arrays}
+            self._campaigns[campaign_id] = {
+                (None if prefix == "older" else int(prefix)): CampaignSketch.from_arrays(arrays, f"{prefix}/")
+                for prefix in prefixes
+            }
@@ -0,0 +1,94 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for chart downsampling.
+
+Checks that LTTB keeps the first and last points and a spike, that minmax
+keeps the extremes of every bucket, that sum preserves totals exactly, that
+no method returns more than max_points points, and that source_granularity
+picks the coarsest granularity that still has max_points buckets.
+"""
+
+import numpy as np
+
+from backend.analytics.downsample import METHODS, downsample, lttb_indices, minmax_indices, source_granularity
+from backend.analytics.store import GRANULARITIES, bucket_count
+
+DAY = 86400
+
+def _series(n=10_000, spike=6_543):
+    rng = np.random.default_rng(3)
+    impressions = rng.integers(100, 120, n).astype(np.float64)
+    impressions[spike] = 5_000
+    return {
+        "bucket_start": np.arange(n, dtype=np.int64) * 60,
+        "impressions": impressions,
+        "clicks": rng.integers(0, 10, n).astype(np.float64),
+    }
+
+def test_lttb_keeps_ends_and_spike():
+    series = _series()
+    keep = lttb_indices(series["bucket_start"], series["impressions"], 50)
+    assert len(keep) == 50 and keep[0] == 0 and keep[-1] == 9_999
+    assert 6_543 in keep
+    assert np.all(np.diff(keep) > 0)
+
+    result, source_points = downsample(series, 50, "lttb")
+    assert source_points == 10_000 and result["impressions"].max() == 5_000
+    # Other metrics follow the points chosen for the primary one
+    assert result["clicks"].tolist() == series["clicks"][keep].tolist()
+
+def test_minmax_keeps_bucket_extremes():
+    y = _series()["impressions"]
+    keep = minmax_indices(y, 40)
+    assert len(keep) <= 40 and np.all(np.diff(keep) > 0)
+    bucket = (np.arange(len(y)) * 20) // len(y)
+    for b in range(20):
+        kept = y[keep[bucket[keep] == b]]
+        assert kept.min() == y[bucket == b].min() and kept.max() == y[bucket == b].max(), b
+
+def test_sum_preserves_totals():
+    series = _series()
+    result, _ = downsample(series, 333, "sum")
+    assert len(result["bucket_start"]) <= 333 and result["bucket_start"][0] == 0
+    for m in ("impressions", "clicks"):
+        assert result[m].sum() == series[m].sum()
+
+def test_at_most_max_points():
+    series = _series(n=1_000, spike=654)
+    for method in METHODS:
+        for max_points in (3, 4, 7, 100, 999):
+            result, _ = downsample(series, max_points, method)
+            assert all(len(v) <= max_points for v in result.values()), (method, max_points)
+        result, source_points = downsample(series, 1_000, method)
+        assert result is series and source_points == 1_000
+    try:
+        downsample(series, 10, "median")
+        assert False, "unknown method accepted"
+    except ValueError:
+        pass
+
+def test_source_granularity():
+    start, end = 0, 90 * DAY
+    assert source_granularity(start, end, "minute", 1000) == "hour"
+    assert source_granularity(start, end, "minute", 50) == "day"
+    assert source_granularity(start, end, "minute", 10) == "week"
+    assert source_granularity(start, end, "minute", 3) == "month"
+    # Never finer than asked for, even when that has fewer buckets
+    assert source_granularity(start, end, "day", 1000) == "day"
+    assert source_granularity(start, end, "month", 1000) == "month"
+
+    names = list(GRANULARITIES)
+    for max_points in (3, 10, 50, 100, 1000, 5000):
+        chosen = source_granularity(start, end, "minute", max_points)
+        assert chosen == "minute" or bucket_count(start, end, chosen) >= max_points
+        coarser = names[names.index(chosen) + 1:]
+        assert not coarser or bucket_count(start, end, coarser[0]) < max_points
+
+if __name__ == "__main__":
+    test_lttb_keeps_ends_and_spike()
+    test_minmax_keeps_bucket_extremes()
+    test_sum_preserves_totals()
+    test_at_most_max_points()
+    test_source_granularity()
@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for analytics ingest.
+
+Checks NDJSON decoding (ISO timestamps without an offset are UTC), that
+binary batches survive an encode/decode round-trip, that invalid counts and
+unknown campaigns reject the whole batch without registering its campaigns,
+and that a full IngestBuffer refuses batches, which the API answers with 429.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # agent modules create the client on import; no call is made
+
+import backend.main as main
+from backend.analytics.ingest import (
+    BINARY_CONTENT_TYPE, IngestBuffer, IngestError, decode_batch, decode_binary, decode_ndjson, encode_binary,
+)
+from backend.analytics.store import EventStore
+
+def _rejected(decode, *args):
+    try:
+        decode(*args)
+    except IngestError as e:
+        return str(e)
+    assert False, "invalid batch accepted"
+
+def test_decode_ndjson():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        body = b"\n".join([
+            b'{"ts": 1735689600, "campaign_id": "cam_1", "impressions": 120, "clicks": 4}',
+            b"",
+            b'{"ts": "2025-01-01T01:00:00", "campaign_id": "cam_2", "event": "conversion", "count": 2}',
+            b'{"ts": "2025-01-01T01:00:00+01:00", "campaign_id": "cam_1", "event": "click", "user_id": "u1"}',
+        ])
+        batch = decode_ndjson(body, store)
+        assert batch.ts.tolist() == [1735689600, 1735693200, 1735689600]
+        assert [store.campaign_name(c) for c in batch.codes] == ["cam_1", "cam_2", "cam_1"]
+        assert batch.metrics["impressions"].tolist() == [120, 0, 0]
+        assert batch.metrics["clicks"].tolist() == [4, 0, 1]
+        assert batch.metrics["conversions"].tolist() == [0, 2, 0]
+        assert batch.user_hashes is not None and batch.user_hashes[:2].tolist() == [0, 0]
+
+        assert len(decode_ndjson(b"\n \n", store)) == 0
+        assert "Malformed" in _rejected(decode_ndjson, b'{"campaign_id": ', store)
+        assert "line 2" in _rejected(decode_ndjson, b'{"campaign_id": "a"}\n{"clicks": 1}', store)
+        assert "content type" in _rejected(decode_batch, body, "text/plain", store)
+
+def test_binary_round_trip():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        ts = np.array([1735689600, 1735689660, 1735689720], dtype=np.int64)
+        metrics = {"impressions": np.array([10, 20, 30]), "clicks": np.array([1, 0, 2])}
+        body = encode_binary(["cam_a", "cam_ü"], ts, np.array([1, 0, 1]), metrics)
+
+        batch = decode_batch(body, BINARY_CONTENT_TYPE, store)
+        assert batch.ts.tolist() == ts.tolist()
+        assert [store.campaign_name(c) for c in batch.codes] == ["cam_ü", "cam_a", "cam_ü"]
+        assert batch.metrics["impressions"].tolist() == [10, 20, 30]
+        assert batch.metrics["clicks"].tolist() == [1, 0, 2]
+        assert batch.metrics["conversions"].tolist() == [0, 0, 0]
+
+        assert len(decode_binary(encode_binary([], np.empty(0, np.int64), np.empty(0), {}), store)) == 0
+        assert "magic" in _rejected(decode_binary, b"XXXX" + body[4:], store)
+        assert "declares" in _rejected(decode_binary, body[:-1], store)
+        bad_index = encode_binary(["cam_a"], ts[:1], np.array([3]), {})
+        assert "campaign index" in _rejected(decode_binary, bad_index, store)
+
+def test_invalid_batches_register_no_campaigns():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        store.campaign_code("known")
+        assert "between 0 and" in _rejected(
+            decode_ndjson, b'{"campaign_id": "known"}\n{"campaign_id": "new", "clicks": -1}', store)
+        assert "between 0 and" in _rejected(
+            decode_ndjson, b'{"campaign_id": "new", "impressions": 4294967296}', store)
+
+        is_known = lambda campaign_id: campaign_id == "listed"
+        message = _rejected(decode_ndjson, b'{"campaign_id": "listed"}\n{"campaign_id": "made_up"}', store, is_known)
+        assert "made_up" in message and "listed" not in message
+        body = encode_binary(["known", "made_up"], np.zeros(2, np.int64), np.array([0, 1]), {})
+        assert "made_up" in _rejected(decode_binary, body, store, is_known)
+        assert store.campaign_ids() == ["known"]
+
+        # Campaigns the store already has and those the caller knows are accepted
+        batch = decode_ndjson(b'{"campaign_id": "known"}\n{"campaign_id": "listed"}', store, is_known)
+        assert len(batch) == 2 and store.campaign_ids() == ["known", "listed"]
+
+def test_full_buffer_answers_429():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        buffer = IngestBuffer(store, capacity=3, commit_interval=1.0)
+        two = decode_ndjson(b'{"campaign_id": "c", "clicks": 1}\n{"campaign_id": "c", "clicks": 1}', store)
+        assert buffer.offer(two)
+        assert not buffer.offer(two) and buffer.pending == 2  # refused whole, nothing half-queued
+        assert buffer.commit() == 2 and buffer.pending == 0
+        assert buffer.offer(two)
+
+        real = main.event_store, main.ingest_buffer, main.REQUIRE_KNOWN_CAMPAIGNS
+        main.event_store, main.ingest_buffer, main.REQUIRE_KNOWN_CAMPAIGNS = store, buffer, False
+        try:
+            client = TestClient(main.app)
+            headers = {"Content-Type": "application/x-ndjson"}
+            ok = client.post("/api/analytics/events", content=b'{"campaign_id": "c"}', headers=headers)
+            assert ok.status_code == 202 and ok.json() == {"accepted": 1}
+            assert ok.headers["x-ingest-buffered"] == "3"
+
+            full = client.post("/api/analytics/events", content=b'{"campaign_id": "c"}', headers=headers)
+            assert full.status_code == 429 and full.json()["accepted"] == 0
+            assert full.headers["retry-after"] == "2" and full.headers["x-ingest-capacity"] == "3"
+
+            too_big = client.post("/api/analytics/events", content=b'{"campaign_id": "c"}\n' * 4, headers=headers)
+            assert too_big.status_code == 413
+            bad = client.post("/api/analytics/events", content=b'{"clicks": 1}', headers=headers)
+            assert bad.status_code == 400
+        finally:
+            main.event_store, main.ingest_buffer, main.REQUIRE_KNOWN_CAMPAIGNS = real
+        assert buffer.commit() == 3
+
+if __name__ == "__main__":
+    test_decode_ndjson()
+    test_binary_round_trip()
+    test_invalid_batches_register_no_campaigns()
+    test_full_buffer_answers_429()
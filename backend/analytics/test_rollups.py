@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the analytics rollups.
+
+Checks that a rebuild racing with appends counts every batch exactly once,
+whether the batch's listener call lands before, during or after the recount.
+"""
+
+import tempfile
+import threading
+
+import numpy as np
+
+from backend.analytics.rollups import AnalyticsRollups
+from backend.analytics.store import METRICS, EventStore
+
+def _batch(store, campaign_id, n):
+    code = store.campaign_code(campaign_id)
+    ts = np.arange(n, dtype=np.int64) + 1_700_000_000
+    return ts, np.full(n, code, dtype=np.int32), {m: np.ones(n, dtype=np.int64) for m in METRICS}
+
+def test_late_listener_is_not_double_counted():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root, segment_rows=1000)
+        rollups = AnalyticsRollups(store)
+
+        # Hold the listener call back until a rebuild has already counted the batch
+        release = threading.Event()
+        store._listeners = [lambda codes, cols, first_row: (release.wait(), rollups._on_append(codes, cols, first_row))]
+        writer = threading.Thread(target=store.append, args=_batch(store, "c1", 10))
+        writer.start()
+        while store.campaign_totals()[1] < 10:
+            pass
+        rollups.rebuild(check=False)
+        release.set()
+        writer.join()
+
+        assert rollups.totals()["impressions"] == 10
+        assert rollups.campaign_totals("c1")["clicks"] == 10
+
+def test_append_during_recount_is_carried_over():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root, segment_rows=1000)
+        rollups = AnalyticsRollups(store)
+        store.append(*_batch(store, "c1", 5))
+
+        # Land a batch between the recount's snapshot and the totals swap
+        recount = store.campaign_totals
+        def racing_totals():
+            result = recount()
+            store.append(*_batch(store, "c2", 7))
+            return result
+        store.campaign_totals = racing_totals
+        report = rollups.rebuild()
+        store.campaign_totals = recount
+
+        assert report["drift"] == []
+        assert rollups.totals()["conversions"] == 12
+        assert rollups.campaign_totals("c2")["impressions"] == 7
+        assert rollups.rebuild()["drift"] == []
+
+def test_set_status_registers_campaign():
+    with tempfile.TemporaryDirectory() as root:
+        rollups = AnalyticsRollups(EventStore(root))
+        rollups.set_status("c1", "active")
+        rollups.set_status("c1", "completed")
+        assert rollups.status_counts() == {"completed": 1}
+
+if __name__ == "__main__":
+    test_late_listener_is_not_double_counted()
+    test_append_during_recount_is_carried_over()
+    test_set_status_registers_campaign()
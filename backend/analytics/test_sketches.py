@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the analytics sketches.
+
+Checks HyperLogLog estimates against their error bound, Count-Min top-k
+against exact counts on skewed data, t-digest quantiles against exact ones,
+and that the background saver persists changed campaigns without a shutdown.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from backend.analytics.sketches import HeavyHitters, HyperLogLog, SketchStore, TDigest, hash64_many
+
+def test_hll_within_error_bound():
+    for n in (1_000, 50_000):
+        hll = HyperLogLog(12)
+        users = hash64_many(f"user-{i}" for i in range(n))
+        hll.add_hashes(users)
+        hll.add_hashes(users[: n // 2])  # repeats do not count
+        assert abs(hll.estimate() - n) / n < 3 * hll.relative_error
+
+        other = HyperLogLog(12)
+        other.add_hashes(hash64_many(f"user-{i}" for i in range(n, 2 * n)))
+        hll.merge(other)
+        assert abs(hll.estimate() - 2 * n) / (2 * n) < 3 * hll.relative_error
+
+def test_cms_top_k_on_skewed_counts():
+    rng = np.random.default_rng(7)
+    values = [f"creative-{i}" for i in range(2000)]
+    codes = np.minimum(rng.zipf(1.3, 100_000) - 1, len(values) - 1)
+    counts = rng.integers(1, 5, len(codes))
+    exact = np.bincount(codes, weights=counts, minlength=len(values)).astype(np.int64)
+
+    heavy = HeavyHitters(width=512, depth=4, k=10)
+    for chunk in np.array_split(np.arange(len(codes)), 10):
+        heavy.add(codes[chunk], values, counts[chunk])
+
+    top = heavy.top()
+    expected = [values[i] for i in np.argsort(-exact, kind="stable")[:5]]
+    assert [key for key, _ in top[:5]] == expected
+    for key, estimate in top:
+        true = exact[values.index(key)]
+        # Never undercounts, and overcounts by at most total * e / width
+        assert true <= estimate <= true + np.e / 512 * exact.sum()
+
+def test_tdigest_quantiles():
+    rng = np.random.default_rng(3)
+    values = rng.lognormal(-3, 1, 200_000)
+    weights = rng.integers(1, 100, len(values)).astype(np.float64)
+    digest = TDigest(100)
+    for chunk in np.array_split(np.arange(len(values)), 20):
+        digest.add(values[chunk], weights[chunk])
+
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order]) / weights.sum()
+    for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+        estimate = digest.quantile(q)
+        # Compare in rank space: the estimate's true quantile is close to q
+        rank = cumulative[min(np.searchsorted(values[order], estimate), len(values) - 1)]
+        assert abs(rank - q) < 0.01, (q, rank)
+    assert digest.quantile(0) == values.min() and digest.quantile(1) == values.max()
+    assert len(digest.means) < 200
+
+def test_background_save_persists_changes():
+    with tempfile.TemporaryDirectory() as root:
+        store = SketchStore(root, save_interval_seconds=0.05)
+        store.start()
+        try:
+            names = ["c1", "c2"]
+            store.update(np.array([0, 0, 1]), names.__getitem__, np.array([0, 86400, 0]),
+                         np.array([10, 20, 30]), np.array([1, 2, 3]),
+                         user_hashes=hash64_many(["u1", "u2", "u3"]))
+            deadline = time.time() + 5
+            files = [store._campaign_file(c) for c in names]
+            while not all(os.path.exists(f) for f in files) and time.time() < deadline:
+                time.sleep(0.01)
+
+            # No shutdown: a new process would load what the background thread wrote
+            reloaded = SketchStore(root)
+            assert round(reloaded.merged("c1").users.estimate()) == 2
+            assert reloaded.merged("c2").ctr.total == 30
+            assert store.save() == 0  # nothing changed since
+        finally:
+            store.stop()
+
+if __name__ == "__main__":
+    test_hll_within_error_bound()
+    test_cms_top_k_on_skewed_counts()
+    test_tdigest_quantiles()
+    test_background_save_persists_changes()
@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the event store's aggregates and their cache.
+
+Checks day, week and month sums against a brute-force sum over the raw
+events (ranges starting and ending mid-hour, so both the hourly rollups and
+the raw rows are read), campaign filtering and the MAX_BUCKETS limit, that
+appends outside a cached query's time range keep the cached result, appends
+inside it replace the result, and that concurrent queries and appends do not
+trip over the LRU bookkeeping.
+"""
+
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.analytics.store import AGGREGATE_CACHE_SIZE, MAX_BUCKETS, METRICS, EventStore
+
+DAY = 86400
+
+def _append(store, day, n=10, campaign_id="c1"):
+    code = store.campaign_code(campaign_id)
+    ts = np.full(n, day * DAY + 3600, dtype=np.int64)
+    store.append(ts, np.full(n, code), {"impressions": np.ones(n), "clicks": np.ones(n)})
+
+def _bucket(ts, granularity):
+    day = datetime.fromtimestamp(int(ts), tz=timezone.utc).replace(hour=0, minute=0, second=0)
+    if granularity == "week":
+        day -= timedelta(days=day.weekday())
+    elif granularity == "month":
+        day = day.replace(day=1)
+    return int(day.timestamp())
+
+def _brute_force(events, start, end, granularity, campaign_ids=None):
+    sums = {}
+    for ts, campaign_id, counts in events:
+        if start <= ts < end and (campaign_ids is None or campaign_id in campaign_ids):
+            bucket = sums.setdefault(_bucket(ts, granularity), dict.fromkeys(METRICS, 0))
+            for m in METRICS:
+                bucket[m] += counts[m]
+    return sums
+
+def _random_store(root):
+    rng = np.random.default_rng(7)
+    store = EventStore(root, segment_rows=3000)
+    events = []
+    for _ in range(10):
+        n = 1000
+        ts = rng.integers(0, 100 * DAY, n)
+        campaign_ids = rng.choice(["c1", "c2", "c3"], n)
+        counts = {m: rng.integers(0, 50, n) for m in METRICS}
+        store.append(ts, [store.campaign_code(c) for c in campaign_ids], counts)
+        events += [(int(ts[i]), campaign_ids[i], {m: int(counts[m][i]) for m in METRICS}) for i in range(n)]
+    return store, events
+
+def test_aggregate_matches_brute_force():
+    with tempfile.TemporaryDirectory() as root:
+        store, events = _random_store(root)
+        assert len(store.segments()) == 4  # three sealed with rollups, the rest still unsealed
+
+        ranges = [
+            (0, 100 * DAY),
+            (3 * DAY + 1234, 61 * DAY + 5 * 3600 + 17),  # starts and ends mid-hour
+            (10 * DAY + 7200, 40 * DAY),  # hour-aligned start
+            (20 * DAY + 600, 20 * DAY + 3000),  # inside one hour: raw rows only
+        ]
+        for start, end in ranges:
+            for granularity in ("day", "week", "month"):
+                for campaign_ids in (None, ["c1", "c3"]):
+                    result = store.aggregate(start, end, granularity, campaign_ids=campaign_ids)
+                    expected = _brute_force(events, start, end, granularity, campaign_ids)
+                    buckets = result["bucket_start"].tolist()
+                    assert set(expected) <= set(buckets), (start, end, granularity)
+                    for m in METRICS:
+                        got = {b: v for b, v in zip(buckets, result[m].tolist()) if v}
+                        want = {b: v[m] for b, v in expected.items() if v[m]}
+                        assert got == want, (start, end, granularity, campaign_ids, m)
+
+def test_campaign_filter_and_bucket_limit():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        _append(store, 0, campaign_id="c1")
+        _append(store, 0, n=5, campaign_id="c2")
+        assert store.aggregate(0, DAY, "day", campaign_ids=["c2"])["impressions"].tolist() == [5]
+        assert store.aggregate(0, DAY, "day", campaign_ids=["c1", "c2"])["impressions"].tolist() == [15]
+        assert store.aggregate(0, DAY, "day", campaign_ids=["nope"])["impressions"].tolist() == [0]
+        assert store.aggregate(0, DAY, "day", campaign_ids=[])["impressions"].tolist() == [0]
+        codes = len(store.campaign_ids())
+        store.aggregate(0, DAY, "day", campaign_ids=["nope"])
+        assert len(store.campaign_ids()) == codes  # filtering does not register campaigns
+
+        assert len(store.aggregate(0, MAX_BUCKETS * 60, "minute")["bucket_start"]) == MAX_BUCKETS
+        for granularity, step in (("minute", 60), ("hour", 3600)):
+            try:
+                store.aggregate(0, (MAX_BUCKETS + 1) * step, granularity)
+                assert False, "oversized range accepted"
+            except ValueError as e:
+                assert "at most" in str(e)
+
+def test_cache_survives_appends_outside_range():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        _append(store, 0)
+        _append(store, 5)
+
+        first = store.aggregate(0, 2 * DAY, "day")
+        _append(store, 5)  # ingest keeps writing "today"
+        assert store.aggregate(0, 2 * DAY, "day") is first
+
+        _append(store, 1)
+        updated = store.aggregate(0, 2 * DAY, "day")
+        assert updated is not first
+        assert updated["impressions"].tolist() == [10, 10]
+        assert store.aggregate(0, 7 * DAY, "day")["clicks"].sum() == 40
+
+def test_concurrent_queries_and_appends():
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root, segment_rows=500)
+        errors = []
+
+        def query(offset):
+            try:
+                for i in range(300):
+                    start = ((i + offset) % (AGGREGATE_CACHE_SIZE + 20)) * DAY
+                    store.aggregate(start, start + DAY, "hour")
+            except Exception as e:
+                errors.append(e)
+
+        def write():
+            for day in range(200):
+                _append(store, day)
+
+        threads = [threading.Thread(target=query, args=(k,)) for k in range(4)] + [threading.Thread(target=write)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        assert store.aggregate(0, 200 * DAY, "day")["impressions"].sum() == 2000
+
+if __name__ == "__main__":
+    test_aggregate_matches_brute_force()
+    test_campaign_filter_and_bucket_limit()
+    test_cache_survives_appends_outside_range()
+    test_concurrent_queries_and_appends()
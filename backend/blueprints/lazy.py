@@ -0,0 +1,346 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/blueprints/lazy.py
+
+Need for this file (5th-grader explanation):
+"Instead of drawing the whole family tree before showing anything, we draw
+grandma and her kids right away. When you tap on one of the kids, we draw
+that kid's family. And while you are looking, we quietly start drawing the
+families people tap on most, so they are ready when you get there."
+
+LazyBlueprints serves a blueprint one level at a time:
+
+- ``open()`` returns L0 and its L1 processes (one small LLM call);
+- ``expand(node_id)`` returns a node's subitems, generating them on first
+  request (an L2 activity is expanded into L3 tasks and their L4 subtasks
+  in one call) and caching them per node id;
+- after every answer the most requested branches are expanded in the
+  background. Requests are counted per function and item name path (e.g.
+  "Develop Strategy / Define Segments"), so the counts carry over across
+  sessions, restarts and regenerated blueprints; ties keep tree order.
+
+Node ids are paths: ``0`` is L0, ``0.2`` its third process, ``0.2.1`` that
+process's second activity, and so on. Each blueprint's nodes are saved to
+one JSON file, so expansions survive restarts and are shared by sessions.
+Blueprints follow the BlueprintStore they are given: ``open()`` regenerates
+one older than the store's ``max_age_seconds`` (or on ``refresh``), and the
+store's ``invalidate()`` drops matching blueprints here too.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.observability.metrics import record_cache_lookup
+
+from .store import DEFAULT_MAX_AGE_SECONDS, BlueprintStore, key_id
+
+logger = logging.getLogger("blueprint_maker.lazy_blueprints")
+
+DEFAULT_STORAGE_DIR = "data/blueprints/lazy"
+DEFAULT_PREFETCH_BRANCHES = 2
+DEFAULT_PREFETCH_WORKERS = 2
+
+ROOT_ID = "0"
+LAST_LEVEL = 4
+
+HITS_FILE = "hits.json"
+
+# outline(request) -> L0 item with L1 subitems; request holds the caller's
+# function_name, framework and context as typed (the key is casefolded)
+OutlineFn = Callable[[Dict[str, str]], Dict[str, Any]]
+# expand(request, lineage below L0, level) -> subitems of lineage[-1]
+ExpandFn = Callable[[Dict[str, str], List[Dict[str, Any]], str], List[Dict[str, Any]]]
+
+
+def _fields(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in item.items() if k != "subitems"}
+
+
+def _subitems(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    subs = item.get("subitems")
+    if subs is None:
+        return []
+    return [s for s in (subs if isinstance(subs, list) else [subs]) if isinstance(s, dict)]
+
+
+class LazyBlueprints:
+    """On-demand, per-node blueprint expansion with background prefetch."""
+
+    def __init__(self, outline: OutlineFn, expand: ExpandFn, storage_dir: str = DEFAULT_STORAGE_DIR,
+                 prefetch_branches: int = DEFAULT_PREFETCH_BRANCHES,
+                 prefetch_workers: int = DEFAULT_PREFETCH_WORKERS, store: Optional[BlueprintStore] = None):
+        """
+        Args:
+            outline: Generates L0 with its L1 subitems
+            expand: Generates the subitems of one node
+            storage_dir: Directory with one JSON file per blueprint
+            prefetch_branches: Nodes expanded in the background after each answer (0 disables)
+            prefetch_workers: Concurrent background expansions
+            store: Blueprint store whose max age and invalidations apply here too
+        """
+        self.outline = outline
+        self.expand_fn = expand
+        self.storage_dir = storage_dir
+        self.prefetch_branches = prefetch_branches
+        self.max_age_seconds = store.max_age_seconds if store is not None else DEFAULT_MAX_AGE_SECONDS
+        os.makedirs(storage_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        # Expansion requests per function and item name path, across blueprints
+        self._hits_file = os.path.join(storage_dir, HITS_FILE)
+        self._hits: Dict[str, int] = {}
+        if os.path.exists(self._hits_file):
+            with open(self._hits_file, "r", encoding="utf-8") as f:
+                self._hits = json.load(f)
+        self._node_locks: Dict[str, threading.Lock] = {}
+        self._pending: set = set()
+        self._prefetcher = ThreadPoolExecutor(max_workers=max(1, prefetch_workers),
+                                              thread_name_prefix="blueprint-prefetch")
+        if store is not None:
+            store.add_invalidation_listener(self.invalidate)
+
+    # ---------- persistence ----------
+
+    def _path(self, blueprint_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{blueprint_id}.json")
+
+    def _state(self, blueprint_id: str) -> Optional[Dict[str, Any]]:
+        state = self._states.get(blueprint_id)
+        path = self._path(blueprint_id)
+        if state is None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            # Files written before blueprints expired date from their last write
+            state.setdefault("created_at", os.path.getmtime(path))
+            self._states[blueprint_id] = state
+        return state
+
+    def _save(self, blueprint_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._states.get(blueprint_id) is not state:
+                # Dropped (expired or invalidated) while an expansion was running
+                return
+            data = json.dumps(state, separators=(",", ":"))
+        tmp = self._path(blueprint_id) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self._path(blueprint_id))
+
+    def _drop(self, blueprint_id: str) -> None:
+        with self._lock:
+            self._states.pop(blueprint_id, None)
+        try:
+            os.remove(self._path(blueprint_id))
+        except FileNotFoundError:
+            pass
+
+    def _save_hits(self) -> None:
+        with self._lock:
+            data = json.dumps(self._hits, separators=(",", ":"))
+        tmp = self._hits_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self._hits_file)
+
+    def _node_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            lock = self._node_locks.get(name)
+            if lock is None:
+                lock = self._node_locks[name] = threading.Lock()
+            return lock
+
+    # ---------- views ----------
+
+    def _view(self, state: Dict[str, Any], node_id: str, depth: int) -> Dict[str, Any]:
+        node = state["nodes"][node_id]
+        view = {**node, "id": node_id}
+        children = state["children"].get(node_id)
+        view["expandable"] = children is None and int(node["level"][1]) < LAST_LEVEL
+        if children is not None and depth > 0:
+            view["subitems"] = [self._view(state, c, depth - 1) for c in children]
+        elif children is not None:
+            view["subitems"] = []
+        return view
+
+    # ---------- API ----------
+
+    def open(self, key: Dict[str, str], request: Dict[str, str], refresh: bool = False) -> Dict[str, Any]:
+        """
+        L0 and L1 of a blueprint, generating them on first use.
+
+        Args:
+            key: Result of ``normalize_key``
+            request: function_name, framework and context passed to the generators
+            refresh: Drop the stored blueprint (and its expansions) and generate it again
+
+        Returns:
+            {"blueprint_id", "levels": {"L0": [...], "L1": [...]}}; every item has
+            ``id``, ``level`` and ``expandable``
+        """
+        blueprint_id = key_id(key)
+        state = self._state(blueprint_id)
+        if state is not None and (refresh or time.time() - state["created_at"] >= self.max_age_seconds):
+            self._drop(blueprint_id)
+            state = None
+        record_cache_lookup("blueprint_outline", state is not None)
+        if state is None:
+            with self._node_lock(blueprint_id):
+                state = self._state(blueprint_id)
+                if state is None:
+                    root = self.outline(request)
+                    state = {"key": key, "request": request, "created_at": time.time(), "nodes": {}, "children": {}}
+                    self._add(state, ROOT_ID, root, 0)
+                    with self._lock:
+                        self._states[blueprint_id] = state
+                    self._save(blueprint_id, state)
+
+        with self._lock:
+            root = self._view(state, ROOT_ID, 1)
+        self._prefetch(blueprint_id, state["children"].get(ROOT_ID, []))
+        return {"blueprint_id": blueprint_id, "levels": {"L0": [root], "L1": root.get("subitems", [])}}
+
+    def expand(self, key: Dict[str, str], node_id: str) -> List[Dict[str, Any]]:
+        """
+        Subitems of a node (with their own subitems when already known).
+
+        Raises:
+            KeyError: If the blueprint was never opened or the node does not exist
+        """
+        blueprint_id = key_id(key)
+        state = self._state(blueprint_id)
+        if state is None or node_id not in state["nodes"]:
+            raise KeyError(f"Unknown blueprint node: {node_id}")
+        with self._lock:
+            name = self._name_path(state, node_id)
+            self._hits[name] = self._hits.get(name, 0) + 1
+        self._save_hits()
+        cached = node_id in state["children"]
+        record_cache_lookup("blueprint_node", cached)
+        if not cached:
+            self._expand_node(blueprint_id, state, node_id)
+
+        with self._lock:
+            children = self._view(state, node_id, 2).get("subitems", [])
+        self._prefetch(blueprint_id, [c["id"] for c in children])
+        return children
+
+    # ---------- expansion ----------
+
+    def _add(self, state: Dict[str, Any], node_id: str, item: Dict[str, Any], level: int) -> None:
+        """Register a node and (recursively) any subitems it came with. Call with the lock held or before sharing."""
+        state["nodes"][node_id] = {**_fields(item), "level": f"L{level}"}
+        subs = _subitems(item)
+        if subs or level == LAST_LEVEL:
+            state["children"][node_id] = [f"{node_id}.{i}" for i in range(len(subs))]
+            for i, sub in enumerate(subs):
+                self._add(state, f"{node_id}.{i}", sub, level + 1)
+
+    def _lineage(self, state: Dict[str, Any], node_id: str) -> List[Dict[str, Any]]:
+        parts = node_id.split(".")
+        # Ancestors below L0, then the node itself
+        return [
+            {k: v for k, v in state["nodes"][".".join(parts[:n])].items() if k != "level"}
+            for n in range(2, len(parts) + 1)
+        ]
+
+    def _name_path(self, state: Dict[str, Any], node_id: str) -> str:
+        """Framework, function and item names from L1 down to the node: its identity across blueprints."""
+        names = [str(item.get("name") or "").casefold() for item in self._lineage(state, node_id)]
+        return " / ".join([state["key"]["framework"], state["key"]["function_name"]] + names)
+
+    def _expand_node(self, blueprint_id: str, state: Dict[str, Any], node_id: str) -> None:
+        with self._node_lock(f"{blueprint_id}/{node_id}"):
+            if node_id in state["children"]:
+                return
+            level = state["nodes"][node_id]["level"]
+            items = self.expand_fn(state["request"], self._lineage(state, node_id), level)
+            with self._lock:
+                state["children"][node_id] = [f"{node_id}.{i}" for i in range(len(items))]
+                for i, item in enumerate(items):
+                    self._add(state, f"{node_id}.{i}", item, int(level[1]) + 1)
+            self._save(blueprint_id, state)
+
+    def _prefetch(self, blueprint_id: str, node_ids: List[str]) -> None:
+        if self.prefetch_branches <= 0:
+            return
+        with self._lock:
+            state = self._states.get(blueprint_id)
+            if state is None:
+                return
+            candidates = [
+                n for n in node_ids
+                if n not in state["children"] and f"{blueprint_id}/{n}" not in self._pending
+                and int(state["nodes"][n]["level"][1]) < LAST_LEVEL
+            ]
+            # Most requested first (in any session or version of this function); ties keep tree order
+            candidates.sort(key=lambda n: -self._hits.get(self._name_path(state, n), 0))
+            chosen = candidates[:self.prefetch_branches]
+            self._pending.update(f"{blueprint_id}/{n}" for n in chosen)
+
+        for node_id in chosen:
+            self._prefetcher.submit(self._prefetch_one, blueprint_id, state, node_id)
+
+    def _prefetch_one(self, blueprint_id: str, state: Dict[str, Any], node_id: str) -> None:
+        try:
+            self._expand_node(blueprint_id, state, node_id)
+        except Exception:
+            logger.exception("Prefetch of blueprint node %s failed", node_id)
+        finally:
+            with self._lock:
+                self._pending.discard(f"{blueprint_id}/{node_id}")
+
+    # ---------- invalidation ----------
+
+    def invalidate(self, matches: Callable[[Dict[str, str]], bool]) -> int:
+        """
+        Drop every blueprint whose key matches, loaded or only on disk.
+
+        Returns:
+            Number of blueprints removed
+        """
+        removed = set()
+        with self._lock:
+            loaded = list(self._states.items())
+        for blueprint_id, state in loaded:
+            if matches(state["key"]):
+                removed.add(blueprint_id)
+        for filename in os.listdir(self.storage_dir):
+            blueprint_id = filename[:-len(".json")]
+            if not filename.endswith(".json") or filename == HITS_FILE or blueprint_id in removed:
+                continue
+            try:
+                with open(os.path.join(self.storage_dir, filename), "r", encoding="utf-8") as f:
+                    key = json.load(f)["key"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if matches(key):
+                removed.add(blueprint_id)
+        for blueprint_id in removed:
+            self._drop(blueprint_id)
+        return len(removed)
+
+
+_services: Dict[str, LazyBlueprints] = {}
+_services_lock = threading.Lock()
+
+
+def get_lazy_blueprints(outline: OutlineFn, expand: ExpandFn, storage_dir: str = DEFAULT_STORAGE_DIR,
+                        store: Optional[BlueprintStore] = None) -> LazyBlueprints:
+    """
+    Process-wide service for a storage directory, so node caches and prefetches
+    are shared. ``store`` (used when the service is created) supplies the max
+    age and invalidations.
+    """
+    with _services_lock:
+        service = _services.get(storage_dir)
+        if service is None:
+            service = _services[storage_dir] = LazyBlueprints(outline, expand, storage_dir, store=store)
+        return service
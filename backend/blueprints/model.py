@@ -0,0 +1,356 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/blueprints/model.py
+
+Need for this file (5th-grader explanation):
+"The robot writes each step of the blueprint down up to five times: once in
+its own level's list and again inside every bigger step above it. We write
+each step down just once in a numbered table, note which step it belongs
+to, and only rebuild the big nested lists when somebody really asks for
+them."
+
+Blueprint stores an L0–L4 decomposition as a flat node table:
+
+- one ``Node`` (``__slots__``) per item, holding its level and the index of
+  its parent (-1 for none) instead of nested copies;
+- role, tool and time-estimate strings are interned, and identical tool
+  lists share one tuple;
+- ``listed`` records which nodes appear in each ``levels.Lk`` list, in order.
+
+``level("L3")`` and ``levels`` are views built on first use. ``to_dict()``
+returns exactly the legacy ``{"levels": {...}}`` shape (flat lists whose
+items carry nested ``subitems``); if an LLM answer is not a consistent tree
+(e.g. the L1 list disagrees with L0's subitems) the normalized answer is
+kept verbatim so ``to_dict()`` still returns it unchanged.
+
+``to_compact()`` / ``from_compact()`` store the table itself, which is what
+the blueprint store keeps on disk.
+"""
+
+import copy
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+LEVELS = ("L0", "L1", "L2", "L3", "L4")
+ITEM_FIELDS = ("name", "role", "tools", "deliverable", "time_estimate")
+
+COMPACT_FORMAT = "blueprint-table/1"
+
+
+class Node:
+    """One blueprint item. Fields an item did not have (or had in another type) live in ``extra``."""
+
+    __slots__ = ("level", "parent", "name", "role", "tools", "deliverable", "time_estimate",
+                 "extra", "children")
+
+    def __init__(self, level: int, parent: int):
+        self.level = level
+        self.parent = parent
+        self.name: Optional[str] = None
+        self.role: Optional[str] = None
+        self.tools: Optional[Tuple[str, ...]] = None
+        self.deliverable: Optional[str] = None
+        self.time_estimate: Optional[str] = None
+        self.extra: Optional[Dict[str, Any]] = None
+        self.children: List[int] = []
+
+    def fields(self) -> Dict[str, Any]:
+        """The item's own fields (no ``subitems``), in the legacy key order."""
+        item: Dict[str, Any] = {}
+        if self.name is not None:
+            item["name"] = self.name
+        if self.role is not None:
+            item["role"] = self.role
+        if self.tools is not None:
+            item["tools"] = list(self.tools)
+        if self.deliverable is not None:
+            item["deliverable"] = self.deliverable
+        if self.time_estimate is not None:
+            item["time_estimate"] = self.time_estimate
+        if self.extra:
+            item.update(self.extra)
+        return item
+
+
+class _Interner:
+    """Shares equal strings and tool tuples across a blueprint while it is built."""
+
+    __slots__ = ("tools", "by_name")
+
+    def __init__(self):
+        self.tools: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        # (level, name) -> node indexes in creation order, for matching repeated items
+        self.by_name: Dict[Tuple[int, Any], List[int]] = {}
+
+    @staticmethod
+    def string(value: str) -> str:
+        return sys.intern(value)
+
+    def tool_tuple(self, tools: List[str]) -> Tuple[str, ...]:
+        key = tuple(sys.intern(t) for t in tools)
+        return self.tools.setdefault(key, key)
+
+
+def _as_list(value: Any) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def normalize_levels(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The legacy normalization as a new structure (the input is not modified):
+    every level is a list, ``tools`` is a list and every item has a
+    ``subitems`` list.
+    """
+    def item(value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        out = dict(value)
+        if "tools" in out and not isinstance(out["tools"], list):
+            out["tools"] = [out["tools"]]
+        out["subitems"] = [item(child) for child in _as_list(out.get("subitems"))]
+        return out
+
+    levels = {
+        lvl: [item(i) for i in _as_list(items)] if lvl in LEVELS else items
+        for lvl, items in (data.get("levels") or {}).items()
+    }
+    return {**data, "levels": levels}
+
+
+def levels_from_tree(root: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Legacy ``{"levels": ...}`` answer for a single nested L0 item: each level
+    lists every item at that depth, in tree order.
+    """
+    levels: Dict[str, List[Dict[str, Any]]] = {"L0": [root]}
+    for k in range(1, len(LEVELS)):
+        levels[LEVELS[k]] = [
+            child for parent in levels[LEVELS[k - 1]]
+            for child in _as_list(parent.get("subitems")) if isinstance(child, dict)
+        ]
+    return {"levels": levels}
+
+
+class Blueprint:
+    """An L0–L4 blueprint held as a flat node table."""
+
+    __slots__ = ("nodes", "listed", "extra", "_raw", "_levels", "_flat")
+
+    def __init__(self):
+        self.nodes: List[Node] = []
+        # Level name -> indexes of the nodes in that level's list, in order
+        self.listed: Dict[str, List[int]] = {}
+        # Top-level keys other than "levels"
+        self.extra: Dict[str, Any] = {}
+        # Normalized answer kept verbatim when it is not a consistent tree
+        self._raw: Optional[Dict[str, Any]] = None
+        self._levels: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._flat: Dict[str, List[Dict[str, Any]]] = {}
+
+    # ---------- building ----------
+
+    def _new_node(self, level: int, parent: int, item: Dict[str, Any], interner: _Interner) -> int:
+        node = Node(level, parent)
+        self._assign(node, item, interner)
+        self.nodes.append(node)
+        index = len(self.nodes) - 1
+        interner.by_name.setdefault((level, node.name), []).append(index)
+        if parent >= 0:
+            self.nodes[parent].children.append(index)
+        return index
+
+    @staticmethod
+    def _assign(node: Node, item: Dict[str, Any], interner: _Interner) -> None:
+        extra = {}
+        for key, value in item.items():
+            if key == "subitems":
+                continue
+            if key == "tools" and isinstance(value, list) and all(isinstance(t, str) for t in value):
+                node.tools = interner.tool_tuple(value)
+            elif key in ("role", "time_estimate") and isinstance(value, str):
+                setattr(node, key, interner.string(value))
+            elif key in ("name", "deliverable") and isinstance(value, str):
+                setattr(node, key, value)
+            else:
+                extra[key] = value
+        node.extra = extra or None
+
+    def _merge_children(self, index: int, subitems: List[Any], interner: _Interner) -> bool:
+        """Attach nested subitems under a node, reusing children with the same name."""
+        consistent = True
+        used = set()
+        for child in subitems:
+            if not isinstance(child, dict):
+                return False
+            match = None
+            for c in self.nodes[index].children:
+                if c not in used and self.nodes[c].name == child.get("name"):
+                    match = c
+                    break
+            if match is None:
+                match = self._new_node(self.nodes[index].level + 1, index, child, interner)
+            elif self.nodes[match].fields() != {k: v for k, v in child.items() if k != "subitems"}:
+                consistent = False
+            used.add(match)
+            consistent &= self._merge_children(match, child.get("subitems", []), interner)
+        return consistent
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Blueprint":
+        """
+        Parse an FuncArchAgent answer (``{"levels": {"L0": [...], ...}}``).
+
+        The answer is normalized exactly like the legacy code did; ``to_dict()``
+        of the result equals that normalized answer.
+        """
+        normalized = normalize_levels(data)
+        blueprint = cls()
+        blueprint.extra = {k: v for k, v in normalized.items() if k != "levels"}
+        levels = normalized["levels"]
+        interner = _Interner()
+        consistent = all(lvl in LEVELS for lvl in levels)
+
+        for k, lvl in enumerate(LEVELS):
+            if lvl not in levels or not consistent:
+                continue
+            listed = blueprint.listed[lvl] = []
+            taken = set()
+            for item in levels[lvl]:
+                if not isinstance(item, dict):
+                    consistent = False
+                    break
+                # The same item usually appeared already inside its parent's subitems
+                match = next((i for i in interner.by_name.get((k, item.get("name")), ()) if i not in taken), None)
+                if match is None:
+                    match = blueprint._new_node(k, -1, item, interner)
+                elif blueprint.nodes[match].fields() != {key: v for key, v in item.items() if key != "subitems"}:
+                    consistent = False
+                taken.add(match)
+                listed.append(match)
+                consistent &= blueprint._merge_children(match, item["subitems"], interner)
+
+        if not consistent or blueprint._build_levels() != levels:
+            blueprint._raw = normalized
+        return blueprint
+
+    # ---------- views ----------
+
+    @property
+    def is_table(self) -> bool:
+        """False when the answer was kept verbatim because it was not a consistent tree."""
+        return self._raw is None
+
+    def _build_levels(self) -> Dict[str, List[Dict[str, Any]]]:
+        # One dict per node, shared between its level list and its parent's subitems
+        built: Dict[int, Dict[str, Any]] = {}
+
+        def item(index: int) -> Dict[str, Any]:
+            out = built.get(index)
+            if out is None:
+                out = built[index] = self.nodes[index].fields()
+                out["subitems"] = [item(c) for c in self.nodes[index].children]
+            return out
+
+        return {lvl: [item(i) for i in indexes] for lvl, indexes in self.listed.items()}
+
+    @property
+    def levels(self) -> Dict[str, List[Dict[str, Any]]]:
+        """The legacy ``levels`` mapping, built on first use. Treat it as read-only."""
+        if self._levels is None:
+            self._levels = self._raw["levels"] if self._raw is not None else self._build_levels()
+        return self._levels
+
+    def level(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Items of one level without their ``subitems`` (e.g. the L3 tasks for
+        micro-decomposition), built on first use. Treat them as read-only.
+        """
+        flat = self._flat.get(name)
+        if flat is None:
+            if self._raw is not None:
+                flat = [{k: v for k, v in i.items() if k != "subitems"} if isinstance(i, dict) else i
+                        for i in self._raw["levels"].get(name, [])]
+            else:
+                flat = [self.nodes[i].fields() for i in self.listed.get(name, [])]
+            self._flat[name] = flat
+        return flat
+
+    def children(self, name: str, index: int) -> List[Dict[str, Any]]:
+        """Subitems (without their own subitems) of the ``index``-th item of a level."""
+        if self._raw is not None:
+            item = self._raw["levels"][name][index]
+            return [{k: v for k, v in c.items() if k != "subitems"} for c in item.get("subitems", [])]
+        node = self.nodes[self.listed[name][index]]
+        return [self.nodes[c].fields() for c in node.children]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    # ---------- serialization ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The legacy blueprint dict; a new structure on every call."""
+        if self._raw is not None:
+            return copy.deepcopy(self._raw)
+        return {**self.extra, "levels": self._build_levels()}
+
+    def to_compact(self) -> Dict[str, Any]:
+        """The node table as JSON-ready data (strings stored once, nodes as rows)."""
+        if self._raw is not None:
+            return {"format": COMPACT_FORMAT, "raw": self._raw}
+        strings: Dict[str, int] = {}
+
+        def ref(value: Optional[str]) -> Optional[int]:
+            if value is None:
+                return None
+            index = strings.get(value)
+            if index is None:
+                index = strings[value] = len(strings)
+            return index
+
+        rows = []
+        for node in self.nodes:
+            rows.append([
+                node.level, node.parent, node.name, ref(node.role),
+                [ref(t) for t in node.tools] if node.tools is not None else None,
+                node.deliverable, ref(node.time_estimate), node.extra,
+            ])
+        return {
+            "format": COMPACT_FORMAT,
+            "strings": list(strings),
+            "nodes": rows,
+            "listed": self.listed,
+            "extra": self.extra,
+        }
+
+    @classmethod
+    def from_compact(cls, data: Dict[str, Any]) -> "Blueprint":
+        """Inverse of ``to_compact``; a legacy blueprint dict is parsed with ``from_dict``."""
+        if data.get("format") != COMPACT_FORMAT:
+            return cls.from_dict(data)
+        blueprint = cls()
+        if "raw" in data:
+            blueprint._raw = data["raw"]
+            blueprint.extra = {k: v for k, v in data["raw"].items() if k != "levels"}
+            return blueprint
+
+        interner = _Interner()
+        strings = [sys.intern(s) for s in data["strings"]]
+        for level, parent, name, role, tools, deliverable, time_estimate, extra in data["nodes"]:
+            node = Node(level, parent)
+            node.name = name
+            node.role = strings[role] if role is not None else None
+            node.tools = interner.tool_tuple([strings[t] for t in tools]) if tools is not None else None
+            node.deliverable = deliverable
+            node.time_estimate = strings[time_estimate] if time_estimate is not None else None
+            node.extra = extra
+            blueprint.nodes.append(node)
+            if parent >= 0:
+                blueprint.nodes[parent].children.append(len(blueprint.nodes) - 1)
+        blueprint.listed = {lvl: list(indexes) for lvl, indexes in data["listed"].items()}
+        blueprint.extra = dict(data.get("extra") or {})
+        return blueprint
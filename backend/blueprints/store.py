@@ -0,0 +1,292 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/blueprints/store.py
+
+Need for this file (5th-grader explanation):
+"Drawing the full map of a job (all five levels) takes the robot almost a
+minute. People keep asking for the same maps, so we keep every finished map
+in a folder. If the map is new enough we hand it over right away; if it is
+getting old we still hand it over, and quietly draw a fresh one for next
+time."
+
+BlueprintStore keeps one JSON file per blueprint, keyed by the normalized
+(function_name, framework, context, prompt version):
+
+- fresh entries (younger than ``fresh_seconds``) are served as is;
+- stale entries (younger than ``max_age_seconds``) are served immediately
+  while a background thread regenerates them (stale-while-revalidate);
+- older or missing entries are generated on the spot.
+
+Concurrent requests for the same key share one generation. Every write
+bumps the entry's version. ``invalidate`` drops entries by any part of the
+key.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.observability.metrics import record_cache_lookup
+
+logger = logging.getLogger("blueprint_maker.blueprint_store")
+
+DEFAULT_STORAGE_DIR = "data/blueprints"
+DEFAULT_FRESH_SECONDS = 7 * 86400
+DEFAULT_MAX_AGE_SECONDS = 90 * 86400
+
+
+def normalize_key(function_name: str, framework: str, context: str, prompt_version: str) -> Dict[str, str]:
+    """Case- and whitespace-insensitive key fields."""
+    def norm(value: str) -> str:
+        return " ".join(str(value or "").split()).casefold()
+    return {
+        "function_name": norm(function_name),
+        "framework": norm(framework),
+        "context": norm(context),
+        "prompt_version": str(prompt_version),
+    }
+
+
+def key_id(key: Dict[str, str]) -> str:
+    return hashlib.blake2b(json.dumps(key, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def key_filter(function_name: Optional[str] = None, framework: Optional[str] = None,
+               context: Optional[str] = None) -> Callable[[Dict[str, str]], bool]:
+    """Predicate matching keys on the given fields (normalized like ``normalize_key``); None matches all."""
+    wanted = {
+        field: " ".join(value.split()).casefold()
+        for field, value in (("function_name", function_name), ("framework", framework), ("context", context))
+        if value is not None
+    }
+    return lambda key: all(key.get(field) == value for field, value in wanted.items())
+
+
+class BlueprintStore:
+    """Persistent, versioned blueprint cache with stale-while-revalidate."""
+
+    def __init__(self, storage_dir: str = DEFAULT_STORAGE_DIR, fresh_seconds: float = DEFAULT_FRESH_SECONDS,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS):
+        """
+        Args:
+            storage_dir: Directory holding one JSON file per blueprint
+            fresh_seconds: Entries younger than this are served without a refresh
+            max_age_seconds: Entries older than this are regenerated before serving
+        """
+        self.storage_dir = storage_dir
+        self.fresh_seconds = fresh_seconds
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(storage_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Per-key locks so one generation serves every concurrent caller
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._refreshing: Dict[str, threading.Thread] = {}
+        # Bumped by invalidate(); a generation started under an older value is not stored
+        self._generations: Dict[str, int] = {}
+        # Keys with generations running or scheduled (and how many), so invalidate()
+        # reaches them before they are stored
+        self._inflight: Dict[str, Tuple[Dict[str, str], int]] = {}
+        self._invalidation_listeners: List[Callable[[Callable[[Dict[str, str]], bool]], Any]] = []
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _path(self, entry_id: str) -> str:
+        return os.path.join(self.storage_dir, f"{entry_id}.json")
+
+    def _load(self) -> None:
+        for filename in os.listdir(self.storage_dir):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.storage_dir, filename), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                self._entries[key_id(entry["key"])] = entry
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Skipping unreadable blueprint cache file %s: %s", filename, e)
+
+    def _write(self, entry_id: str, entry: Dict[str, Any]) -> None:
+        tmp = self._path(entry_id) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, self._path(entry_id))
+
+    # ---------- reads / writes ----------
+
+    def get(self, key: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """The stored entry ({key, version, created_at, blueprint}) or None."""
+        return self._entries.get(key_id(key))
+
+    def put(self, key: Dict[str, str], blueprint: Dict[str, Any],
+            generation: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Store a blueprint as the next version for its key.
+
+        Args:
+            generation: The key's invalidation generation when generating started;
+                if the key was invalidated since, the entry is returned but not stored
+        """
+        entry_id = key_id(key)
+        with self._lock:
+            previous = self._entries.get(entry_id)
+            entry = {
+                "key": key,
+                "version": (previous["version"] + 1) if previous else 1,
+                "created_at": time.time(),
+                "blueprint": blueprint,
+            }
+            if generation is not None and generation != self._generations.get(entry_id, 0):
+                logger.info("Discarding blueprint generated before invalidation for %s", key)
+                return entry
+            self._write(entry_id, entry)
+            self._entries[entry_id] = entry
+        return entry
+
+    def _start_generation(self, entry_id: str, key: Dict[str, str]) -> int:
+        """Register a generation for a key; call under ``_lock``."""
+        _, running = self._inflight.get(entry_id, (key, 0))
+        self._inflight[entry_id] = (key, running + 1)
+        return self._generations.get(entry_id, 0)
+
+    def _end_generation(self, entry_id: str) -> None:
+        with self._lock:
+            key, running = self._inflight[entry_id]
+            if running > 1:
+                self._inflight[entry_id] = (key, running - 1)
+            else:
+                del self._inflight[entry_id]
+
+    def get_or_generate(self, key: Dict[str, str], generate: Callable[[], Dict[str, Any]],
+                        refresh: bool = False) -> Dict[str, Any]:
+        """
+        Serve a blueprint from the store, generating it when needed.
+
+        Args:
+            key: Result of ``normalize_key``
+            generate: Builds the blueprint (the slow LLM call)
+            refresh: Regenerate now even if a fresh entry exists
+
+        Returns:
+            The stored entry ({key, version, created_at, blueprint})
+        """
+        entry_id = key_id(key)
+        entry = self._entries.get(entry_id)
+        if entry is not None and not refresh:
+            age = time.time() - entry["created_at"]
+            if age < self.fresh_seconds:
+                record_cache_lookup("blueprint", True)
+                return entry
+            if age < self.max_age_seconds:
+                record_cache_lookup("blueprint", True)
+                self._refresh_in_background(entry_id, key, generate)
+                return entry
+
+        record_cache_lookup("blueprint", False)
+        with self._key_lock(entry_id):
+            # Another caller may have generated it while we waited
+            current = self._entries.get(entry_id)
+            if current is not None and current is not entry:
+                return current
+            with self._lock:
+                generation = self._start_generation(entry_id, key)
+            try:
+                return self.put(key, generate(), generation)
+            finally:
+                self._end_generation(entry_id)
+
+    def _key_lock(self, entry_id: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(entry_id)
+            if lock is None:
+                lock = self._key_locks[entry_id] = threading.Lock()
+            return lock
+
+    def _refresh_in_background(self, entry_id: str, key: Dict[str, str],
+                               generate: Callable[[], Dict[str, Any]]) -> None:
+        with self._lock:
+            running = self._refreshing.get(entry_id)
+            if running is not None and running.is_alive():
+                return
+
+            # Taken now: an invalidation while the thread waits for the key lock still counts
+            generation = self._start_generation(entry_id, key)
+
+            def refresh():
+                try:
+                    with self._key_lock(entry_id):
+                        self.put(key, generate(), generation)
+                except Exception:
+                    logger.exception("Background blueprint refresh failed for %s", key)
+                finally:
+                    self._end_generation(entry_id)
+                    with self._lock:
+                        self._refreshing.pop(entry_id, None)
+
+            thread = self._refreshing[entry_id] = threading.Thread(
+                target=refresh, name="blueprint-refresh", daemon=True
+            )
+        thread.start()
+
+    def invalidate(self, function_name: Optional[str] = None, framework: Optional[str] = None,
+                   context: Optional[str] = None) -> int:
+        """
+        Drop every entry matching the given key fields (all entries if none are given).
+
+        Generations of matching keys still running (including background
+        refreshes) finish but are not stored.
+        Invalidation listeners (the lazy blueprints) drop their matching
+        blueprints as well.
+
+        Returns:
+            Number of entries removed
+        """
+        matches = key_filter(function_name, framework, context)
+        removed = 0
+        with self._lock:
+            for entry_id, (key, _) in self._inflight.items():
+                if matches(key):
+                    self._generations[entry_id] = self._generations.get(entry_id, 0) + 1
+            for entry_id, entry in list(self._entries.items()):
+                if matches(entry["key"]):
+                    self._generations[entry_id] = self._generations.get(entry_id, 0) + 1
+                    del self._entries[entry_id]
+                    try:
+                        os.remove(self._path(entry_id))
+                    except FileNotFoundError:
+                        pass
+                    removed += 1
+        for listener in self._invalidation_listeners:
+            listener(matches)
+        return removed
+
+    def add_invalidation_listener(self, callback: Callable[[Callable[[Dict[str, str]], bool]], Any]) -> None:
+        """Call ``callback(matches)`` after every ``invalidate``; ``matches(key)`` tells which keys were dropped."""
+        self._invalidation_listeners.append(callback)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Key, version and creation time of every stored blueprint."""
+        return [
+            {**entry["key"], "version": entry["version"], "created_at": entry["created_at"]}
+            for entry in self._entries.values()
+        ]
+
+
+_stores: Dict[str, BlueprintStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_blueprint_store(storage_dir: str = DEFAULT_STORAGE_DIR) -> BlueprintStore:
+    """Process-wide store for a storage directory (the API and the director share it)."""
+    with _stores_lock:
+        store = _stores.get(storage_dir)
+        if store is None:
+            store = _stores[storage_dir] = BlueprintStore(storage_dir)
+        return store
@@ -0,0 +1,184 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/blueprints/taxonomy.py
+
+Need for this file (5th-grader explanation):
+"The big process books (APQC and eTOM) already list the steps for common
+jobs. Instead of asking the robot to remember the book every time, we keep
+a copy of the pages we use on the shelf, with an index in the back. If the
+job is in the book, we copy its steps and only ask the robot who does each
+step, with which tools, and how long it takes."
+
+TaxonomyIndex loads the versioned datasets in ``taxonomies/*.json`` (one per
+framework) and finds a function in two ways:
+
+- a character trie over every name and alias: exact names and unambiguous
+  prefixes of whole words ("develop vision") resolve in one walk;
+- an inverted token index: other wordings ("sales & marketing") match the
+  entry that covers most of the query's words.
+
+A match must say enough about the function: a prefix needs at least two
+content words, and a token match must cover half the words of one of the
+entry's names, so "d", "Develop" or "Manage" match nothing.
+
+A match gives the function's L1 processes and their L2 activities, so the
+LLM is only asked for the context-specific fields.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+TAXONOMY_DIR = os.path.join(os.path.dirname(__file__), "taxonomies")
+
+# Share of the query's words an entry must contain to count as a match
+MIN_TOKEN_SCORE = 0.75
+# Share of one of the entry's names (or aliases) the query must cover
+MIN_NAME_COVERAGE = 0.5
+# Content words a prefix must have to match on its own
+MIN_PREFIX_WORDS = 2
+STOPWORDS = frozenset({"a", "an", "and", "the", "of", "for", "to", "in", "on", "by", "with"})
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase words separated by single spaces ("&" reads as "and")."""
+    return " ".join(re.findall(r"[a-z0-9]+", str(text or "").casefold().replace("&", " and ")))
+
+
+def tokens(text: str) -> Set[str]:
+    """Content words of a name, with a plural "s" dropped."""
+    return {
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in normalize_name(text).split() if w not in STOPWORDS
+    }
+
+
+class Trie:
+    """Character trie from normalized names to entry ids."""
+
+    __slots__ = ("children", "ids", "terminal")
+
+    def __init__(self):
+        self.children: Dict[str, "Trie"] = {}
+        self.ids: Set[int] = set()         # every entry below this prefix
+        self.terminal: Set[int] = set()    # entries whose name ends here
+
+    def insert(self, name: str, entry_id: int) -> None:
+        node = self
+        node.ids.add(entry_id)
+        for ch in name:
+            node = node.children.setdefault(ch, Trie())
+            node.ids.add(entry_id)
+        node.terminal.add(entry_id)
+
+    def _walk(self, prefix: str) -> Optional["Trie"]:
+        node = self
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, name: str) -> Set[int]:
+        node = self._walk(name)
+        return node.terminal if node is not None else set()
+
+    def prefix(self, prefix: str) -> Set[int]:
+        node = self._walk(prefix)
+        return node.ids if node is not None else set()
+
+
+class TaxonomyIndex:
+    """Trie + inverted token index over every framework's functions."""
+
+    def __init__(self, directory: str = TAXONOMY_DIR):
+        self.versions: Dict[str, str] = {}
+        self._entries: List[Tuple[str, Dict[str, Any]]] = []   # (framework key, function)
+        self._tries: Dict[str, Trie] = {}
+        self._postings: Dict[str, Dict[str, Set[int]]] = {}
+        self._entry_tokens: List[Set[str]] = []
+        self._name_tokens: List[List[Set[str]]] = []    # per name and alias
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".json"):
+                with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                    self._add_dataset(json.load(f))
+
+    def _add_dataset(self, dataset: Dict[str, Any]) -> None:
+        framework = normalize_name(dataset["framework"])
+        self.versions[framework] = dataset["version"]
+        trie = self._tries.setdefault(framework, Trie())
+        postings = self._postings.setdefault(framework, {})
+        for function in dataset["functions"]:
+            entry_id = len(self._entries)
+            self._entries.append((framework, function))
+            names = [function["name"], *function.get("aliases", [])]
+            name_tokens = [tokens(name) for name in names]
+            for name in names:
+                trie.insert(normalize_name(name), entry_id)
+            words: Set[str] = set().union(*name_tokens)
+            self._entry_tokens.append(words)
+            self._name_tokens.append(name_tokens)
+            for word in words:
+                postings.setdefault(word, set()).add(entry_id)
+
+    def version(self, framework: str) -> Optional[str]:
+        """Dataset version for a framework, or None if it has no dataset."""
+        return self.versions.get(normalize_name(framework))
+
+    def lookup(self, framework: str, function_name: str) -> Optional[Dict[str, Any]]:
+        """
+        The framework function matching a name, or None.
+
+        Returns:
+            The function ({id, name, aliases, children: processes with
+            children: activities}); do not modify it
+        """
+        framework = normalize_name(framework)
+        trie = self._tries.get(framework)
+        if trie is None:
+            return None
+        name = normalize_name(function_name)
+        if not name:
+            return None
+
+        query = tokens(name)
+        found = trie.exact(name)
+        if not found and len(query) >= MIN_PREFIX_WORDS:
+            # Names are single-spaced, so a trailing space keeps the prefix to whole words
+            found = trie.prefix(name + " ")
+        if len(found) == 1:
+            return self._entries[next(iter(found))][1]
+
+        if not query:
+            return None
+        postings = self._postings[framework]
+        scores: Dict[int, int] = {}
+        for word in query:
+            for entry_id in postings.get(word, ()):
+                scores[entry_id] = scores.get(entry_id, 0) + 1
+        if not scores:
+            return None
+        # Most query words covered, then the tightest entry
+        best = max(scores, key=lambda e: (scores[e], scores[e] / len(self._entry_tokens[e]), -e))
+        if scores[best] / len(query) < MIN_TOKEN_SCORE:
+            return None
+        if max(len(query & words) / len(words) for words in self._name_tokens[best] if words) < MIN_NAME_COVERAGE:
+            return None
+        return self._entries[best][1]
+
+
+_index: Optional[TaxonomyIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_taxonomy_index() -> TaxonomyIndex:
+    """Process-wide index, built on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TaxonomyIndex()
+        return _index
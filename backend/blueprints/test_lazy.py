@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for lazily expanded blueprints, with stubbed generators.
+
+Checks that prefetching favours the branches requested in earlier sessions
+(also for a regenerated blueprint), that blueprints expire and refresh with
+their store, and that store invalidations drop them, including while an
+expansion is still running.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from backend.blueprints.lazy import LazyBlueprints
+from backend.blueprints.store import BlueprintStore, normalize_key
+
+KEY = normalize_key("Marketing", "APQC", "", "lazy-v1")
+REQUEST = {"function_name": "Marketing", "framework": "APQC", "context": ""}
+
+class _Generators:
+    """Outline with processes P0..P3; every expansion names its items after the parent."""
+
+    def __init__(self):
+        self.outlines = 0
+        self.expanded = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def outline(self, request):
+        self.outlines += 1
+        return {"name": "Marketing", "subitems": [{"name": f"P{i}"} for i in range(4)]}
+
+    def expand(self, request, lineage, level):
+        self.gate.wait(5)
+        self.expanded.append(lineage[-1]["name"])
+        return [{"name": f"{lineage[-1]['name']}.{i}"} for i in range(2)]
+
+def _service(storage_dir, generators, store=None, prefetch_branches=0):
+    return LazyBlueprints(generators.outline, generators.expand, storage_dir,
+                          prefetch_branches=prefetch_branches, prefetch_workers=1, store=store)
+
+def _wait(condition):
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_prefetch_ranks_by_past_sessions():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        generators = _Generators()
+        first = _service(storage_dir, generators)
+        first.open(KEY, REQUEST)
+        for _ in range(3):
+            first.expand(KEY, "0.2")
+        first.expand(KEY, "0.3")
+
+        # A new process with a regenerated blueprint prefetches P2, then P3
+        store = BlueprintStore(os.path.join(storage_dir, "store"))
+        generators = _Generators()
+        later = _service(storage_dir, generators, store=store, prefetch_branches=2)
+        later.open(KEY, REQUEST, refresh=True)
+        _wait(lambda: len(generators.expanded) == 2)
+        assert generators.outlines == 1
+        assert generators.expanded == ["P2", "P3"]
+
+def test_expiry_and_refresh():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        store = BlueprintStore(os.path.join(storage_dir, "store"), max_age_seconds=600)
+        generators = _Generators()
+        service = _service(storage_dir, generators, store=store)
+        service.open(KEY, REQUEST)
+        service.expand(KEY, "0.1")
+        assert service.open(KEY, REQUEST)["levels"]["L1"][1]["expandable"] is False
+        assert generators.outlines == 1
+
+        service.open(KEY, REQUEST, refresh=True)
+        assert generators.outlines == 2
+        assert service.open(KEY, REQUEST)["levels"]["L1"][1]["expandable"] is True
+
+        # Expired blueprints are regenerated with their expansions dropped
+        next(iter(service._states.values()))["created_at"] -= 1200
+        service.open(KEY, REQUEST)
+        assert generators.outlines == 3
+
+def test_store_invalidation_drops_lazy_blueprints():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        store = BlueprintStore(os.path.join(storage_dir, "store"))
+        generators = _Generators()
+        service = _service(storage_dir, generators, store=store)
+        blueprint_id = service.open(KEY, REQUEST)["blueprint_id"]
+
+        # An expansion that finishes after the invalidation does not bring the blueprint back
+        generators.gate.clear()
+        worker = threading.Thread(target=service.expand, args=(KEY, "0.0"))
+        worker.start()
+        _wait(lambda: any(p.endswith("/0.0") for p in service._node_locks))
+        assert store.invalidate(function_name="Marketing") == 0  # counts store entries only
+        generators.gate.set()
+        worker.join()
+        assert not os.path.exists(service._path(blueprint_id))
+        assert blueprint_id not in service._states
+
+        assert store.invalidate(framework="other") == 0
+        service.open(KEY, REQUEST)
+        assert generators.outlines == 2
+        try:
+            service.expand(normalize_key("Sales", "APQC", "", "lazy-v1"), "0.1")
+            assert False, "unknown blueprint expanded"
+        except KeyError:
+            pass
+
+if __name__ == "__main__":
+    test_prefetch_ranks_by_past_sessions()
+    test_expiry_and_refresh()
+    test_store_invalidation_drops_lazy_blueprints()
@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the blueprint node table.
+
+Builds an LLM-style answer (every level listed flat and nested), and checks
+that the table serializes back to exactly the legacy normalized shape.
+"""
+
+import copy
+import json
+
+from backend.blueprints.model import Blueprint, normalize_levels
+
+def _item(name, depth, fanout):
+    item = {
+        "name": name, "role": "Media Planner", "tools": ["Google Ads", "Excel"],
+        "deliverable": f"{name} report", "time_estimate": "2 hours",
+    }
+    if depth < 4:
+        item["subitems"] = [_item(f"{name}.{i}", depth + 1, fanout) for i in range(fanout)]
+    return item
+
+def _answer(fanout=3):
+    levels = {"L0": [_item("Campaign Execution", 0, fanout)]}
+    for k in range(1, 5):
+        levels[f"L{k}"] = [c for p in levels[f"L{k - 1}"] for c in p.get("subitems", [])]
+    # Separate copies per level, as parsed from the LLM's JSON
+    return json.loads(json.dumps({"levels": levels}))
+
+def test_round_trip():
+    """to_dict() and the compact form both give back the normalized answer."""
+    answer = _answer()
+    expected = normalize_levels(answer)
+    blueprint = Blueprint.from_dict(answer)
+
+    assert blueprint.is_table
+    assert len(blueprint) == 1 + 3 + 9 + 27 + 81
+    assert blueprint.to_dict() == expected
+    assert Blueprint.from_compact(json.loads(json.dumps(blueprint.to_compact()))).to_dict() == expected
+    assert [t["name"] for t in blueprint.level("L3")] == [t["name"] for t in expected["levels"]["L3"]]
+    print(f"legacy {len(json.dumps(expected))} bytes, table {len(json.dumps(blueprint.to_compact()))} bytes")
+
+def test_inconsistent_answer_kept_verbatim():
+    """An L1 list that disagrees with L0's subitems is still returned unchanged."""
+    answer = _answer()
+    answer["levels"]["L1"][0]["role"] = "Analyst"
+    answer["levels"]["L2"] = {"name": "Single", "role": "r", "tools": "Excel", "deliverable": "d", "time_estimate": "1h"}
+    blueprint = Blueprint.from_dict(copy.deepcopy(answer))
+
+    assert not blueprint.is_table
+    assert blueprint.to_dict() == normalize_levels(answer)
+    assert Blueprint.from_compact(blueprint.to_compact()).to_dict() == normalize_levels(answer)
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_inconsistent_answer_kept_verbatim()
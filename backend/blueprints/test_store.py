@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the blueprint store.
+
+Serves fresh, stale and expired entries, checks that concurrent misses
+generate once, and that an invalidation during a background refresh is not
+undone when the refresh finishes.
+"""
+
+import tempfile
+import threading
+import time
+
+from backend.blueprints.store import BlueprintStore, key_id, normalize_key
+
+KEY = normalize_key("Marketing", "APQC", "", "v1")
+
+class _Generator:
+    """Counts calls; optionally blocks until released."""
+
+    def __init__(self, block: bool = False):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {"levels": {"L0": [{"name": f"run {self.calls}"}]}}
+
+def _age(store, seconds):
+    store._entries[key_id(KEY)]["created_at"] -= seconds
+
+def _wait_for_refresh(store):
+    deadline = time.time() + 5
+    while store._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+
+def test_fresh_stale_expired():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        store = BlueprintStore(storage_dir, fresh_seconds=60, max_age_seconds=600)
+        generate = _Generator()
+        assert store.get_or_generate(KEY, generate)["version"] == 1
+
+        # Fresh: served as is
+        assert store.get_or_generate(KEY, generate)["version"] == 1 and generate.calls == 1
+
+        # Stale: the old entry is served while a refresh runs in the background
+        _age(store, 120)
+        assert store.get_or_generate(KEY, generate)["version"] == 1
+        _wait_for_refresh(store)
+        assert generate.calls == 2 and store.get(KEY)["version"] == 2
+
+        # Expired: regenerated before serving
+        _age(store, 1200)
+        assert store.get_or_generate(KEY, generate)["version"] == 3 and generate.calls == 3
+
+        # Survives a restart
+        assert BlueprintStore(storage_dir).get(KEY)["version"] == 3
+
+def test_single_flight():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        store = BlueprintStore(storage_dir)
+        generate = _Generator(block=True)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.get_or_generate(KEY, generate)))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        generate.started.wait(5)
+        time.sleep(0.05)
+        generate.release.set()
+        for t in threads:
+            t.join()
+        assert generate.calls == 1
+        assert {r["version"] for r in results} == {1}
+
+def test_invalidate_during_refresh():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        store = BlueprintStore(storage_dir, fresh_seconds=60, max_age_seconds=600)
+        store.get_or_generate(KEY, _Generator())
+        _age(store, 120)
+
+        generate = _Generator(block=True)
+        store.get_or_generate(KEY, generate)
+        generate.started.wait(5)
+        assert store.invalidate(function_name="marketing") == 1
+        generate.release.set()
+        _wait_for_refresh(store)
+        assert store.get(KEY) is None
+        assert BlueprintStore(storage_dir).get(KEY) is None
+
+        # Generations started after the invalidation are stored again
+        assert store.get_or_generate(KEY, _Generator())["version"] == 1
+        assert store.get(KEY) is not None
+
+if __name__ == "__main__":
+    test_fresh_stale_expired()
+    test_single_flight()
+    test_invalidate_during_refresh()
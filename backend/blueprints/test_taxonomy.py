@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the offline framework taxonomy index.
+
+Looks up functions by exact name, alias, prefix and other wordings, and
+checks that unknown functions and frameworks, partial words and single
+generic words are not matched.
+"""
+
+import time
+
+from backend.blueprints.taxonomy import get_taxonomy_index
+
+def test_lookup():
+    index = get_taxonomy_index()
+    assert index.lookup("APQC", "Market and Sell Products and Services")["id"] == "3.0"
+    assert index.lookup("apqc", "marketing")["id"] == "3.0"
+    assert index.lookup("APQC", "market and sell")["id"] == "3.0"
+    assert index.lookup("APQC", "Sales & Marketing")["id"] == "3.0"
+    assert index.lookup("APQC", "customer care")["id"] == "6.0"
+    assert index.lookup("eTOM", "Customer Relationship Management")["id"] == "1.1.2"
+    assert index.lookup("APQC", "Media Buying") is None
+    assert index.lookup("ITIL", "Marketing") is None
+    assert index.lookup("APQC", "develop vision")["id"] == "1.0"
+    assert index.lookup("APQC", "manage customer")["id"] == "6.0"
+    for name in ("d", "Develop", "Manage", "Mark", "develop vis", "Market and Sell P", "Sales Vision"):
+        assert index.lookup("APQC", name) is None, name
+    assert index.version("eTOM")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        index.lookup("APQC", "Sales and Marketing")
+    print(f"lookup: {(time.perf_counter() - start) / 10000 * 1e6:.1f} µs")
+
+if __name__ == "__main__":
+    test_lookup()
@@ -0,0 +1,328 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/campaigns/repository.py
+
+Need for this file (5th-grader explanation):
+"This is the campaign card catalogue. Every campaign gets a card, and we
+keep little drawers sorted by name tag, by status and by client, so
+finding 'campaign cam_42' or 'all active campaigns for TechGiant' never
+means flipping through every card in the library."
+
+CampaignRepository holds every campaign record in memory with:
+
+- a primary hash index by id (O(1) ``get``);
+- secondary indexes by status and by client (id sets);
+- lazily built sorted indexes for ordering and cursor pagination.
+
+Writes are appended to a JSON-lines journal (``campaigns.jsonl``) which is
+replayed on start-up and compacted when it grows much larger than the live
+set. Director results are stored next to it, one JSON file per campaign.
+"""
+
+import base64
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_STORAGE_DIR = "data/campaigns"
+
+SORT_FIELDS = ("created_at", "updated_at", "name", "client", "status")
+
+# Filtered sets at or below this size are sorted directly instead of walking a full index
+DIRECT_SORT_LIMIT = 5000
+
+SortKey = Tuple[str, str]
+
+
+def encode_cursor(key: SortKey) -> str:
+    """Opaque cursor for the X-Next-Cursor header."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """
+    Inverse of ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        value, campaign_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(value), str(campaign_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+class CampaignRepository:
+    """Indexed, journaled store of campaign records."""
+
+    def __init__(self, storage_dir: str = DEFAULT_STORAGE_DIR):
+        """
+        Args:
+            storage_dir: Directory for the journal and per-campaign results
+        """
+        self.storage_dir = storage_dir
+        self.journal_file = os.path.join(storage_dir, "campaigns.jsonl")
+        self.results_dir = os.path.join(storage_dir, "results")
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._by_client: Dict[str, Dict[str, None]] = {}
+        self._sorted: Dict[str, List[SortKey]] = {}
+        self._listeners: List[Callable[[Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]] = []
+        self._journal_lines = 0
+
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        if not os.path.exists(self.journal_file):
+            return
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                self._journal_lines += 1
+                record = json.loads(line)
+                if record.get("_deleted"):
+                    self._unindex(self._by_id.pop(record["id"], None))
+                else:
+                    self._unindex(self._by_id.get(record["id"]))
+                    self._by_id[record["id"]] = record
+                    self._index(record)
+        if self._journal_lines > 2 * len(self._by_id) + 100:
+            self._compact()
+        # Build the default ordering up front so the first list request is not slow
+        self._sorted_keys("created_at")
+
+    def _append_journal(self, record: Dict[str, Any]) -> None:
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal_lines += 1
+        if self._journal_lines > 2 * len(self._by_id) + 100:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.journal_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in self._by_id.values():
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.journal_file)
+        self._journal_lines = len(self._by_id)
+
+    # ---------- indexes ----------
+
+    def _index(self, record: Dict[str, Any]) -> None:
+        self._by_status.setdefault(record.get("status") or "", {})[record["id"]] = None
+        self._by_client.setdefault(record.get("client") or "", {})[record["id"]] = None
+        for field, keys in self._sorted.items():
+            insort(keys, self._sort_key(record, field))
+
+    def _unindex(self, record: Optional[Dict[str, Any]]) -> None:
+        if record is None:
+            return
+        self._by_status.get(record.get("status") or "", {}).pop(record["id"], None)
+        self._by_client.get(record.get("client") or "", {}).pop(record["id"], None)
+        for field, keys in self._sorted.items():
+            key = self._sort_key(record, field)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    @staticmethod
+    def _sort_key(record: Dict[str, Any], field: str) -> SortKey:
+        return str(record.get(field) or ""), record["id"]
+
+    def _sorted_keys(self, field: str) -> List[SortKey]:
+        keys = self._sorted.get(field)
+        if keys is None:
+            keys = self._sorted[field] = sorted(self._sort_key(r, field) for r in self._by_id.values())
+        return keys
+
+    # ---------- writes ----------
+
+    def add_listener(self, callback: Callable[[Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]) -> None:
+        """
+        Call ``callback(record, previous)`` after every write.
+
+        ``previous`` is None for a new campaign and ``record`` is None for a deleted one.
+        """
+        self._listeners.append(callback)
+
+    def upsert(self, campaign_id: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Create a campaign or update some of its fields.
+
+        Returns:
+            The stored record
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            previous = self._by_id.get(campaign_id)
+            record = dict(previous) if previous else {"id": campaign_id, "created_at": now}
+            record.update(fields)
+            record["id"] = campaign_id
+            record["updated_at"] = now
+
+            self._unindex(previous)
+            self._by_id[campaign_id] = record
+            self._index(record)
+            self._append_journal(record)
+
+        for listener in self._listeners:
+            listener(record, previous)
+        return record
+
+    def set_status(self, campaign_id: str, status: str) -> Optional[Dict[str, Any]]:
+        """Update a campaign's status; returns None if the campaign is unknown."""
+        if campaign_id not in self._by_id:
+            return None
+        return self.upsert(campaign_id, status=status)
+
+    def set_workflow_stage(self, campaign_id: str, stage: str, timestamp: Optional[str] = None
+                           ) -> Optional[Dict[str, Any]]:
+        """
+        Record the workflow stage a campaign is in, next to (not instead of) its status.
+
+        Returns:
+            The stored record, or None if the campaign is unknown
+        """
+        if campaign_id not in self._by_id:
+            return None
+        return self.upsert(campaign_id, workflow_stage=stage, workflow_updated_at=timestamp)
+
+    def delete(self, campaign_id: str) -> bool:
+        with self._lock:
+            record = self._by_id.pop(campaign_id, None)
+            if record is None:
+                return False
+            self._unindex(record)
+            self._append_journal({"id": campaign_id, "_deleted": True})
+        results_file = self._results_file(campaign_id)
+        if os.path.exists(results_file):
+            os.remove(results_file)
+        for listener in self._listeners:
+            listener(None, record)
+        return True
+
+    def save_results(self, campaign_id: str, package: Dict[str, Any]) -> None:
+        """Store the director's campaign package for a campaign."""
+        tmp = self._results_file(campaign_id) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(package, f)
+        os.replace(tmp, self._results_file(campaign_id))
+        self.upsert(campaign_id, has_results=True)
+
+    def _results_file(self, campaign_id: str) -> str:
+        # Ids come from clients; keep them inside results_dir
+        safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in campaign_id)
+        return os.path.join(self.results_dir, f"{safe}.json")
+
+    # ---------- reads ----------
+
+    def get(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(campaign_id)
+
+    def get_results(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        path = self._results_file(campaign_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def all(self) -> List[Dict[str, Any]]:
+        return list(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def count_by_status(self) -> Dict[str, int]:
+        return {status: len(ids) for status, ids in self._by_status.items() if ids}
+
+    def query(self, statuses: Optional[Sequence[str]] = None, clients: Optional[Sequence[str]] = None,
+              sort: str = "created_at", descending: bool = True, after: Optional[SortKey] = None,
+              limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[SortKey]]:
+        """
+        One page of campaigns matching the filters, in sort order.
+
+        Args:
+            statuses: Only campaigns in one of these statuses
+            clients: Only campaigns of one of these clients
+            sort: Field to order by (one of SORT_FIELDS); ties break on id
+            descending: Largest values first
+            after: Sort key of the last item on the previous page
+            limit: Maximum number of campaigns
+
+        Returns:
+            (campaigns, sort key to pass as ``after`` for the next page or None)
+
+        Raises:
+            ValueError: On an unknown sort field
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+
+        with self._lock:
+            candidates = self._candidates(statuses, clients)
+            if candidates is not None and len(candidates) <= DIRECT_SORT_LIMIT:
+                keys = sorted(self._sort_key(self._by_id[i], sort) for i in candidates)
+                candidates = None
+            else:
+                keys = self._sorted_keys(sort)
+
+            page: List[Dict[str, Any]] = []
+            if descending:
+                i = (bisect_left(keys, after) if after else len(keys)) - 1
+                step, stop = -1, -1
+            else:
+                i = bisect_right(keys, after) if after else 0
+                step, stop = 1, len(keys)
+            while i != stop and len(page) < limit:
+                campaign_id = keys[i][1]
+                if candidates is None or campaign_id in candidates:
+                    page.append(self._by_id[campaign_id])
+                i += step
+            has_more = any(candidates is None or keys[j][1] in candidates for j in range(i, stop, step))
+
+        if has_more and page:
+            return page, self._sort_key(page[-1], sort)
+        return page, None
+
+    def _candidates(self, statuses: Optional[Sequence[str]], clients: Optional[Sequence[str]]):
+        """Ids matching the filters (anything supporting ``in`` and ``len``), or None for all."""
+        groups = []
+        for values, index in ((statuses, self._by_status), (clients, self._by_client)):
+            if not values:
+                continue
+            if len(values) == 1:
+                # A single value can use the index's own id set without copying it
+                groups.append(index.get(values[0], {}))
+            else:
+                groups.append({i for v in values for i in index.get(v, ())})
+        if not groups:
+            return None
+        if len(groups) == 1:
+            return groups[0]
+        smaller, larger = sorted(groups, key=len)
+        return {i for i in smaller if i in larger}
+
+
+_repositories: Dict[str, CampaignRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_campaign_repository(storage_dir: str = DEFAULT_STORAGE_DIR) -> CampaignRepository:
+    """Process-wide repository for a storage directory (the API and the director share it)."""
+    with _repositories_lock:
+        repository = _repositories.get(storage_dir)
+        if repository is None:
+            repository = _repositories[storage_dir] = CampaignRepository(storage_dir)
+        return repository
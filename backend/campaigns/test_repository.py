@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the campaign repository.
+
+Checks journal replay and compaction, the status and client indexes, cursor
+pagination in both directions and that workflow stages never overwrite a
+campaign's status.
+"""
+
+import tempfile
+
+from backend.campaigns.repository import CampaignRepository, decode_cursor, encode_cursor
+
+def _fill(repository, n):
+    for i in range(n):
+        repository.upsert(f"c{i:02d}", name=f"Campaign {i:02d}", client=f"client{i % 3}",
+                          status="active" if i % 2 else "paused")
+
+def test_journal_replay_and_compaction():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        repository = CampaignRepository(storage_dir)
+        _fill(repository, 10)
+        repository.set_status("c01", "completed")
+        repository.delete("c02")
+        assert repository.set_status("missing", "active") is None
+
+        reloaded = CampaignRepository(storage_dir)
+        assert len(reloaded) == 9 and reloaded.get("c02") is None
+        assert reloaded.get("c01")["status"] == "completed"
+        expected = {"active": 4, "paused": 4, "completed": 1}
+        assert reloaded.count_by_status() == repository.count_by_status() == expected
+
+        # Rewrites grow the journal until it is compacted down to the live set
+        for i in range(200):
+            repository.set_status("c03", "active" if i % 2 else "paused")
+        with open(repository.journal_file) as f:
+            assert sum(1 for _ in f) <= 2 * len(repository) + 100
+        assert CampaignRepository(storage_dir).get("c03")["status"] == "active"
+
+def test_index_queries_and_cursors():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        repository = CampaignRepository(storage_dir)
+        _fill(repository, 30)
+
+        for descending in (True, False):
+            seen, after = [], None
+            while True:
+                page, after = repository.query(statuses=["active"], clients=["client0", "client1"],
+                                               sort="name", descending=descending, after=after, limit=4)
+                seen += [c["id"] for c in page]
+                if after is None:
+                    break
+                after = decode_cursor(encode_cursor(after))
+            expected = sorted(f"c{i:02d}" for i in range(30) if i % 2 and i % 3 != 2)
+            assert seen == (expected[::-1] if descending else expected)
+
+        # Index entries follow updates
+        repository.upsert("c00", client="client9", status="active")
+        page, _ = repository.query(clients=["client9"])
+        assert [c["id"] for c in page] == ["c00"]
+        page, _ = repository.query(statuses=["paused"], clients=["client0"], limit=100)
+        assert "c00" not in [c["id"] for c in page]
+
+        for bad in ("not-a-cursor", encode_cursor(("x", "y"))[:-2]):
+            try:
+                decode_cursor(bad)
+                assert False, bad
+            except ValueError:
+                pass
+        try:
+            repository.query(sort="impressions")
+            assert False, "unknown sort accepted"
+        except ValueError:
+            pass
+
+def test_workflow_stage_keeps_status():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        repository = CampaignRepository(storage_dir)
+        repository.upsert("c1", status="active")
+        repository.set_workflow_stage("c1", "strategy_started", "2025-01-01T00:00:00")
+        record = repository.get("c1")
+        assert record["status"] == "active" and record["workflow_stage"] == "strategy_started"
+        assert repository.count_by_status() == {"active": 1}
+        assert repository.set_workflow_stage("missing", "started") is None
+
+if __name__ == "__main__":
+    test_journal_replay_and_compaction()
+    test_index_queries_and_cursors()
+    test_workflow_stage_keeps_status()
@@ -16,15 +16,15 @@ We added even more mailboxes for our AI-Native Ad Agency dashboard,
 so now you can also get information about campaigns, agents, and analytics!"
 """
 
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 import logging
 import mimetypes
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # FastAPI imports
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
@@ -33,12 +33,29 @@ from dotenv import load_dotenv
 from backend.agents.factory import get_agent
 
 import uvicorn
+import numpy as np
 
 from backend.observability.api import add_observability_endpoints
 from backend.observability.factory import create_workflow_monitor
+from backend.observability.simple.logstore import LogStore
+from backend.observability.simple.retention import WorkflowCompactor
+from backend.analytics.store import EventStore, GRANULARITIES, METRICS, bucket_label
+from backend.analytics.ingest import IngestBuffer, IngestError, decode_batch
+from backend.analytics.rollups import AnalyticsRollups
+from backend.analytics.sketches import DIMENSIONS, SketchStore
+from backend.analytics.downsample import METHODS as DOWNSAMPLE_METHODS, downsample, source_granularity
+from backend.blueprints.store import get_blueprint_store
+from backend.campaigns.repository import SORT_FIELDS, decode_cursor, encode_cursor, get_campaign_repository
+from backend.observability.events import workflow_events
+from backend.observability.metrics import INGESTED_EVENTS
+from backend.utils.http_cache import CompressionMiddleware, PrecompressedStaticFiles
+from backend.utils.json_response import dumps as json_dumps, json_response
+from backend.utils.http_cache import content_etag, etag_matches
+from backend.utils.snapshot_cache import SnapshotCache
 import os
 os.makedirs("data/workflow", exist_ok=True)
 os.makedirs("logs", exist_ok=True)
+os.makedirs("data/analytics", exist_ok=True)
 
 # Load environment variables
 load_dotenv()  # load OPENAI_API_KEY
@@ -47,6 +64,60 @@ load_dotenv()  # load OPENAI_API_KEY
 app = FastAPI(title="AI-Native Ad Agency API")
 add_observability_endpoints(app)
 
+# Indexed reader over the per-agent task logs written by SimpleTaskMonitor
+log_store = LogStore("logs")
+
+# Columnar store of impression/click/conversion events behind /api/analytics
+event_store = EventStore("data/analytics")
+
+# Running totals for the overview, kept in step with every append to event_store
+analytics_rollups = AnalyticsRollups(event_store)
+
+# Indexed campaign records; the director writes to the same repository
+campaign_repository = get_campaign_repository()
+
+# Generated L0–L4 blueprints, shared with FuncArchAgent
+blueprint_store = get_blueprint_store()
+
+# In-memory buffer that group-commits ingested events into event_store
+ingest_buffer = IngestBuffer(event_store)
+
+# Ingested events must name a campaign of the repository (or one already in the
+# event store); set ANALYTICS_REQUIRE_KNOWN_CAMPAIGNS=0 for synthetic load tests
+REQUIRE_KNOWN_CAMPAIGNS = os.getenv("ANALYTICS_REQUIRE_KNOWN_CAMPAIGNS", "1") != "0"
+
+def _known_campaign(campaign_id: str) -> bool:
+    return campaign_repository.get(campaign_id) is not None
+
+# Per-campaign reach / heavy-hitter / CTR sketches, fed from committed batches;
+# changed campaigns are saved every ANALYTICS_SKETCH_SAVE_SECONDS
+sketch_store = SketchStore("data/analytics/sketches",
+                           save_interval_seconds=float(os.getenv("ANALYTICS_SKETCH_SAVE_SECONDS", "60")))
+
+def _sketch_batch(batch) -> None:
+    sketch_store.update(
+        batch.codes, event_store.campaign_name, batch.ts,
+        batch.metrics["impressions"], batch.metrics["clicks"],
+        user_hashes=batch.user_hashes, dimensions=batch.dimensions
+    )
+
+ingest_buffer.add_listener(_sketch_batch)
+
+# Background retention/archival of workflow history (data/workflow/campaigns.json)
+workflow_compactor = WorkflowCompactor(create_workflow_monitor())
+
+@app.on_event("startup")
+def start_background_jobs():
+    workflow_compactor.start()
+    ingest_buffer.start()
+    sketch_store.start()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    workflow_compactor.stop()
+    ingest_buffer.stop()
+    sketch_store.stop()
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -54,8 +125,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor"],  # Pagination cursors are read by browser clients
 )
 
+# Cache-Control per API route prefix (first match wins), for successful
+# responses only. Everything else revalidates with the content-hashed ETag
+# the middleware adds. Per-agent routes (live logs) are never served stale.
+CACHE_POLICIES = [
+    ("/api/agents/", "no-cache"),
+    ("/api/agents", "private, max-age=30"),
+    ("/api/analytics/campaigns/", "private, max-age=30"),
+    ("/api/analytics/", "private, max-age=5"),
+    ("/api/", "no-cache"),
+]
+
+# gzip/brotli + ETags for API responses (static files come precompressed)
+app.add_middleware(CompressionMiddleware, cache_policies=CACHE_POLICIES)
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -82,6 +168,9 @@ class Campaign(BaseModel):
     impressions: int
     clicks: int
     ctr: float
+    workflow_stage: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
 
 class Agent(BaseModel):
     id: str
@@ -102,61 +191,13 @@ class OverviewMetrics(BaseModel):
 
 class TimeSeriesPoint(BaseModel):
     name: str
-    impressions: int
-    clicks: int
-    conversions: int
+    start: Optional[datetime] = None
+    impressions: Optional[int] = None
+    clicks: Optional[int] = None
+    conversions: Optional[int] = None
 
 # ========== SAMPLE DATA (REPLACE WITH DATABASE IN PRODUCTION) ==========
 
-# Sample campaign data
-campaigns = [
-    {
-        "id": "cam_1",
-        "name": "Summer Promotion 2025",
-        "client": "SunFun Co.",
-        "status": "active",
-        "impressions": 750000,
-        "clicks": 32000,
-        "ctr": 4.27
-    },
-    {
-        "id": "cam_2",
-        "name": "Product Launch X200",
-        "client": "TechGiant",
-        "status": "active",
-        "impressions": 500000,
-        "clicks": 18500,
-        "ctr": 3.7
-    },
-    {
-        "id": "cam_3",
-        "name": "Fall Collection Preview",
-        "client": "Fashion Forward",
-        "status": "planning",
-        "impressions": 0,
-        "clicks": 0,
-        "ctr": 0
-    },
-    {
-        "id": "cam_4",
-        "name": "Holiday Season Special",
-        "client": "Gifty",
-        "status": "planning",
-        "impressions": 0,
-        "clicks": 0,
-        "ctr": 0
-    },
-    {
-        "id": "cam_5",
-        "name": "Back to School",
-        "client": "EduSupplies",
-        "status": "active",
-        "impressions": 1200000,
-        "clicks": 37000,
-        "ctr": 3.08
-    }
-]
-
 # Sample agent data
 agents_data = [
     {
@@ -224,6 +265,44 @@ agents_data = [
     }
 ]
 
+# Agents by id, so lookups do not scan the list
+agents_by_id = {a["id"]: a for a in agents_data}
+
+# Campaign clients and statuses feed the per-client totals and per-status counts of the overview
+for _campaign in campaign_repository.all():
+    analytics_rollups.set_campaign(_campaign["id"], client=_campaign.get("client"), status=_campaign.get("status"))
+
+def _follow_campaign(record: Optional[dict], previous: Optional[dict]) -> None:
+    if record is None:
+        analytics_rollups.remove_campaign(previous["id"])
+    else:
+        analytics_rollups.set_campaign(record["id"], client=record.get("client"), status=record.get("status"))
+
+def _track_campaign_status(event_type: str, data: dict) -> None:
+    # Workflow stages of known campaigns are kept next to their repository status
+    if event_type == "campaign":
+        campaign_repository.set_workflow_stage(data["id"], data["status"], data.get("timestamp"))
+
+campaign_repository.add_listener(_follow_campaign)
+workflow_events.add_listener(_track_campaign_status)
+
+def campaign_view(record: dict) -> dict:
+    """Campaign record plus its delivery totals from the analytics rollups."""
+    totals = analytics_rollups.campaign_totals(record["id"])
+    impressions, clicks = totals["impressions"], totals["clicks"]
+    return {
+        "id": record["id"],
+        "name": record.get("name") or record["id"],
+        "client": record.get("client") or "",
+        "status": record.get("status") or "",
+        "impressions": impressions,
+        "clicks": clicks,
+        "ctr": round(clicks / impressions * 100, 2) if impressions > 0 else 0,
+        "workflow_stage": record.get("workflow_stage"),
+        "created_at": record.get("created_at"),
+        "updated_at": record.get("updated_at")
+    }
+
 # ========== API ENDPOINTS ==========
 
 # Agent endpoint
@@ -241,19 +320,63 @@ def call_agent(req: AgentRequest):
         logger.exception("Agent %s raised exception", req.agent)
         raise HTTPException(status_code=500, detail=str(e))
 
-    return {"result": result}
+    # Director packages run to megabytes; encode them with orjson in one pass
+    return json_response({"result": result})
+
+# Blueprint store (FuncArchAgent results)
+@app.get("/api/blueprints")
+def list_blueprints():
+    return blueprint_store.entries()
+
+@app.delete("/api/blueprints")
+def invalidate_blueprints(
+    function_name: Optional[str] = Query(None, description="Only blueprints for this function"),
+    framework: Optional[str] = Query(None, description="Only blueprints for this framework"),
+    context: Optional[str] = Query(None, description="Only blueprints for this context")
+):
+    # With no filters every stored blueprint is dropped
+    return {"removed": blueprint_store.invalidate(function_name, framework, context)}
 
 # Campaign related endpoints
 @app.get("/api/campaigns", response_model=List[Campaign])
-def get_campaigns():
-    return campaigns
+def get_campaigns(
+    response: Response,
+    status: Optional[List[str]] = Query(None, description="Only these statuses (repeatable)"),
+    client: Optional[List[str]] = Query(None, description="Only these clients (repeatable)"),
+    sort: str = Query("created_at", description=f"Sort field ({', '.join(SORT_FIELDS)})"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    try:
+        page, next_key = campaign_repository.query(
+            statuses=status,
+            clients=client,
+            sort=sort,
+            descending=(order == "desc"),
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(next_key)
+    return [campaign_view(c) for c in page]
 
 @app.get("/api/campaigns/{campaign_id}", response_model=Campaign)
 def get_campaign(campaign_id: str):
-    campaign = next((c for c in campaigns if c['id'] == campaign_id), None)
+    campaign = campaign_repository.get(campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    return campaign
+    return campaign_view(campaign)
+
+@app.get("/api/campaigns/{campaign_id}/results")
+def get_campaign_results(campaign_id: str):
+    # Campaign package saved by the director when the workflow completed
+    results = campaign_repository.get_results(campaign_id)
+    if results is None:
+        raise HTTPException(status_code=404, detail="No results for this campaign")
+    return json_response(results)
 
 # Agent related endpoints
 @app.get("/api/agents", response_model=List[Agent])
@@ -262,65 +385,318 @@ def get_agents():
 
 @app.get("/api/agents/{agent_id}", response_model=Agent)
 def get_agent_by_id(agent_id: str):
-    agent = next((a for a in agents_data if a['id'] == agent_id), None)
+    agent = agents_by_id.get(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     return agent
 
 @app.get("/api/agents/{agent_id}/logs")
-def get_agent_logs(agent_id: str):
-    # In a real implementation, this would fetch logs from a database or log file
-    return [
-        {"timestamp": (datetime.now() - timedelta(minutes=5)).isoformat(), "level": "INFO", "message": "Task completed successfully"},
-        {"timestamp": (datetime.now() - timedelta(minutes=10)).isoformat(), "level": "INFO", "message": "Started processing task"},
-        {"timestamp": (datetime.now() - timedelta(hours=1)).isoformat(), "level": "WARN", "message": "API rate limit approaching"}
-    ]
+def get_agent_logs(
+    agent_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of entries"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    level: Optional[str] = Query(None, description="Only entries at this level (INFO, WARN, ERROR)"),
+    task_id: Optional[str] = Query(None, description="Only entries for this task"),
+    campaign_id: Optional[str] = Query(None, description="Only entries for this campaign"),
+    since: Optional[datetime] = Query(None, description="Only entries at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only entries at or before this time")
+):
+    # Newest first; the cursor for the next (older) page is returned in X-Next-Cursor
+    try:
+        entries, next_cursor = log_store.query(
+            agent_id,
+            limit=limit,
+            cursor=cursor,
+            level=level,
+            task_id=task_id,
+            campaign_id=campaign_id,
+            since=since.timestamp() if since else None,
+            until=until.timestamp() if until else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
 
 # Analytics related endpoints
+def analytics_overview() -> dict:
+    """Overview panel values, served from the materialized rollups (no scan over campaigns or events)."""
+    overview = analytics_rollups.overview()
+    totals, status_counts = overview["totals"], overview["status_counts"]
+    impressions, clicks = totals["impressions"], totals["clicks"]
+
+    return {
+        "activeCampaigns": status_counts.get("active", 0),
+        "completedCampaigns": status_counts.get("completed", 0),
+        "totalImpressions": impressions,
+        "totalClicks": clicks,
+        "averageCTR": round(clicks / impressions * 100, 2) if impressions > 0 else 0,
+        "totalConversions": totals["conversions"]
+    }
+
 @app.get("/api/analytics/overview", response_model=OverviewMetrics)
 def get_overview_metrics():
-    # Calculate overview metrics from the campaigns data
-    active_campaigns = sum(1 for c in campaigns if c['status'] == 'active')
-    completed_campaigns = sum(1 for c in campaigns if c['status'] == 'completed')
-    total_impressions = sum(c['impressions'] for c in campaigns)
-    total_clicks = sum(c['clicks'] for c in campaigns)
-    avg_ctr = round(total_clicks / total_impressions * 100, 2) if total_impressions > 0 else 0
-    total_conversions = int(total_clicks * 0.05)  # Assuming 5% conversion rate
-    
+    return analytics_overview()
+
+@app.post("/api/analytics/rollups/rebuild")
+def rebuild_analytics_rollups():
+    # Recompute the overview totals from raw events and report any drift
+    return analytics_rollups.rebuild()
+
+@app.post("/api/analytics/events", status_code=202)
+async def ingest_events(request: Request, response: Response):
+    # NDJSON or binary batch; see backend/analytics/ingest.py for the wire formats
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    body = await request.body()
+    try:
+        # CPU-bound decode off the event loop
+        batch = await run_in_threadpool(decode_batch, body, content_type, event_store,
+                                        _known_campaign if REQUIRE_KNOWN_CAMPAIGNS else None)
+    except IngestError as e:
+        INGESTED_EVENTS.inc(result="rejected")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(batch) > ingest_buffer.capacity:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {ingest_buffer.capacity} events; split it")
+
+    accepted = ingest_buffer.offer(batch)
+    # Buffer fill level on every answer, so clients can slow down before hitting 429
+    backpressure = {
+        "X-Ingest-Buffered": str(ingest_buffer.pending),
+        "X-Ingest-Capacity": str(ingest_buffer.capacity),
+    }
+    if not accepted:
+        INGESTED_EVENTS.inc(len(batch), result="rejected")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Ingest buffer full; retry later", "accepted": 0},
+            headers={**backpressure, "Retry-After": str(ingest_buffer.retry_after)}
+        )
+
+    INGESTED_EVENTS.inc(len(batch), result="accepted")
+    response.headers.update(backpressure)
+    return {"accepted": len(batch)}
+
+def _utc_seconds(value: datetime) -> int:
+    """Epoch seconds of a query datetime; naive values are UTC, like the bucket labels."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _campaign_sketch(campaign_id: str, start: Optional[datetime], end: Optional[datetime]):
+    sketch = sketch_store.merged(
+        campaign_id,
+        _utc_seconds(start) if start else None,
+        _utc_seconds(end) if end else None
+    )
+    if sketch is None:
+        raise HTTPException(status_code=404, detail="No sketches for this campaign")
+    return sketch
+
+@app.get("/api/analytics/campaigns/{campaign_id}/reach")
+def get_campaign_reach(
+    campaign_id: str,
+    start: Optional[datetime] = Query(None, description="Range start (day resolution)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive")
+):
+    # Approximate unique users (HyperLogLog)
+    sketch = _campaign_sketch(campaign_id, start, end)
+    return {
+        "campaign_id": campaign_id,
+        "unique_users": int(round(sketch.users.estimate())),
+        "relative_error": round(sketch.users.relative_error, 4)
+    }
+
+@app.get("/api/analytics/campaigns/{campaign_id}/top/{dimension}")
+def get_campaign_top(
+    campaign_id: str,
+    dimension: str,
+    k: int = Query(10, ge=1, le=20),
+    start: Optional[datetime] = Query(None, description="Range start (day resolution)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive")
+):
+    # Heaviest creatives or placements by impressions (Count-Min estimates, never undercounted)
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown dimension: {dimension}")
+    sketch = _campaign_sketch(campaign_id, start, end)
     return {
-        "activeCampaigns": active_campaigns,
-        "completedCampaigns": completed_campaigns,
-        "totalImpressions": total_impressions,
-        "totalClicks": total_clicks,
-        "averageCTR": avg_ctr,
-        "totalConversions": total_conversions
+        "campaign_id": campaign_id,
+        "dimension": dimension,
+        "items": [{"key": key, "impressions": count} for key, count in sketch.heavy[dimension].top(k)]
+    }
+
+@app.get("/api/analytics/campaigns/{campaign_id}/ctr-distribution")
+def get_campaign_ctr_distribution(
+    campaign_id: str,
+    q: List[float] = Query([0.1, 0.25, 0.5, 0.75, 0.9, 0.99], description="Quantiles (repeatable)"),
+    start: Optional[datetime] = Query(None, description="Range start (day resolution)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive")
+):
+    # Impression-weighted CTR quantiles (t-digest)
+    if any(not 0 <= x <= 1 for x in q):
+        raise HTTPException(status_code=400, detail="Quantiles must be between 0 and 1")
+    sketch = _campaign_sketch(campaign_id, start, end)
+    return {
+        "campaign_id": campaign_id,
+        "impressions": int(sketch.ctr.total),
+        "quantiles": {str(x): sketch.ctr.quantile(x) for x in q}
+    }
+
+# Legacy "period" presets: (granularity, number of buckets back from now)
+TIMESERIES_PERIODS = {
+    "weekly": ("week", 4),
+    "monthly": ("month", 5),
+}
+
+def timeseries_range(period: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     granularity: Optional[str] = None) -> Optional[Tuple[int, int, str]]:
+    """
+    Resolve a period preset and/or explicit bounds to (start_ts, end_ts, granularity).
+
+    Returns None for an unknown period without an explicit start.
+
+    Raises:
+        ValueError: On an unknown granularity or an empty range
+    """
+    if start is None and period not in TIMESERIES_PERIODS:
+        return None
+    default_granularity, buckets = TIMESERIES_PERIODS.get(period, TIMESERIES_PERIODS["weekly"])
+    granularity = granularity or default_granularity
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    end_ts = _utc_seconds(end) if end else int(datetime.now().timestamp())
+    if start is not None:
+        start_ts = _utc_seconds(start)
+    elif granularity == "month":
+        start_ts = int((np.datetime64(end_ts, "s").astype("datetime64[M]") - (buckets - 1))
+                       .astype("datetime64[s]").astype(np.int64))
+    else:
+        start_ts = end_ts - GRANULARITIES[granularity] * buckets
+    if start_ts >= end_ts:
+        raise ValueError("start must be before end")
+    return start_ts, end_ts, granularity
+
+def timeseries_points(metrics: Sequence[str], start_ts: int, end_ts: int, granularity: str,
+                      campaign_ids: Optional[List[str]] = None, max_points: Optional[int] = None,
+                      method: str = "lttb") -> Tuple[List[dict], Optional[str]]:
+    """
+    Bucketed metric sums for a range, optionally downsampled.
+
+    Returns:
+        (points, X-Downsampled header value or None)
+
+    Raises:
+        ValueError: On an unknown downsampling method or too many buckets for the range
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    downsampled = None
+    if max_points:
+        # Start from the coarsest pre-aggregated resolution that still has enough points
+        granularity = source_granularity(start_ts, end_ts, granularity, max_points)
+    series = event_store.aggregate(start_ts, end_ts, granularity, campaign_ids=campaign_ids, metrics=metrics)
+    if max_points:
+        series, source_points = downsample(series, max_points, method, primary=metrics[0])
+        downsampled = f"{method}; source={granularity}; points={source_points}"
+
+    points = [
+        {
+            "name": bucket_label(bucket_start, granularity),
+            "start": datetime.fromtimestamp(int(bucket_start), tz=timezone.utc),
+            **{m: int(series[m][i]) for m in metrics}
+        }
+        for i, bucket_start in enumerate(series["bucket_start"])
+    ]
+    return points, downsampled
+
+@app.get(
+    "/api/analytics/timeseries/{metric}",
+    response_model=List[TimeSeriesPoint],
+    response_model_exclude_none=True
+)
+def get_timeseries_data(
+    metric: str,
+    response: Response,
+    period: str = Query("weekly", description="Time period preset (weekly, monthly)"),
+    start: Optional[datetime] = Query(None, description="Range start (overrides period)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive (defaults to now)"),
+    granularity: Optional[str] = Query(None, description="Bucket size (minute, hour, day, week, month)"),
+    campaign_id: Optional[List[str]] = Query(None, description="Only these campaigns (repeatable)"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000, description="Downsample to at most this many points"),
+    method: str = Query("lttb", description=f"Downsampling method ({', '.join(DOWNSAMPLE_METHODS)})")
+):
+    # "campaign_performance" returns every metric; a metric name returns just that one
+    if metric == "campaign_performance":
+        metrics = METRICS
+    elif metric in METRICS:
+        metrics = (metric,)
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown metric: {metric}")
+
+    try:
+        bounds = timeseries_range(period, start, end, granularity)
+        if bounds is None:
+            return []  # Return empty data for unknown periods
+        points, downsampled = timeseries_points(metrics, *bounds, campaign_ids=campaign_id,
+                                                max_points=max_points, method=method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if downsampled:
+        response.headers["X-Downsampled"] = downsampled
+    return points
+
+# Dashboard snapshot: every panel of dashboard.html in one response
+SNAPSHOT_TTL_SECONDS = 2.0
+SNAPSHOT_CAMPAIGNS = 100
+SNAPSHOT_LOG_ENTRIES = 20
+
+def _snapshot_timeseries(period: str) -> List[dict]:
+    points, _ = timeseries_points(METRICS, *timeseries_range(period))
+    return [TimeSeriesPoint(**p).model_dump(mode="json", exclude_none=True) for p in points]
+
+def build_dashboard_snapshot():
+    """Serialized snapshot plus its ETag, built once and shared by every viewer."""
+    page, next_key = campaign_repository.query(limit=SNAPSHOT_CAMPAIGNS)
+    logs = {}
+    for agent in agents_data:
+        logs[agent["id"]], _ = log_store.query(agent["id"], limit=SNAPSHOT_LOG_ENTRIES)
+    # Same services and response models as the individual endpoints
+    snapshot = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "overview": OverviewMetrics(**analytics_overview()).model_dump(),
+        "campaigns": [Campaign(**campaign_view(c)).model_dump() for c in page],
+        "campaigns_next_cursor": encode_cursor(next_key) if next_key is not None else None,
+        "timeseries": {period: _snapshot_timeseries(period) for period in TIMESERIES_PERIODS},
+        "agents": [Agent(**a).model_dump() for a in agents_data],
+        "logs": logs,
     }
+    body = json_dumps(snapshot)
+    return body, content_etag(body)
+
+dashboard_snapshot = SnapshotCache("dashboard_snapshot", build_dashboard_snapshot, ttl=SNAPSHOT_TTL_SECONDS)
+
+# Campaign and workflow writes show up on the next request; event totals within the TTL
+campaign_repository.add_listener(lambda record, previous: dashboard_snapshot.invalidate())
+workflow_events.add_listener(lambda event_type, data: dashboard_snapshot.invalidate())
 
-@app.get("/api/analytics/timeseries/{metric}", response_model=List[TimeSeriesPoint])
-def get_timeseries_data(metric: str, period: str = Query("weekly", description="Time period (weekly, monthly)")):
-    # Sample time series data for performance metrics
-    if period == "weekly":
-        return [
-            {"name": "Week 1", "impressions": 450000, "clicks": 15750, "conversions": 810},
-            {"name": "Week 2", "impressions": 520000, "clicks": 18200, "conversions": 940},
-            {"name": "Week 3", "impressions": 680000, "clicks": 23800, "conversions": 1230},
-            {"name": "Week 4", "impressions": 800000, "clicks": 29750, "conversions": 1340}
-        ]
-    elif period == "monthly":
-        return [
-            {"name": "Jan", "impressions": 1800000, "clicks": 63000, "conversions": 3240},
-            {"name": "Feb", "impressions": 2100000, "clicks": 73500, "conversions": 3780},
-            {"name": "Mar", "impressions": 2450000, "clicks": 85750, "conversions": 4410},
-            {"name": "Apr", "impressions": 2720000, "clicks": 95200, "conversions": 4900},
-            {"name": "May", "impressions": 2450000, "clicks": 87500, "conversions": 4320}
-        ]
-    
-    return []  # Return empty data for unknown periods
+@app.get("/api/dashboard/snapshot")
+def get_dashboard_snapshot(request: Request):
+    # Overview, campaigns, timeseries (weekly and monthly), agents and recent logs
+    body, etag = dashboard_snapshot.get()
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Snapshot-Age": f"{dashboard_snapshot.age:.3f}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ========== STATIC FILE SERVING ==========
 
 # Serve the frontend directory (Blueprint Maker and dashboard)
-app.mount("/", StaticFiles(directory="frontend", html=True), name="frontend")
+# gzip/brotli variants are built once here and served with content-hashed ETags
+app.mount("/", PrecompressedStaticFiles(directory="frontend", html=True), name="frontend")
 
 # ========== SERVER STARTUP ==========
 
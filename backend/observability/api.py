@@ -8,40 +8,97 @@ This module provides FastAPI endpoints for retrieving campaign and agent
 status information from the observability system.
 """
 
-from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Depends
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
+from .events import HEARTBEAT_SECONDS, DEFAULT_SUBSCRIBER_BUFFER, format_sse, workflow_events
 from .factory import create_workflow_monitor
 from .interfaces import WorkflowMonitor
+from .metrics import CONTENT_TYPE_LATEST, render_metrics
+from backend.utils.http_cache import etag_matches
+from backend.utils.json_response import json_response
 
 # Create a router for workflow endpoints
 workflow_router = APIRouter(prefix="/api/workflow", tags=["Workflow"])
 
+# Router for the Prometheus scrape endpoint
+metrics_router = APIRouter(tags=["Metrics"])
+
 # Dependency to get workflow monitor
 def get_workflow_monitor() -> WorkflowMonitor:
     """Dependency to get a workflow monitor instance."""
     return create_workflow_monitor()
 
+def _encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, campaign_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(campaign_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @workflow_router.get("/campaigns")
 async def get_workflow_campaigns(
+    request: Request,
+    status: Optional[str] = Query(None, description="Comma-separated current statuses to include"),
+    since: Optional[datetime] = Query(None, description="Only campaigns updated at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only campaigns updated at or before this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,current_status,updated_at"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of campaigns"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Creation order: desc (newest first) or asc"),
+    if_none_match: Optional[str] = Header(None),
     workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
-) -> List[Dict[str, Any]]:
+) -> Response:
     """
-    Get all campaign workflow statuses.
+    Get one page of campaign workflow statuses.
     
     Returns a list of campaign status objects, each including:
     - ID
     - Current status
-    - Status history
+    - Status history (leave it out with ``fields``)
     - Timestamps
+    
+    The ETag is derived from the monitor version and the query, so a poll
+    with a matching If-None-Match returns 304 without reading any state.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    return workflow_monitor.get_campaign_status()
+    query_key = sorted((k, v) for k, v in request.query_params.multi_items())
+    digest = hashlib.blake2b(
+        json.dumps([workflow_monitor.get_version(), query_key]).encode("utf-8"), digest_size=12
+    ).hexdigest()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    campaigns, next_key = workflow_monitor.query_campaigns(
+        statuses=[s.strip() for s in status.split(",") if s.strip()] if status else None,
+        since=since.isoformat() if since else None,
+        until=until.isoformat() if until else None,
+        after=_decode_cursor(cursor) if cursor else None,
+        limit=limit,
+        descending=(order == "desc")
+    )
+    if fields:
+        wanted = [f.strip() for f in fields.split(",") if f.strip()]
+        campaigns = [{f: c[f] for f in wanted if f in c} for c in campaigns]
+    if next_key is not None:
+        headers["X-Next-Cursor"] = _encode_cursor(next_key)
+    return json_response(campaigns, headers=headers)
 
 @workflow_router.get("/campaign/{campaign_id}")
 async def get_campaign_workflow(
     campaign_id: str,
     workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get detailed workflow status for a specific campaign.
     
@@ -57,12 +114,47 @@ async def get_campaign_workflow(
     campaign = workflow_monitor.get_campaign_status(campaign_id)
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
-    return campaign
+    return json_response(campaign)
+
+@workflow_router.get("/archive")
+async def get_workflow_archive(
+    workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
+) -> List[Dict[str, Any]]:
+    """
+    List the months that have archived campaigns, newest first.
+    
+    Returns a list of objects with the month (YYYY-MM) and campaign count.
+    """
+    return workflow_monitor.get_archive_months()
+
+@workflow_router.get("/archive/{month}")
+async def get_workflow_archive_month(
+    month: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,current_status,updated_at"),
+    workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
+) -> Response:
+    """
+    Get every campaign archived for a month.
+    
+    Args:
+        month: Archive month in YYYY-MM form
+    
+    Raises:
+        HTTPException: If the month is malformed
+    """
+    try:
+        campaigns = workflow_monitor.get_archived_campaigns(month)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fields:
+        wanted = [f.strip() for f in fields.split(",") if f.strip()]
+        campaigns = [{f: c[f] for f in wanted if f in c} for c in campaigns]
+    return json_response(campaigns)
 
 @workflow_router.get("/agents")
 async def get_workflow_agents(
     workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
-) -> Dict[str, Dict[str, Any]]:
+) -> Response:
     """
     Get all agent statuses.
     
@@ -71,13 +163,13 @@ async def get_workflow_agents(
     - Current task (if any)
     - Last update timestamp
     """
-    return workflow_monitor.get_agent_status()
+    return json_response(workflow_monitor.get_agent_status())
 
 @workflow_router.get("/agent/{agent_id}")
 async def get_agent_status(
     agent_id: str,
     workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get status for a specific agent.
     
@@ -93,7 +185,77 @@ async def get_agent_status(
     agent = workflow_monitor.get_agent_status(agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
-    return agent
+    return json_response(agent)
+
+@workflow_router.get("/stream")
+async def stream_workflow(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    buffer: int = Query(DEFAULT_SUBSCRIBER_BUFFER, ge=1, le=10000,
+                        description="Maximum undelivered events kept for this client"),
+    workflow_monitor: WorkflowMonitor = Depends(get_workflow_monitor)
+) -> StreamingResponse:
+    """
+    Stream campaign and agent status changes as Server-Sent Events.
+    
+    Each connection starts with a ``snapshot`` event (unless the client resumes
+    with a ``Last-Event-ID`` from this process still held in the replay
+    buffer), followed by
+    ``campaign`` and ``agent`` delta events as the workflow monitor records
+    them. State is served from memory, so viewers add no disk reads after the
+    first one per process.
+    
+    Args:
+        last_event_id: Id of the last event the client received (sent
+            automatically by EventSource on reconnect)
+        buffer: Per-subscriber buffer size; a client that falls further behind
+            is sent a fresh snapshot instead of the missed deltas
+    """
+    workflow_events.prime(lambda: (
+        workflow_monitor.get_campaign_status() or [],
+        workflow_monitor.get_agent_status() or {}
+    ))
+    subscriber, replay, needs_snapshot = workflow_events.subscribe(last_event_id, buffer)
+
+    async def event_source():
+        try:
+            if needs_snapshot:
+                # Anything already queued is included in the snapshot
+                subscriber.drain()
+                event_id, state = workflow_events.snapshot()
+                yield format_sse(event_id, "snapshot", state)
+            for seq, event_type, data in replay:
+                yield format_sse(workflow_events.wire_id(seq), event_type, data)
+
+            while not await request.is_disconnected():
+                if not await subscriber.wait(HEARTBEAT_SECONDS):
+                    yield ": keep-alive\n\n"
+                    continue
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    subscriber.drain()
+                    event_id, state = workflow_events.snapshot()
+                    yield format_sse(event_id, "snapshot", state)
+                    continue
+                for seq, event_type, data in subscriber.drain():
+                    yield format_sse(workflow_events.wire_id(seq), event_type, data)
+        finally:
+            workflow_events.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@metrics_router.get("/metrics")
+def get_metrics() -> Response:
+    """
+    Expose all metrics in the Prometheus text exposition format.
+    
+    Per-thread counter shards are aggregated here, at scrape time.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 def add_observability_endpoints(app):
     """
@@ -105,4 +267,5 @@ def add_observability_endpoints(app):
     Args:
         app: The FastAPI application to add endpoints to
     """
-    app.include_router(workflow_router)
\ No newline at end of file
+    app.include_router(workflow_router)
+    app.include_router(metrics_router)
\ No newline at end of file
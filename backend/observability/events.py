@@ -0,0 +1,261 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+In-process event bus for workflow status deltas.
+
+The workflow monitor publishes a small delta every time a campaign or agent
+status changes. The bus keeps:
+
+- a ring buffer of recent events, so reconnecting clients can resume from
+  their ``Last-Event-ID`` without missing anything;
+- a per-boot epoch in every event id (``<epoch>-<seq>``), because the
+  sequence restarts at 1 with the process: an id from another boot gets a
+  snapshot instead of a replay anchored on an unrelated event;
+- an in-memory view of the current campaign and agent state, so new
+  subscribers get an initial snapshot without touching the JSON files;
+- one bounded buffer per subscriber, so a slow dashboard can never make the
+  publisher block or grow memory without limit.
+
+Publishing happens on whatever thread updated the monitor; subscribers are
+consumed from the asyncio event loop that serves ``/api/workflow/stream``.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .metrics import QUEUE_DEPTH
+
+DEFAULT_HISTORY_SIZE = 1000
+DEFAULT_SUBSCRIBER_BUFFER = 256
+HEARTBEAT_SECONDS = 15.0
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+def format_sse(event_id: Optional[str], event_type: str, data: Dict[str, Any]) -> str:
+    """Encode one event in the text/event-stream wire format."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscriber:
+    """
+    A single stream consumer with a bounded buffer.
+
+    When the buffer overflows, the oldest events are dropped and the
+    subscriber is flagged so the stream can send a fresh snapshot instead.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self.loop = loop
+        self.buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self.overflowed = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        """Called from any thread by the publisher."""
+        if len(self.buffer) == self.buffer.maxlen:
+            self.overflowed = True
+        self.buffer.append(event)
+        try:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Event loop already closed; the stream is going away anyway
+            pass
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for new events; returns False on timeout."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._wakeup.clear()
+        return True
+
+    def drain(self) -> List[Event]:
+        events = []
+        while self.buffer:
+            events.append(self.buffer.popleft())
+        return events
+
+
+class WorkflowEventBus:
+    """Fan-out of workflow deltas to stream subscribers."""
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: List[Subscriber] = []
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+        # Current state, mirrored from deltas
+        self._campaigns: Dict[str, Dict[str, Any]] = {}
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._primed = False
+
+    # ---------- publishing ----------
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> int:
+        """
+        Record a delta and hand it to every subscriber.
+
+        Args:
+            event_type: "campaign" or "agent"
+            data: Delta payload; must include an "id" key
+
+        Returns:
+            The sequence number assigned to the event
+        """
+        with self._lock:
+            event_id = next(self._ids)
+            self._last_id = event_id
+            event = (event_id, event_type, data)
+            self._history.append(event)
+            self._apply(event_type, data)
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            subscriber.push(event)
+        for listener in self._listeners:
+            listener(event_type, data)
+        if subscribers:
+            QUEUE_DEPTH.set(max(len(s.buffer) for s in subscribers), queue="workflow_stream")
+        return event_id
+
+    def publish_campaign(self, campaign_id: str, status: str, timestamp: str,
+                         metadata: Optional[Dict[str, Any]] = None) -> int:
+        return self.publish("campaign", {
+            "id": campaign_id,
+            "status": status,
+            "timestamp": timestamp,
+            "metadata": metadata or {},
+        })
+
+    def publish_agent(self, agent_id: str, status: str, current_task: Optional[str],
+                      last_updated: str) -> int:
+        return self.publish("agent", {
+            "id": agent_id,
+            "status": status,
+            "current_task": current_task,
+            "last_updated": last_updated,
+        })
+
+    def _apply(self, event_type: str, data: Dict[str, Any]) -> None:
+        if event_type == "campaign":
+            entry = self._campaigns.setdefault(data["id"], {"id": data["id"]})
+            entry["current_status"] = data["status"]
+            entry["updated_at"] = data["timestamp"]
+        elif event_type == "agent":
+            self._agents[data["id"]] = {
+                "status": data["status"],
+                "current_task": data.get("current_task"),
+                "last_updated": data.get("last_updated"),
+            }
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Call ``callback(event_type, data)`` synchronously for every published delta."""
+        self._listeners.append(callback)
+
+    def forget_campaigns(self, campaign_ids) -> None:
+        """Drop archived campaigns from the in-memory state."""
+        with self._lock:
+            for campaign_id in campaign_ids:
+                self._campaigns.pop(campaign_id, None)
+
+    # ---------- subscribing ----------
+
+    def prime(self, load_state: Callable[[], Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]]) -> None:
+        """
+        Seed the in-memory state once per process from persisted state.
+
+        Args:
+            load_state: Returns (campaigns, agents) as stored by the monitor
+        """
+        if self._primed:
+            return
+        campaigns, agents = load_state()
+        with self._lock:
+            if self._primed:
+                return
+            for c in campaigns:
+                # Deltas that arrived while loading are newer; keep them
+                self._campaigns.setdefault(c["id"], {
+                    "id": c["id"],
+                    "current_status": c.get("current_status"),
+                    "updated_at": c.get("updated_at"),
+                })
+            for agent_id, status in agents.items():
+                self._agents.setdefault(agent_id, dict(status))
+            self._primed = True
+
+    def subscribe(self, last_event_id: Optional[str] = None,
+                  buffer_size: int = DEFAULT_SUBSCRIBER_BUFFER) -> Tuple[Subscriber, List[Event], bool]:
+        """
+        Register a subscriber on the running event loop.
+
+        Args:
+            last_event_id: Last id the client saw, from the Last-Event-ID header
+            buffer_size: Maximum number of undelivered events kept for this client
+
+        Returns:
+            (subscriber, events to replay, whether a full snapshot is needed)
+        """
+        subscriber = Subscriber(asyncio.get_running_loop(), buffer_size)
+        with self._lock:
+            self._subscribers.append(subscriber)
+            replay, needs_snapshot = self._replay_from(last_event_id)
+        return subscriber, replay, needs_snapshot
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def wire_id(self, seq: int) -> str:
+        """The ``id:`` sent for a sequence number: ``<epoch>-<seq>``."""
+        return f"{self.epoch}-{seq}"
+
+    def _replay_from(self, last_event_id: Optional[str]) -> Tuple[List[Event], bool]:
+        epoch, _, seq = (last_event_id or "").rpartition("-")
+        try:
+            last_seen = int(seq) if epoch == self.epoch else None
+        except ValueError:
+            last_seen = None
+        if last_seen is None or last_seen > self._last_id:
+            return [], True
+        if last_seen == self._last_id:
+            return [], False
+        oldest = self._history[0][0] if self._history else self._last_id + 1
+        if last_seen + 1 < oldest:
+            # The gap has already been evicted from history
+            return [], True
+        return [e for e in self._history if e[0] > last_seen], False
+
+    def snapshot(self) -> Tuple[str, Dict[str, Any]]:
+        """Return (last event id on the wire, current campaign and agent state)."""
+        with self._lock:
+            return self.wire_id(self._last_id), {
+                "campaigns": [dict(c) for c in self._campaigns.values()],
+                "agents": {k: dict(v) for k, v in self._agents.items()},
+            }
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+# Process-wide bus shared by every workflow monitor instance
+workflow_events = WorkflowEventBus()
@@ -4,15 +4,16 @@
 """
 Factory for creating observability components.
 
-This module provides functions for creating TaskMonitor and WorkflowMonitor 
-instances with the specified backend implementation, allowing for easy 
-switching between different observability approaches.
+This module provides functions for creating TaskMonitor, WorkflowMonitor,
+Logger and Tracker instances with the specified backend implementation,
+allowing for easy switching between different observability approaches.
 """
 
 from typing import Dict, Any, Optional, Literal
 
-from .interfaces import TaskMonitor, WorkflowMonitor
-from .simple.logger import SimpleTaskMonitor
+from .interfaces import Logger, TaskMonitor, Tracker, WorkflowMonitor
+from .simple.logger import SimpleLogger, SimpleTaskMonitor
+from .simple.spans import SimpleTracker
 from .simple.tracker import SimpleWorkflowMonitor
 
 # Type for the observability backend - will include 'opentelemetry' in the future
@@ -62,4 +63,42 @@ def create_workflow_monitor(backend: ObservabilityBackend = "simple", **kwargs)
     # if backend == "opentelemetry":
     #     return OpenTelemetryWorkflowMonitor(**kwargs)
     
-    raise ValueError(f"Unknown observability backend: {backend}")
\ No newline at end of file
+    raise ValueError(f"Unknown observability backend: {backend}")
+
+def create_logger(agent_name: str, backend: ObservabilityBackend = "simple") -> Logger:
+    """
+    Create a logger for the specified agent using the given backend.
+    
+    Args:
+        agent_name: Name of the agent logging
+        backend: Observability backend to use
+        
+    Returns:
+        A Logger instance for the specified agent
+        
+    Raises:
+        ValueError: If the specified backend is unknown
+    """
+    if backend == "simple":
+        return SimpleLogger(agent_name)
+    
+    raise ValueError(f"Unknown observability backend: {backend}")
+
+def create_tracker(agent_name: str, backend: ObservabilityBackend = "simple") -> Tracker:
+    """
+    Create a span tracker for the specified agent using the given backend.
+    
+    Args:
+        agent_name: Name of the agent being traced
+        backend: Observability backend to use
+        
+    Returns:
+        A Tracker instance for the specified agent
+        
+    Raises:
+        ValueError: If the specified backend is unknown
+    """
+    if backend == "simple":
+        return SimpleTracker(agent_name)
+    
+    raise ValueError(f"Unknown observability backend: {backend}")
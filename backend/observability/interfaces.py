@@ -9,7 +9,7 @@ allowing for different implementations while maintaining a consistent API.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
 
 class TaskMonitor(ABC):
     """Interface for monitoring individual agent tasks"""
@@ -53,7 +53,76 @@ class WorkflowMonitor(ABC):
         """Get the current status of one or all campaigns"""
         pass
     
+    @abstractmethod
+    def get_archive_months(self) -> List[Dict[str, Any]]:
+        """List archived months, newest first, with their campaign counts"""
+        pass
+    
+    @abstractmethod
+    def get_archived_campaigns(self, month: str) -> List[Dict[str, Any]]:
+        """Get every campaign archived for a month (YYYY-MM)"""
+        pass
+    
     @abstractmethod
     def get_agent_status(self, agent_id: Optional[str] = None) -> Any:
         """Get the current status of one or all agents"""
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    def get_version(self) -> str:
+        """Get a token that changes whenever campaign state changes"""
+        pass
+    
+    @abstractmethod
+    def query_campaigns(self, statuses: Optional[List[str]] = None,
+                        since: Optional[str] = None, until: Optional[str] = None,
+                        after: Optional[Tuple[str, str]] = None, limit: int = 100,
+                        descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, str]]]:
+        """Get one page of campaigns plus the cursor key for the next page"""
+        pass
+
+class Span(ABC):
+    """One timed unit of work inside a trace"""
+    
+    @abstractmethod
+    def add_attribute(self, key: str, value: Any) -> None:
+        """Attach a value to the span"""
+        pass
+
+
+class Logger(ABC):
+    """Interface for an agent's log messages"""
+    
+    @abstractmethod
+    def info(self, message: str) -> None:
+        """Log a progress message"""
+        pass
+    
+    @abstractmethod
+    def debug(self, message: str) -> None:
+        """Log a diagnostic message"""
+        pass
+    
+    @abstractmethod
+    def error(self, message: str) -> None:
+        """Log a failure"""
+        pass
+
+
+class Tracker(ABC):
+    """Interface for tracing an agent's work as nested spans"""
+    
+    @abstractmethod
+    def start_span(self, name: str, attributes: Dict[str, Any] = None) -> ContextManager[Span]:
+        """Context manager timing a span; yields the span"""
+        pass
+    
+    @abstractmethod
+    def add_event(self, name: str, attributes: Dict[str, Any] = None) -> None:
+        """Record a point-in-time event"""
+        pass
+    
+    @abstractmethod
+    def record_exception(self, exception: BaseException) -> None:
+        """Record an exception raised while tracing"""
+        pass
@@ -0,0 +1,323 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Prometheus-style metrics for the agency backend.
+
+Counters and histograms record into per-thread shards, so instrumenting hot
+paths (LLM calls, audits, workflow-monitor writes) never contends on a shared
+lock. The shards are summed only when ``/metrics`` is scraped and rendered in
+the Prometheus text exposition format (version 0.0.4).
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+METRIC_PREFIX = "agency_"
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape_label(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base class holding the name, help text and label names of a metric family."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError("Must implement render()")
+
+
+class _ShardedMetric(_Metric):
+    """
+    Metric whose samples live in one dict per recording thread.
+
+    Each thread only ever writes to its own shard, so recording is lock-free.
+    The registry lock is taken once per thread, when its shard is created.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _snapshot(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() is atomic under the GIL, so the owning thread can keep writing
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_ShardedMetric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def values(self) -> Dict[LabelKey, float]:
+        """Return the aggregated value of every label combination."""
+        totals: Dict[LabelKey, float] = {}
+        for shard in self._snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_ShardedMetric):
+    """Bucketed distribution of observed values (typically latencies in seconds)."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        entry = shard.get(key)
+        if entry is None:
+            # [per-bucket counts..., +Inf count, sum]
+            entry = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[key] = entry
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def render(self) -> List[str]:
+        totals: Dict[LabelKey, List[float]] = {}
+        for shard in self._snapshot():
+            for key, entry in shard.items():
+                agg = totals.setdefault(key, [0] * len(entry))
+                for i, v in enumerate(list(entry)):
+                    agg[i] += v
+
+        lines = self._header()
+        bucket_names = self.labelnames + ("le",)
+        for key, entry in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), entry[:-1]):
+                cumulative += count
+                labels = _format_labels(bucket_names, key + (_format_value(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value.
+
+    Gauges are last-writer-wins, so a plain dict assignment is enough. A gauge
+    can also be backed by a function that is evaluated on every scrape.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._function: Optional[Callable[[], Iterable[Tuple[Dict[str, str], float]]]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def set_function(self, fn: Callable[[], Iterable[Tuple[Dict[str, str], float]]]) -> None:
+        """Compute the samples at scrape time; ``fn`` yields ``(labels, value)`` pairs."""
+        self._function = fn
+
+    def render(self) -> List[str]:
+        samples = dict(self._values)
+        if self._function is not None:
+            for labels, value in self._function():
+                samples[self._key(labels)] = value
+        lines = self._header()
+        for key, value in sorted(samples.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together on scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# ========== METRIC FAMILIES ==========
+
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "llm_requests_total", "LLM requests by agent, model and outcome.",
+    ("agent", "model", "status")))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds", "LLM request latency by agent and model.",
+    ("agent", "model")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "LLM tokens used by agent, model and kind (prompt/completion).",
+    ("agent", "model", "kind")))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by cache name and result (hit/miss).",
+    ("cache", "result")))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "cache_hit_ratio", "Fraction of cache lookups served from cache.",
+    ("cache",)))
+AUDIT_RESULTS = REGISTRY.register(Counter(
+    "audit_results_total", "Schema audits by agent, phase and result (pass/fail).",
+    ("agent", "phase", "result")))
+ACTIVE_CAMPAIGNS = REGISTRY.register(Gauge(
+    "active_campaigns", "Campaigns whose current workflow status is not terminal."))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "queue_depth", "Items waiting in a pipeline queue.",
+    ("queue",)))
+INGESTED_EVENTS = REGISTRY.register(Counter(
+    "analytics_events_ingested_total", "Analytics events by result (accepted/rejected/committed).",
+    ("result",)))
+PLAN_MEMO_COMPARISONS = REGISTRY.register(Counter(
+    "plan_memo_comparisons_total", "Memoized execution plans checked against the LLM, by result (agree/disagree).",
+    ("result",)))
+PLAN_MEMO_DISAGREEMENT_RATIO = REGISTRY.register(Gauge(
+    "plan_memo_disagreement_ratio", "Fraction of checked memoized execution plans the LLM disagreed with."))
+WORKFLOW_WRITE_LATENCY = REGISTRY.register(Histogram(
+    "workflow_monitor_write_duration_seconds", "Time spent persisting workflow state by file.",
+    ("file",), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+
+
+def _cache_hit_ratios() -> Iterable[Tuple[Dict[str, str], float]]:
+    lookups: Dict[str, List[float]] = {}
+    for (cache, result), value in CACHE_REQUESTS.values().items():
+        counts = lookups.setdefault(cache, [0, 0])
+        counts[0 if result == "hit" else 1] += value
+    for cache, (hits, misses) in lookups.items():
+        if hits + misses:
+            yield {"cache": cache}, hits / (hits + misses)
+
+
+CACHE_HIT_RATIO.set_function(_cache_hit_ratios)
+
+
+def _plan_disagreement_ratio() -> Iterable[Tuple[Dict[str, str], float]]:
+    counts = {result: value for (result,), value in PLAN_MEMO_COMPARISONS.values().items()}
+    total = counts.get("agree", 0) + counts.get("disagree", 0)
+    if total:
+        yield {}, counts.get("disagree", 0) / total
+
+
+PLAN_MEMO_DISAGREEMENT_RATIO.set_function(_plan_disagreement_ratio)
+
+# ========== RECORDING HELPERS ==========
+
+def record_llm_call(agent: str, model: str, status: str, duration_s: float, usage=None) -> None:
+    """
+    Record one LLM request.
+
+    Args:
+        agent: Agent key that issued the request
+        model: Model name
+        status: "success" or "error"
+        duration_s: Wall-clock latency in seconds
+        usage: Optional OpenAI usage object with prompt/completion token counts
+    """
+    LLM_REQUESTS.inc(agent=agent, model=model, status=status)
+    LLM_LATENCY.observe(duration_s, agent=agent, model=model)
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0,
+                       agent=agent, model=model, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0,
+                       agent=agent, model=model, kind="completion")
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Record a hit or miss for the named cache."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_plan_comparison(agree: bool) -> None:
+    """Record whether the LLM agreed with a memoized execution plan."""
+    PLAN_MEMO_COMPARISONS.inc(result="agree" if agree else "disagree")
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    return REGISTRY.render()
@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Compressed, per-month archive of finished campaigns.
+
+Archived campaigns are appended as JSON lines to
+``<storage_dir>/archive/campaigns-YYYY-MM.jsonl.gz`` (one gzip member per
+append, so existing data is never rewritten). A small ``index.json`` maps
+each archived campaign id to its month so single lookups only open one file.
+The index is the source of truth: a campaign that becomes active again is
+dropped from it, and its stale archived copy is no longer served.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+_MONTH = re.compile(r"^\d{4}-\d{2}$")
+
+
+class CampaignArchive:
+    """Cold storage for campaigns moved out of the hot campaigns.json file."""
+
+    def __init__(self, archive_dir: str):
+        """
+        Args:
+            archive_dir: Directory holding the monthly archive files
+        """
+        self.archive_dir = archive_dir
+        self.index_file = os.path.join(archive_dir, "index.json")
+        self._index: Optional[Dict[str, str]] = None
+        self._index_mtime = None
+        self._lock = threading.Lock()
+
+    def _month_file(self, month: str) -> str:
+        if not _MONTH.match(month):
+            raise ValueError(f"Invalid archive month: {month}")
+        return os.path.join(self.archive_dir, f"campaigns-{month}.jsonl.gz")
+
+    @staticmethod
+    def month_of(campaign: Dict[str, Any]) -> str:
+        """Archive month of a campaign, taken from its creation time."""
+        return (campaign.get("created_at") or campaign.get("updated_at") or "0000-00")[:7]
+
+    def _load_index(self) -> Dict[str, str]:
+        try:
+            mtime = os.path.getmtime(self.index_file)
+        except OSError:
+            return {}
+        if self._index is None or mtime != self._index_mtime:
+            with open(self.index_file, "r") as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+        return self._index
+
+    def append(self, campaigns: List[Dict[str, Any]]) -> None:
+        """
+        Add campaigns to their monthly archive files.
+
+        Args:
+            campaigns: Full campaign records (including history)
+        """
+        if not campaigns:
+            return
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for campaign in campaigns:
+            by_month.setdefault(self.month_of(campaign), []).append(campaign)
+
+        with self._lock:
+            for month, items in by_month.items():
+                with gzip.open(self._month_file(month), "at", encoding="utf-8") as f:
+                    for campaign in items:
+                        f.write(json.dumps(campaign, separators=(",", ":")) + "\n")
+
+            index = dict(self._load_index())
+            for month, items in by_month.items():
+                for campaign in items:
+                    index[campaign["id"]] = month
+            self._save_index(index)
+
+    def _save_index(self, index: Dict[str, str]) -> None:
+        tmp = self.index_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, self.index_file)
+        self._index = index
+        self._index_mtime = os.path.getmtime(self.index_file)
+
+    def contains(self, campaign_id: str) -> bool:
+        """True if the campaign is currently served from the archive."""
+        return campaign_id in self._load_index()
+
+    def forget(self, campaign_ids: List[str]) -> None:
+        """
+        Stop serving archived copies of campaigns that are back in the hot file.
+
+        Args:
+            campaign_ids: Campaign ids to drop from the index
+        """
+        drop = set(campaign_ids)
+        with self._lock:
+            index = self._load_index()
+            if not drop.intersection(index):
+                return
+            self._save_index({k: v for k, v in index.items() if k not in drop})
+
+    def months(self) -> List[Dict[str, Any]]:
+        """List archived months, newest first, with their campaign counts."""
+        counts: Dict[str, int] = {}
+        for month in self._load_index().values():
+            counts[month] = counts.get(month, 0) + 1
+        return [{"month": m, "campaigns": counts[m]} for m in sorted(counts, reverse=True)]
+
+    def read_month(self, month: str) -> List[Dict[str, Any]]:
+        """Return every campaign the index serves from a month (later copies win)."""
+        path = self._month_file(month)
+        if not os.path.exists(path):
+            return []
+        index = self._load_index()
+        campaigns: Dict[str, Dict[str, Any]] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    campaign = json.loads(line)
+                    if index.get(campaign["id"]) == month:
+                        campaigns[campaign["id"]] = campaign
+        return list(campaigns.values())
+
+    def get(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Look up one archived campaign, or None if it was never archived."""
+        month = self._load_index().get(campaign_id)
+        if month is None:
+            return None
+        found = None
+        with gzip.open(self._month_file(month), "rt", encoding="utf-8") as f:
+            for line in f:
+                if campaign_id in line:
+                    campaign = json.loads(line)
+                    if campaign["id"] == campaign_id:
+                        found = campaign
+        return found
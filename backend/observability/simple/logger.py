@@ -2,7 +2,8 @@
 # Copyright (c) 2025 Vamsi Duvvuri
 
 """
-Simple implementation of the TaskMonitor interface using structured logging.
+Simple implementations of the TaskMonitor and Logger interfaces using
+structured logging.
 """
 
 import logging
@@ -11,7 +12,8 @@ import os
 from datetime import datetime
 from typing import Dict, Any, Optional
 
-from ..interfaces import TaskMonitor
+from ..interfaces import Logger, TaskMonitor
+from .logstore import IndexedRotatingFileHandler
 
 class SimpleTaskMonitor(TaskMonitor):
     """
@@ -36,8 +38,8 @@ class SimpleTaskMonitor(TaskMonitor):
         
         # Ensure logger is properly configured
         if not self.logger.handlers:
-            # File handler - writes to agent-specific log file
-            file_handler = logging.FileHandler(f"logs/{agent_name}.log")
+            # File handler - writes to agent-specific log file, indexed and rotated
+            file_handler = IndexedRotatingFileHandler(f"logs/{agent_name}.log")
             file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             file_handler.setFormatter(file_formatter)
             self.logger.addHandler(file_handler)
@@ -50,6 +52,14 @@ class SimpleTaskMonitor(TaskMonitor):
             
             self.logger.setLevel(logging.INFO)
     
+    @staticmethod
+    def _index_fields(task_id: str, attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Fields picked up by the log index so entries can be looked up by task or campaign."""
+        return {
+            "task_id": task_id,
+            "campaign_id": (attributes or {}).get("campaign_id")
+        }
+    
     def start_task(self, task_id: str, input_data: Any = None, attributes: Dict[str, Any] = None) -> None:
         """
         Record the start of a task with optional context.
@@ -73,7 +83,7 @@ class SimpleTaskMonitor(TaskMonitor):
             input_str = str(input_data)
             log_entry["input_summary"] = (input_str[:100] + '...') if len(input_str) > 100 else input_str
         
-        self.logger.info(json.dumps(log_entry))
+        self.logger.info(json.dumps(log_entry), extra=self._index_fields(task_id, attributes))
     
     def end_task(self, task_id: str, status: str = "success", 
                 output_data: Any = None, duration_ms: Optional[int] = None,
@@ -107,7 +117,7 @@ class SimpleTaskMonitor(TaskMonitor):
             output_str = str(output_data)
             log_entry["output_summary"] = (output_str[:100] + '...') if len(output_str) > 100 else output_str
         
-        self.logger.info(json.dumps(log_entry))
+        self.logger.info(json.dumps(log_entry), extra=self._index_fields(task_id, attributes))
     
     def record_error(self, task_id: str, error_message: str, 
                     attributes: Dict[str, Any] = None) -> None:
@@ -129,4 +139,24 @@ class SimpleTaskMonitor(TaskMonitor):
             "attributes": attributes or {}
         }
         
-        self.logger.error(json.dumps(log_entry))
\ No newline at end of file
+        self.logger.error(json.dumps(log_entry), extra=self._index_fields(task_id, attributes))
+
+
+class SimpleLogger(Logger):
+    """
+    Agent log messages through the standard ``agent.<name>`` logger, so they
+    land next to the agent's task events when a SimpleTaskMonitor set it up.
+    """
+    
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self.logger = logging.getLogger(f"agent.{agent_name}")
+    
+    def info(self, message: str) -> None:
+        self.logger.info(message)
+    
+    def debug(self, message: str) -> None:
+        self.logger.debug(message)
+    
+    def error(self, message: str) -> None:
+        self.logger.error(message)
@@ -0,0 +1,421 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Rotating, indexed storage for the per-agent JSON task logs.
+
+``IndexedRotatingFileHandler`` writes ``logs/<agent>.log`` and, next to it, a
+small sidecar index ``logs/<agent>.log.idx`` with one tab-separated line per
+event: byte offset, epoch timestamp, level, task_id and campaign_id. The
+index starts with an ``#opened`` line holding the segment's open time, which
+names the segment for its whole life. When the log reaches a size or age
+limit it is gzip-compressed into an archive named after that open time,
+together with its index, and a fresh file is started.
+
+``LogStore`` answers queries by seeking from the end of the live file (and
+then into the newest archives), using the index to jump straight to events
+for a given task or campaign. Reading the latest events therefore costs the
+same no matter how much history has accumulated.
+"""
+
+import bisect
+import glob
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_ROTATE_INTERVAL = 24 * 60 * 60
+DEFAULT_BACKUP_COUNT = 30
+
+_READ_BLOCK = 64 * 1024
+_AGENT_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+_STAMP = re.compile(r"^\d{8}-\d{6}-\d{6}$")
+# Segment name of a live file whose index has no open time (sorts after every stamp)
+_UNNAMED_LIVE = "live"
+
+
+def segment_stamp(opened_at: float) -> str:
+    """Stable name of a segment: its open time, sortable as text."""
+    return datetime.fromtimestamp(opened_at).strftime("%Y%m%d-%H%M%S-%f")
+
+
+def read_opened_at(index_filename: str) -> Optional[float]:
+    """Open time of a live segment: its ``#opened`` header, else its first entry's time."""
+    try:
+        with open(index_filename, "rb") as f:
+            parts = f.readline().decode("utf-8").rstrip("\n").split("\t")
+    except (OSError, UnicodeDecodeError):
+        return None
+    try:
+        if parts[0] == "#opened" and len(parts) == 2:
+            return float(parts[1])
+        if len(parts) == 5:
+            return float(parts[1])
+    except ValueError:
+        pass
+    return None
+
+
+class IndexedRotatingFileHandler(logging.Handler):
+    """
+    File handler that maintains an offset index and rotates by size or age.
+
+    Args:
+        filename: Path of the live log file
+        max_bytes: Rotate once the live file grows past this size (0 disables)
+        rotate_interval: Rotate once the live file is older than this many
+            seconds (0 disables)
+        backup_count: Number of compressed archives to keep
+    """
+
+    def __init__(self, filename: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 rotate_interval: float = DEFAULT_ROTATE_INTERVAL,
+                 backup_count: int = DEFAULT_BACKUP_COUNT):
+        super().__init__()
+        self.filename = filename
+        self.index_filename = filename + ".idx"
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self._open()
+
+    def _open(self) -> None:
+        self._stream = open(self.filename, "ab")
+        self._index = open(self.index_filename, "ab")
+        # Kept in the index, so the age limit and segment name survive restarts
+        opened_at = read_opened_at(self.index_filename)
+        if opened_at is None:
+            # At the header's precision, so a restart reads back the same value
+            opened_at = float(f"{time.time():.6f}")
+            if not self._index.tell():
+                self._index.write(f"#opened\t{opened_at:.6f}\n".encode("utf-8"))
+                self._index.flush()
+        self._opened_at = opened_at
+
+    def _should_rotate(self, now: float) -> bool:
+        size = self._stream.tell()
+        if not size:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return bool(self.rotate_interval) and now - self._opened_at >= self.rotate_interval
+
+    def _rotate(self) -> None:
+        self._stream.close()
+        self._index.close()
+
+        stamp = segment_stamp(self._opened_at)
+        base, ext = os.path.splitext(self.filename)
+        for src, dst in ((self.filename, f"{base}.{stamp}{ext}.gz"),
+                         (self.index_filename, f"{base}.{stamp}{ext}.idx.gz")):
+            with open(src, "rb") as f_in, gzip.open(dst, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.remove(src)
+
+        for old in list_archives(self.filename)[self.backup_count:]:
+            for path in (old, old[:-len(".gz")] + ".idx.gz"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        self._open()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = (self.format(record) + "\n").encode("utf-8")
+            if self._should_rotate(record.created):
+                self._rotate()
+            offset = self._stream.tell()
+            self._stream.write(line)
+            self._stream.flush()
+
+            # Sidecar index: offset, timestamp, level, task_id, campaign_id
+            task_id = getattr(record, "task_id", None) or ""
+            campaign_id = getattr(record, "campaign_id", None) or ""
+            self._index.write(
+                f"{offset}\t{record.created:.6f}\t{record.levelname}\t{task_id}\t{campaign_id}\n"
+                .encode("utf-8"))
+            self._index.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            self._stream.close()
+            self._index.close()
+        finally:
+            self.release()
+        super().close()
+
+
+def list_archives(filename: str) -> List[str]:
+    """Compressed archives of a log file, newest first."""
+    base, ext = os.path.splitext(filename)
+    return sorted(glob.glob(f"{glob.escape(base)}.*{ext}.gz"), reverse=True)
+
+
+def archive_stamp(filename: str, archive: str) -> str:
+    """The segment name inside an archive path from ``list_archives``."""
+    base, ext = os.path.splitext(filename)
+    return archive[len(base) + 1:-len(f"{ext}.gz")]
+
+
+class _Index:
+    """In-memory copy of a sidecar index, extended incrementally as it grows."""
+
+    def __init__(self):
+        self.inode = None
+        self.opened_at: Optional[float] = None
+        self.read_bytes = 0
+        self.offsets: List[int] = []
+        self.timestamps: List[float] = []
+        self.by_task: Dict[str, List[int]] = {}
+        self.by_campaign: Dict[str, List[int]] = {}
+
+    def load(self, data: bytes) -> None:
+        for raw in data.splitlines():
+            parts = raw.decode("utf-8").split("\t")
+            if parts[0] == "#opened" and len(parts) == 2:
+                self.opened_at = float(parts[1])
+                continue
+            if len(parts) != 5:
+                continue
+            offset = int(parts[0])
+            if self.opened_at is None:
+                self.opened_at = float(parts[1])
+            self.offsets.append(offset)
+            self.timestamps.append(float(parts[1]))
+            if parts[3]:
+                self.by_task.setdefault(parts[3], []).append(offset)
+            if parts[4]:
+                self.by_campaign.setdefault(parts[4], []).append(offset)
+
+
+class LogStore:
+    """
+    Query interface over the indexed agent logs.
+
+    Cursors have the form ``"<segment>:<offset>"`` where segment is the
+    segment's open-time stamp, the same whether it is still the live file or
+    has since been archived, so rotation between two page requests does not
+    shift the cursor. Results are returned newest first and the cursor points
+    just before the oldest returned event.
+    """
+
+    def __init__(self, log_dir: str = "logs"):
+        self.log_dir = log_dir
+        self._indexes: Dict[str, _Index] = {}
+        self._lock = threading.Lock()
+
+    def _segments(self, agent_id: str) -> List[Tuple[str, str]]:
+        """(segment name, path) of the live file and every archive, newest first."""
+        if not _AGENT_ID.match(agent_id):
+            raise ValueError(f"Invalid agent id: {agent_id}")
+        live = os.path.join(self.log_dir, f"{agent_id}.log")
+        opened_at = self._live_index(live).opened_at
+        live_name = segment_stamp(opened_at) if opened_at is not None else _UNNAMED_LIVE
+        return [(live_name, live)] + [(archive_stamp(live, a), a) for a in list_archives(live)]
+
+    def _live_index(self, path: str) -> _Index:
+        """Return the index of the live file, reading only what was appended."""
+        idx_path = path + ".idx"
+        with self._lock:
+            index = self._indexes.get(path)
+            try:
+                st = os.stat(idx_path)
+            except FileNotFoundError:
+                self._indexes.pop(path, None)
+                return _Index()
+            if index is None or index.inode != st.st_ino or st.st_size < index.read_bytes:
+                index = _Index()
+                index.inode = st.st_ino
+                self._indexes[path] = index
+            if st.st_size > index.read_bytes:
+                with open(idx_path, "rb") as f:
+                    f.seek(index.read_bytes)
+                    data = f.read(st.st_size - index.read_bytes)
+                # Only consume complete lines; a partial one is picked up next time
+                complete = data.rfind(b"\n") + 1
+                index.load(data[:complete])
+                index.read_bytes += complete
+            return index
+
+    def query(self, agent_id: str, limit: int = 100, cursor: Optional[str] = None,
+              level: Optional[str] = None, task_id: Optional[str] = None,
+              campaign_id: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return up to ``limit`` matching events, newest first.
+
+        Args:
+            agent_id: Agent whose log to read
+            limit: Maximum number of events to return
+            cursor: Resume point from a previous call
+            level: Only events at this level (INFO, WARNING, ERROR, ...)
+            task_id: Only events for this task
+            campaign_id: Only events for this campaign
+            since: Only events at or after this epoch time
+            until: Only events at or before this epoch time
+
+        Returns:
+            (events, cursor for the next page or None when exhausted)
+
+        Raises:
+            ValueError: If the agent id or cursor is malformed
+        """
+        segments = self._segments(agent_id)
+        segment, end = 0, None
+        if cursor:
+            name, _, off_str = cursor.rpartition(":")
+            if not (_STAMP.match(name) or name == _UNNAMED_LIVE) or not off_str.isdigit():
+                raise ValueError(f"Invalid cursor: {cursor}")
+            # The cursor's segment, or the next older one if it has been deleted since
+            segment = next((i for i, (s, _) in enumerate(segments) if s <= name), len(segments))
+            if segment < len(segments) and segments[segment][0] == name:
+                end = int(off_str)
+        level = level.upper() if level else None
+        if level == "WARN":
+            level = "WARNING"
+
+        results: List[Dict[str, Any]] = []
+        scan = {"reached_since": False}
+        while segment < len(segments) and not scan["reached_since"]:
+            name, path = segments[segment]
+            if not os.path.exists(path):
+                segment, end = segment + 1, None
+                continue
+            for offset, entry in self._scan_segment(path, segment == 0, end, task_id,
+                                                    campaign_id, since, until, scan):
+                if level and entry["level"] != level:
+                    continue
+                results.append(entry)
+                if len(results) == limit:
+                    return results, f"{name}:{offset}"
+            segment, end = segment + 1, None
+        return results, None
+
+    def _scan_segment(self, path: str, live: bool, end: Optional[int],
+                      task_id: Optional[str], campaign_id: Optional[str],
+                      since: Optional[float], until: Optional[float],
+                      scan: Dict[str, bool]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield matching entries of one segment, newest first; flags ``scan`` at ``since``."""
+        if live:
+            index = self._live_index(path)
+            f = open(path, "rb")
+        else:
+            index = _Index()
+            idx_path = path[:-len(".gz")] + ".idx.gz"
+            if os.path.exists(idx_path):
+                with gzip.open(idx_path, "rb") as zf:
+                    index.load(zf.read())
+            # Archives are bounded by max_bytes, so decompressing one is cheap
+            with gzip.open(path, "rb") as zf:
+                f = io.BytesIO(zf.read())
+
+        with f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            end = size if end is None else min(end, size)
+            if until is not None and index.timestamps:
+                pos = bisect.bisect_right(index.timestamps, until)
+                if pos < len(index.offsets):
+                    end = min(end, index.offsets[pos])
+
+            if task_id or campaign_id:
+                offsets = self._matching_offsets(index, task_id, campaign_id)
+                for offset in reversed(offsets[:bisect.bisect_left(offsets, end)]):
+                    f.seek(offset)
+                    entry = _parse_line(f.readline())
+                    if entry is None:
+                        continue
+                    if since is not None and entry["epoch"] < since:
+                        scan["reached_since"] = True
+                        return
+                    yield offset, entry
+                return
+
+            for offset, line in _iter_lines_reverse(f, end):
+                entry = _parse_line(line)
+                if entry is None:
+                    continue
+                if since is not None and entry["epoch"] < since:
+                    scan["reached_since"] = True
+                    return
+                if until is not None and entry["epoch"] > until:
+                    continue
+                yield offset, entry
+
+    @staticmethod
+    def _matching_offsets(index: _Index, task_id: Optional[str], campaign_id: Optional[str]) -> List[int]:
+        if task_id and campaign_id:
+            wanted = set(index.by_campaign.get(campaign_id, []))
+            return [o for o in index.by_task.get(task_id, []) if o in wanted]
+        if task_id:
+            return index.by_task.get(task_id, [])
+        return index.by_campaign.get(campaign_id, [])
+
+
+def _iter_lines_reverse(f, end: int) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) pairs ending before ``end``, last line first."""
+    pos = end
+    tail = b""
+    while pos > 0:
+        read = min(_READ_BLOCK, pos)
+        pos -= read
+        f.seek(pos)
+        block = f.read(read) + tail
+        lines = block.split(b"\n")
+        # The first piece may be the end of a line that starts in an earlier block
+        tail = lines[0]
+        line_end = pos + len(block)
+        for line in reversed(lines[1:]):
+            line_end -= len(line) + 1
+            if line:
+                yield line_end + 1, line
+    if tail:
+        yield 0, tail
+
+
+def _parse_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """Parse ``asctime - logger - LEVEL - {json}`` into an API log entry."""
+    try:
+        asctime, _name, level, message = line.decode("utf-8").rstrip("\n").split(" - ", 3)
+        epoch = datetime.strptime(asctime, "%Y-%m-%d %H:%M:%S,%f").timestamp()
+    except ValueError:
+        return None
+    try:
+        event = json.loads(message)
+    except ValueError:
+        event = None
+
+    entry = {"timestamp": asctime.replace(",", "."), "epoch": epoch, "level": level}
+    if isinstance(event, dict):
+        entry["timestamp"] = event.get("timestamp", entry["timestamp"])
+        entry["message"] = _summarize(event)
+        entry["event"] = event
+    else:
+        entry["message"] = message
+    return entry
+
+
+def _summarize(event: Dict[str, Any]) -> str:
+    kind = event.get("event", "event")
+    task = event.get("task_id", "")
+    if kind == "task_start":
+        return f"Started task {task}"
+    if kind == "task_complete":
+        duration = event.get("duration_ms")
+        took = f" in {duration} ms" if duration is not None else ""
+        return f"Task {task} finished with status {event.get('status', 'unknown')}{took}"
+    if kind == "task_error":
+        return f"Task {task} failed: {event.get('error', '')}"
+    return kind
@@ -0,0 +1,147 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Retention policies and background compaction for workflow history.
+
+Without compaction, campaigns.json keeps every status event of every
+campaign forever and is fully re-read on each write. The compactor keeps it
+down to the hot working set:
+
+- history events older than ``max_event_age_days`` are dropped;
+- each campaign keeps at most ``max_history_events`` events;
+- campaigns in a terminal status for longer than
+  ``archive_finished_after_days`` move to the monthly archive.
+
+The newest event of a campaign is always kept, and dropped events are
+counted in the campaign's ``history_trimmed`` field.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..events import workflow_events
+from .tracker import SimpleWorkflowMonitor, TERMINAL_STATUSES
+
+logger = logging.getLogger("observability.retention")
+
+
+class RetentionPolicy:
+    """Limits enforced by the compactor; ``None`` disables a limit."""
+
+    def __init__(self, max_event_age_days: Optional[float] = 90,
+                 max_history_events: Optional[int] = 200,
+                 archive_finished_after_days: Optional[float] = 7):
+        """
+        Args:
+            max_event_age_days: Drop history events older than this
+            max_history_events: Keep at most this many events per campaign
+            archive_finished_after_days: Archive finished campaigns not updated for this long
+        """
+        self.max_event_age_days = max_event_age_days
+        self.max_history_events = max_history_events
+        self.archive_finished_after_days = archive_finished_after_days
+
+
+class WorkflowCompactor:
+    """Applies a RetentionPolicy to a SimpleWorkflowMonitor, on demand or periodically."""
+
+    def __init__(self, monitor: SimpleWorkflowMonitor, policy: Optional[RetentionPolicy] = None,
+                 interval_seconds: float = 300):
+        """
+        Args:
+            monitor: Monitor whose campaigns file is compacted
+            policy: Limits to enforce (defaults to RetentionPolicy())
+            interval_seconds: Time between background runs
+        """
+        self.monitor = monitor
+        self.policy = policy or RetentionPolicy()
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Enforce the policy once.
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Counts of archived campaigns and trimmed history events
+        """
+        now = now or datetime.now()
+        policy = self.policy
+        event_cutoff = (now - timedelta(days=policy.max_event_age_days)).isoformat() \
+            if policy.max_event_age_days is not None else None
+        archive_cutoff = (now - timedelta(days=policy.archive_finished_after_days)).isoformat() \
+            if policy.archive_finished_after_days is not None else None
+        stats = {"archived": 0, "trimmed_events": 0}
+        archived_ids: List[str] = []
+
+        def compact(campaigns: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+            hot, cold = [], []
+            for campaign in campaigns:
+                if (archive_cutoff is not None
+                        and campaign.get("current_status") in TERMINAL_STATUSES
+                        and (campaign.get("updated_at") or "") < archive_cutoff):
+                    cold.append(campaign)
+                    continue
+                stats["trimmed_events"] += self._trim_history(campaign, event_cutoff)
+                hot.append(campaign)
+
+            if not cold and not stats["trimmed_events"]:
+                # Nothing to do; leave the file (and its version) untouched
+                return None
+
+            # Archive before the hot file is rewritten, so nothing is lost on a crash
+            self.monitor.archive.append(cold)
+            stats["archived"] = len(cold)
+            archived_ids.extend(c["id"] for c in cold)
+            return hot
+
+        self.monitor.rewrite_campaigns(compact)
+        workflow_events.forget_campaigns(archived_ids)
+        if stats["archived"] or stats["trimmed_events"]:
+            logger.info("Workflow compaction: archived %d campaigns, trimmed %d events",
+                        stats["archived"], stats["trimmed_events"])
+        return stats
+
+    def _trim_history(self, campaign: Dict[str, Any], event_cutoff: Optional[str]) -> int:
+        history = campaign.get("history", [])
+        keep = history
+        if event_cutoff is not None:
+            keep = [e for e in keep if (e.get("timestamp") or "") >= event_cutoff] or keep[-1:]
+        if self.policy.max_history_events is not None and len(keep) > self.policy.max_history_events:
+            keep = keep[-max(self.policy.max_history_events, 1):]
+        dropped = len(history) - len(keep)
+        if dropped:
+            campaign["history"] = keep
+            campaign["history_trimmed"] = campaign.get("history_trimmed", 0) + dropped
+        return dropped
+
+    # ---------- background thread ----------
+
+    def start(self) -> None:
+        """Run the compactor every ``interval_seconds`` on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="workflow-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread after its current run."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval_seconds)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Workflow compaction failed")
+            self._stop.wait(self.interval_seconds)
@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Simple implementation of the Tracker interface using debug logging.
+
+Spans time themselves and log their name, attributes and duration when they
+end; events and exceptions are logged against the innermost open span of
+the calling thread.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..interfaces import Span, Tracker
+
+class SimpleSpan(Span):
+    """Span holding its attributes in a dict."""
+    
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+    
+    def add_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class SimpleTracker(Tracker):
+    """Spans, events and exceptions for one agent, logged to ``trace.<name>``."""
+    
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self.logger = logging.getLogger(f"trace.{agent_name}")
+        self._local = threading.local()
+    
+    def _stack(self) -> List[SimpleSpan]:
+        stack = getattr(self._local, "spans", None)
+        if stack is None:
+            stack = self._local.spans = []
+        return stack
+    
+    def _current(self) -> Optional[str]:
+        stack = self._stack()
+        return stack[-1].name if stack else None
+    
+    @contextmanager
+    def start_span(self, name: str, attributes: Dict[str, Any] = None) -> Iterator[SimpleSpan]:
+        span = SimpleSpan(name, attributes)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.duration_ms = (time.perf_counter() - span.started) * 1000
+            self.logger.debug("span %s %.1fms %s", name, span.duration_ms, span.attributes)
+    
+    def add_event(self, name: str, attributes: Dict[str, Any] = None) -> None:
+        self.logger.debug("event %s in %s %s", name, self._current(), attributes or {})
+    
+    def record_exception(self, exception: BaseException) -> None:
+        self.logger.error("exception in %s: %r", self._current(), exception)
@@ -8,12 +8,78 @@ This implementation stores campaign and agent status information in JSON files,
 making it easy to visualize the workflow state without complex infrastructure.
 """
 
+import bisect
+import copy
+import heapq
 import json
 import os
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Union
+from typing import Callable, Dict, Any, Optional, List, Tuple, Union
 
+from ..events import workflow_events
 from ..interfaces import WorkflowMonitor
+from ..metrics import ACTIVE_CAMPAIGNS, WORKFLOW_WRITE_LATENCY
+from .archive import CampaignArchive
+
+# Campaign statuses after which a campaign no longer counts as active
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+# Parsed campaign files shared by every monitor instance, keyed by path.
+# Entries are only valid for the version they were built from.
+_campaign_views: Dict[str, Tuple[str, "_CampaignView"]] = {}
+_campaign_views_lock = threading.Lock()
+
+# One lock per campaigns file so read-modify-write cycles (status updates,
+# compaction) in this process never overwrite each other
+_file_locks: Dict[str, threading.Lock] = {}
+
+# Writes made by this process, per file; part of the version so that two
+# writes within one mtime tick still produce different versions
+_write_counts: Dict[str, int] = {}
+
+def _epoch(timestamp: Optional[str]) -> Optional[float]:
+    """
+    Epoch seconds of an ISO timestamp, so values with different offsets (or
+    none) compare correctly. Naive timestamps are local time, as written by
+    ``datetime.now().isoformat()``.
+    """
+    if not timestamp:
+        return None
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+class _CampaignView:
+    """Campaigns ordered by (created_at, id) with id, status and updated_at indexes."""
+    
+    def __init__(self, campaigns: List[Dict[str, Any]]):
+        self.ordered = sorted(campaigns, key=self.sort_key)
+        self.keys = [self.sort_key(c) for c in self.ordered]
+        self.by_id = {c["id"]: c for c in self.ordered}
+        self.by_status: Dict[str, List[int]] = {}
+        updated = []
+        for pos, c in enumerate(self.ordered):
+            self.by_status.setdefault(c.get("current_status"), []).append(pos)
+            try:
+                epoch = _epoch(c.get("updated_at"))
+            except ValueError:
+                epoch = None
+            if epoch is not None:
+                updated.append((epoch, pos))
+        # Positions sorted by update time, for since/until range lookups
+        updated.sort()
+        self.updated_epochs = [e for e, _ in updated]
+        self.updated_positions = [p for _, p in updated]
+    
+    def updated_between(self, since: Optional[float], until: Optional[float]) -> List[int]:
+        """Sorted positions of campaigns updated within [since, until]."""
+        lo = bisect.bisect_left(self.updated_epochs, since) if since is not None else 0
+        hi = bisect.bisect_right(self.updated_epochs, until) if until is not None else len(self.updated_epochs)
+        return sorted(self.updated_positions[lo:hi])
+    
+    @staticmethod
+    def sort_key(campaign: Dict[str, Any]) -> Tuple[str, str]:
+        return (campaign.get("created_at") or "", campaign["id"])
 
 class SimpleWorkflowMonitor(WorkflowMonitor):
     """
@@ -39,6 +105,11 @@ class SimpleWorkflowMonitor(WorkflowMonitor):
         self.campaigns_file = os.path.join(self.storage_dir, "campaigns.json")
         self.agents_file = os.path.join(self.storage_dir, "agents.json")
         
+        # Finished campaigns moved out of campaigns.json by the compactor
+        self.archive = CampaignArchive(os.path.join(self.storage_dir, "archive"))
+        with _campaign_views_lock:
+            self._lock = _file_locks.setdefault(self.campaigns_file, threading.Lock())
+        
         # Initialize files if they don't exist
         if not os.path.exists(self.campaigns_file):
             with open(self.campaigns_file, "w") as f:
@@ -58,36 +129,66 @@ class SimpleWorkflowMonitor(WorkflowMonitor):
             status: New status for the campaign
             metadata: Additional context information
         """
-        # Read current campaigns data
-        try:
-            with open(self.campaigns_file, "r") as f:
-                campaigns = json.load(f)
-        except json.JSONDecodeError:
-            # Handle corrupted file by starting fresh
-            campaigns = []
+        now = datetime.now().isoformat()
+        revived: List[str] = []
         
-        # Find campaign or create new entry
-        campaign = next((c for c in campaigns if c["id"] == campaign_id), None)
-        if campaign is None:
-            campaign = {
-                "id": campaign_id, 
-                "history": [],
-                "created_at": datetime.now().isoformat()
-            }
-            campaigns.append(campaign)
-        
-        # Add status update
-        campaign["current_status"] = status
-        campaign["updated_at"] = datetime.now().isoformat()
-        campaign["history"].append({
-            "status": status,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        })
+        def apply(campaigns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            # Find campaign or create new entry
+            campaign = next((c for c in campaigns if c["id"] == campaign_id), None)
+            if campaign is None:
+                revived.append(campaign_id)
+                campaign = {
+                    "id": campaign_id, 
+                    "history": [],
+                    "created_at": now
+                }
+                campaigns.append(campaign)
+            
+            # Add status update
+            campaign["current_status"] = status
+            campaign["updated_at"] = now
+            campaign["history"].append({
+                "status": status,
+                "timestamp": now,
+                "metadata": metadata or {}
+            })
+            return campaigns
         
-        # Save updated data
-        with open(self.campaigns_file, "w") as f:
-            json.dump(campaigns, f, indent=2)
+        self.rewrite_campaigns(apply)
+        # Back in the hot file: an archived copy is stale from now on
+        if revived and self.archive.contains(campaign_id):
+            self.archive.forget(revived)
+        
+        # Push the delta to live stream subscribers
+        workflow_events.publish_campaign(campaign_id, status, now, metadata)
+    
+    def rewrite_campaigns(self, fn: Callable[[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]]]) -> None:
+        """
+        Read, transform and save campaigns.json under the per-file lock.
+        
+        Args:
+            fn: Receives the stored campaigns and returns the list to save,
+                or None to leave the file unchanged
+        """
+        with self._lock:
+            # Read current campaigns data
+            try:
+                with open(self.campaigns_file, "r") as f:
+                    campaigns = json.load(f)
+            except json.JSONDecodeError:
+                # Handle corrupted file by starting fresh
+                campaigns = []
+            
+            updated = fn(campaigns)
+            if updated is None:
+                return
+            campaigns = updated
+            
+            # Save updated data
+            self._write_json(self.campaigns_file, campaigns)
+        ACTIVE_CAMPAIGNS.set(sum(
+            1 for c in campaigns if c.get("current_status") not in TERMINAL_STATUSES
+        ))
     
     def update_agent_status(self, agent_id: str, status: str, 
                            current_task: Optional[str] = None) -> None:
@@ -115,13 +216,123 @@ class SimpleWorkflowMonitor(WorkflowMonitor):
         }
         
         # Save updated data
-        with open(self.agents_file, "w") as f:
-            json.dump(agents, f, indent=2)
+        self._write_json(self.agents_file, agents)
+        
+        # Push the delta to live stream subscribers
+        workflow_events.publish_agent(agent_id, status, current_task,
+                                      agents[agent_id]["last_updated"])
+    
+    def get_version(self) -> str:
+        """
+        Return a token that changes whenever the campaign state changes.
+        
+        Only stats the file, so it is cheap enough to check on every poll.
+        """
+        try:
+            st = os.stat(self.campaigns_file)
+        except FileNotFoundError:
+            return "0"
+        return f"{_write_counts.get(self.campaigns_file, 0)}-{st.st_mtime_ns}-{st.st_size}"
+    
+    def _campaign_view(self) -> _CampaignView:
+        """Return the parsed, indexed campaigns, re-reading the file only when it changed."""
+        version = self.get_version()
+        cached = _campaign_views.get(self.campaigns_file)
+        if cached and cached[0] == version:
+            return cached[1]
+        
+        try:
+            with open(self.campaigns_file, "r") as f:
+                campaigns = json.load(f)
+        except json.JSONDecodeError:
+            # Handle corrupted file
+            campaigns = []
+        view = _CampaignView(campaigns)
+        
+        # Only cache if nothing was written while we were reading
+        if self.get_version() == version:
+            with _campaign_views_lock:
+                _campaign_views[self.campaigns_file] = (version, view)
+        return view
+    
+    def query_campaigns(self, statuses: Optional[List[str]] = None,
+                        since: Optional[str] = None, until: Optional[str] = None,
+                        after: Optional[Tuple[str, str]] = None, limit: int = 100,
+                        descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, str]]]:
+        """
+        Return one page of campaigns in creation order.
+        
+        Args:
+            statuses: Only campaigns whose current status is one of these
+            since: Only campaigns updated at or after this ISO timestamp (naive means local time)
+            until: Only campaigns updated at or before this ISO timestamp (naive means local time)
+            after: Sort key (created_at, id) of the last campaign of the previous page
+            limit: Maximum number of campaigns to return
+            descending: Newest first when True
+            
+        Returns:
+            (campaigns, sort key to pass as ``after`` for the next page, or None)
+            The campaigns are copies the caller may modify.
+        
+        Raises:
+            ValueError: If ``since`` or ``until`` is not an ISO timestamp
+        """
+        view = self._campaign_view()
+        
+        if statuses:
+            positions = list(heapq.merge(*(view.by_status.get(s, []) for s in set(statuses))))
+        else:
+            positions = range(len(view.ordered))
+        if since or until:
+            in_range = view.updated_between(_epoch(since), _epoch(until))
+            if statuses:
+                wanted = set(positions)
+                in_range = [pos for pos in in_range if pos in wanted]
+            positions = in_range
+        
+        # Skip everything up to and including the cursor
+        if after is not None:
+            after = tuple(after)
+            if descending:
+                cut = bisect.bisect_left(positions, bisect.bisect_left(view.keys, after))
+                positions = positions[:cut]
+            else:
+                cut = bisect.bisect_left(positions, bisect.bisect_right(view.keys, after))
+                positions = positions[cut:]
+        if descending:
+            positions = reversed(positions)
+        
+        page = []
+        for pos in positions:
+            if len(page) == limit:
+                return page, _CampaignView.sort_key(page[-1])
+            page.append(copy.deepcopy(view.ordered[pos]))
+        return page, None
+    
+    def _write_json(self, path: str, data: Any) -> None:
+        """
+        Persist a state file and record how long the write took.
+        
+        Args:
+            path: File to overwrite
+            data: JSON-serializable state
+        """
+        start = time.perf_counter()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        _write_counts[path] = _write_counts.get(path, 0) + 1
+        WORKFLOW_WRITE_LATENCY.observe(time.perf_counter() - start,
+                                       file=os.path.basename(path))
     
     def get_campaign_status(self, campaign_id: Optional[str] = None) -> Union[Dict, List[Dict], None]:
         """
         Get the current status of one or all campaigns.
         
+        The parsed file is shared between calls until it changes; callers get
+        copies, so modifying them cannot corrupt the shared state. Listing
+        all campaigns only covers the hot file; a single archived campaign is
+        still found by id.
+        
         Args:
             campaign_id: Optional ID to get status of a specific campaign
             
@@ -129,19 +340,30 @@ class SimpleWorkflowMonitor(WorkflowMonitor):
             Campaign status information as a dict for a specific campaign
             or a list of dicts for all campaigns
         """
-        try:
-            with open(self.campaigns_file, "r") as f:
-                campaigns = json.load(f)
-        except json.JSONDecodeError:
-            # Handle corrupted file
-            campaigns = []
+        view = self._campaign_view()
         
         if campaign_id:
-            # Return specific campaign if requested
-            return next((c for c in campaigns if c["id"] == campaign_id), None)
+            # Return specific campaign if requested, falling back to the archive
+            campaign = view.by_id.get(campaign_id)
+            if campaign is None:
+                return self.archive.get(campaign_id)
+            return copy.deepcopy(campaign)
         
-        # Otherwise return all campaigns
-        return campaigns
+        # Otherwise return all campaigns, in the order they were created
+        return copy.deepcopy(view.ordered)
+    
+    def get_archive_months(self) -> List[Dict[str, Any]]:
+        """List archived months, newest first, with their campaign counts."""
+        return self.archive.months()
+    
+    def get_archived_campaigns(self, month: str) -> List[Dict[str, Any]]:
+        """
+        Get every campaign archived for a month.
+        
+        Raises:
+            ValueError: If the month is not in YYYY-MM form
+        """
+        return self.archive.read_month(month)
     
     def get_agent_status(self, agent_id: Optional[str] = None) -> Union[Dict, Dict[str, Dict], None]:
         """
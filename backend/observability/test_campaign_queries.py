@@ -0,0 +1,86 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for paginated campaign queries and /api/workflow/campaigns.
+
+Checks that cursor pages cover every campaign once in both orders, that
+since/until compare timestamps with different offsets correctly, that
+returned campaigns are copies, and that a matching If-None-Match gets 304.
+"""
+
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.observability.api import get_workflow_monitor, workflow_router
+from backend.observability.simple.tracker import SimpleWorkflowMonitor
+
+def _monitor(storage_dir, count=7):
+    monitor = SimpleWorkflowMonitor(storage_dir)
+    campaigns = [{"id": f"c{i}", "created_at": f"2025-01-0{i + 1}T00:00:00",
+                  "updated_at": f"2025-01-0{i + 1}T12:00:00+00:00",
+                  "current_status": "completed" if i % 2 else "active", "history": []}
+                 for i in range(count)]
+    monitor.rewrite_campaigns(lambda _: campaigns)
+    return monitor
+
+def _pages(monitor, **kwargs):
+    ids, after = [], None
+    while True:
+        page, after = monitor.query_campaigns(after=after, limit=2, **kwargs)
+        ids += [c["id"] for c in page]
+        if after is None:
+            return ids
+
+def test_cursor_pagination_and_filters():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        monitor = _monitor(storage_dir)
+        assert _pages(monitor) == [f"c{i}" for i in reversed(range(7))]
+        assert _pages(monitor, descending=False) == [f"c{i}" for i in range(7)]
+        assert _pages(monitor, statuses=["active"]) == ["c6", "c4", "c2", "c0"]
+
+        # 2025-01-03T12:00Z is 2025-01-03T14:00+02:00; a string comparison would miss c2
+        assert _pages(monitor, since="2025-01-03T14:00:00+02:00",
+                      until="2025-01-05T12:00:00Z") == ["c4", "c3", "c2"]
+        assert _pages(monitor, statuses=["completed"], since="2025-01-03T12:00:00Z") == ["c5", "c3"]
+
+        # Callers get copies of the shared, cached state
+        monitor.get_campaign_status("c1")["current_status"] = "mutated"
+        monitor.get_campaign_status()[0]["history"].append("mutated")
+        monitor.query_campaigns(limit=1)[0][0]["id"] = "mutated"
+        assert monitor.get_campaign_status("c1")["current_status"] == "completed"
+        assert monitor.get_campaign_status()[0]["history"] == []
+        assert monitor.query_campaigns(limit=1)[0][0]["id"] == "c6"
+
+def test_campaigns_endpoint_etag():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        monitor = _monitor(storage_dir)
+        app = FastAPI()
+        app.include_router(workflow_router)
+        app.dependency_overrides[get_workflow_monitor] = lambda: monitor
+        client = TestClient(app)
+
+        first = client.get("/api/workflow/campaigns", params={"limit": 3, "fields": "id"})
+        assert first.status_code == 200 and [c["id"] for c in first.json()] == ["c6", "c5", "c4"]
+        etag = first.headers["ETag"]
+        second = client.get("/api/workflow/campaigns", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+        assert [c["id"] for c in second.json()] == ["c3", "c2", "c1"]
+
+        cached = client.get("/api/workflow/campaigns", params={"limit": 3, "fields": "id"},
+                            headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.headers["ETag"] == etag
+
+        # Another query, or any change to the campaigns, gets a new ETag
+        other = client.get("/api/workflow/campaigns", params={"limit": 4, "fields": "id"},
+                           headers={"If-None-Match": etag})
+        assert other.status_code == 200
+        monitor.update_campaign_status("c7", "active")
+        changed = client.get("/api/workflow/campaigns", params={"limit": 3, "fields": "id"},
+                             headers={"If-None-Match": etag})
+        assert changed.status_code == 200 and changed.json()[0]["id"] == "c7"
+
+if __name__ == "__main__":
+    test_cursor_pagination_and_filters()
+    test_campaigns_endpoint_etag()
@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the workflow event bus.
+
+Checks Last-Event-ID replay from the ring buffer, that ids from another boot
+or evicted from history ask for a snapshot, and that a slow subscriber's
+buffer stays bounded and is flagged for a snapshot.
+"""
+
+import asyncio
+
+from backend.observability.events import WorkflowEventBus
+
+def test_replay_and_epochs():
+    async def run():
+        bus = WorkflowEventBus(history_size=5)
+        for i in range(8):
+            bus.publish_agent("intake", f"step {i}", None, f"2025-01-01T00:00:0{i}")
+
+        # Ids 4..8 are held; resuming after 5 replays 6..8
+        subscriber, replay, needs_snapshot = bus.subscribe(bus.wire_id(5))
+        assert not needs_snapshot and [e[0] for e in replay] == [6, 7, 8]
+        bus.unsubscribe(subscriber)
+
+        # Up to date: nothing to send
+        _, replay, needs_snapshot = bus.subscribe(bus.wire_id(8))
+        assert replay == [] and not needs_snapshot
+
+        # Evicted, from the future, from another boot, legacy or malformed: snapshot
+        for stale in (bus.wire_id(1), bus.wire_id(99), "deadbeef-6", "6", "junk", None):
+            _, replay, needs_snapshot = bus.subscribe(stale)
+            assert replay == [] and needs_snapshot, stale
+
+        other_boot = WorkflowEventBus()
+        other_boot.publish_agent("intake", "idle", None, None)
+        _, _, needs_snapshot = other_boot.subscribe(bus.wire_id(1))
+        assert needs_snapshot
+
+        last_id, state = bus.snapshot()
+        assert last_id == bus.wire_id(8) and state["agents"]["intake"]["status"] == "step 7"
+    asyncio.run(run())
+
+def test_slow_subscriber_is_bounded():
+    async def run():
+        bus = WorkflowEventBus()
+        subscriber, _, _ = bus.subscribe(None, buffer_size=3)
+        for i in range(10):
+            bus.publish_campaign(f"c{i}", "active", "2025-01-01T00:00:00")
+        assert len(subscriber.buffer) == 3 and subscriber.overflowed
+        assert [e[0] for e in subscriber.drain()] == [8, 9, 10]
+        assert await subscriber.wait(0.1)
+        assert not await subscriber.wait(0.01)
+        bus.unsubscribe(subscriber)
+        assert bus.subscriber_count == 0
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    test_replay_and_epochs()
+    test_slow_subscriber_is_bounded()
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the rotating, indexed agent log store.
+
+Writes task events through a small-size rotating handler, then checks that
+paging through every segment returns each event exactly once, also when the
+log rotates between two page requests, and that the age limit survives a
+restart.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+from backend.observability.simple.logstore import IndexedRotatingFileHandler, LogStore, list_archives
+
+def _logger(path, **kwargs):
+    handler = IndexedRotatingFileHandler(path, **kwargs)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logger = logging.getLogger(f"test_logstore.{path}")
+    logger.propagate = False
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+def _log(logger, n, campaign_id="c1"):
+    logger.info(json.dumps({"event": "task_start", "task_id": f"t{n}"}),
+                extra={"task_id": f"t{n}", "campaign_id": campaign_id})
+
+def _tasks(entries):
+    return [e["event"]["task_id"] for e in entries]
+
+def test_pagination_across_rotation():
+    with tempfile.TemporaryDirectory() as log_dir:
+        path = os.path.join(log_dir, "intake.log")
+        logger, handler = _logger(path, max_bytes=600, rotate_interval=0)
+        for n in range(20):
+            _log(logger, n)
+        assert list_archives(path)
+
+        store = LogStore(log_dir)
+        seen, cursor = [], None
+        while True:
+            page, cursor = store.query("intake", limit=3, cursor=cursor)
+            seen += _tasks(page)
+            if cursor is None:
+                break
+            # Rotate between pages: newer events must not shift the cursor
+            for n in range(100 + len(seen), 100 + len(seen) + 4):
+                _log(logger, n, campaign_id="c2")
+        assert seen == [f"t{n}" for n in reversed(range(20))], seen
+
+        # Index lookups page the same way
+        seen, cursor = [], None
+        while True:
+            page, cursor = store.query("intake", limit=4, cursor=cursor, campaign_id="c1")
+            seen += _tasks(page)
+            if cursor is None:
+                break
+        assert seen == [f"t{n}" for n in reversed(range(20))]
+
+        for bad in ("0:12", "x:1", "20250101-000000-000000:-1"):
+            try:
+                store.query("intake", cursor=bad)
+                assert False, bad
+            except ValueError:
+                pass
+        handler.close()
+
+def test_age_limit_survives_restart():
+    with tempfile.TemporaryDirectory() as log_dir:
+        path = os.path.join(log_dir, "strategy.log")
+        logger, handler = _logger(path, rotate_interval=3600)
+        _log(logger, 1)
+        opened_at = handler._opened_at
+        handler.close()
+
+        # Touching the file (as an inode change would) must not reset the age
+        time.sleep(0.01)
+        os.utime(path)
+        logger, handler = _logger(path, rotate_interval=3600)
+        assert handler._opened_at == opened_at
+        assert handler._should_rotate(opened_at + 3601)
+        handler.close()
+
+if __name__ == "__main__":
+    test_pagination_across_rotation()
+    test_age_limit_survives_restart()
@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the Prometheus metrics registry.
+
+Records counters from several threads and prints the /metrics payload.
+"""
+
+import threading
+
+from backend.observability.metrics import Counter, Histogram, MetricsRegistry
+
+def test_metrics():
+    """Shards recorded on different threads add up on scrape."""
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("test_requests_total", "Test requests.", ("agent",)))
+    latency = registry.register(Histogram("test_latency_seconds", "Test latency.", buckets=(0.1, 1.0)))
+
+    def work():
+        for _ in range(1000):
+            requests.inc(agent="intake")
+            latency.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = registry.render()
+    print(text)
+    assert 'agency_test_requests_total{agent="intake"} 4000' in text
+    assert 'agency_test_latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'agency_test_latency_seconds_bucket{le="+Inf"} 4000' in text
+
+if __name__ == "__main__":
+    test_metrics()
@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for workflow retention and the monthly campaign archive.
+
+Compacts a small campaigns file, then checks trimming, archival, archive
+lookups by id and month, and that a campaign updated after it was archived
+is served from the hot file everywhere.
+"""
+
+import tempfile
+from datetime import datetime
+
+from backend.observability.simple.retention import RetentionPolicy, WorkflowCompactor
+from backend.observability.simple.tracker import SimpleWorkflowMonitor
+
+NOW = datetime(2025, 3, 20)
+
+def _campaign(campaign_id, status, created_at, updated_at, events=1):
+    history = [{"status": status, "timestamp": f"2025-03-{10 + i:02d}T00:00:00", "metadata": {}}
+               for i in range(events)]
+    return {"id": campaign_id, "created_at": created_at, "updated_at": updated_at,
+            "current_status": status, "history": history}
+
+def test_compaction_and_archive_lookup():
+    with tempfile.TemporaryDirectory() as storage_dir:
+        monitor = SimpleWorkflowMonitor(storage_dir)
+        monitor.rewrite_campaigns(lambda _: [
+            _campaign("old-done", "completed", "2025-02-01T00:00:00", "2025-02-02T00:00:00"),
+            _campaign("old-failed", "failed", "2025-01-15T00:00:00", "2025-01-16T00:00:00"),
+            _campaign("recent-done", "completed", "2025-03-18T00:00:00", "2025-03-19T00:00:00"),
+            _campaign("chatty", "active", "2025-03-01T00:00:00", "2025-03-19T00:00:00", events=8),
+        ])
+        compactor = WorkflowCompactor(monitor, RetentionPolicy(max_event_age_days=90, max_history_events=3,
+                                                               archive_finished_after_days=7))
+
+        stats = compactor.run_once(NOW)
+        assert stats == {"archived": 2, "trimmed_events": 5}
+        hot = {c["id"]: c for c in monitor.get_campaign_status()}
+        assert set(hot) == {"recent-done", "chatty"}
+        assert len(hot["chatty"]["history"]) == 3 and hot["chatty"]["history_trimmed"] == 5
+
+        # Nothing left to do: the file (and its version) stays untouched
+        version = monitor.get_version()
+        assert compactor.run_once(NOW) == {"archived": 0, "trimmed_events": 0}
+        assert monitor.get_version() == version
+
+        assert monitor.get_archive_months() == [{"month": "2025-02", "campaigns": 1},
+                                                {"month": "2025-01", "campaigns": 1}]
+        assert [c["id"] for c in monitor.get_archived_campaigns("2025-02")] == ["old-done"]
+        assert monitor.get_campaign_status("old-failed")["current_status"] == "failed"
+        assert monitor.get_campaign_status("missing") is None
+        try:
+            monitor.get_archived_campaigns("2025-2")
+            assert False, "malformed month accepted"
+        except ValueError:
+            pass
+
+        # Updated after archival: the hot entry wins for lookups and listings alike
+        monitor.update_campaign_status("old-done", "active")
+        assert monitor.get_campaign_status("old-done")["current_status"] == "active"
+        assert monitor.get_archive_months() == [{"month": "2025-01", "campaigns": 1}]
+        assert monitor.get_archived_campaigns("2025-02") == []
+
+if __name__ == "__main__":
+    test_compaction_and_archive_lookup()
@@ -0,0 +1,281 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/planning/memo.py
+
+Need for this file (5th-grader explanation):
+"When the teacher asks 'which tools does a Media Buyer with Google Ads and
+Excel use?', the answer is almost always the same. So we write down every
+answer that was checked and correct. Once the same question has been
+answered the same way enough times, we just read the answer from our
+notebook instead of asking the robot again. Now and then we still ask the
+robot, to make sure our notebook is not wrong."
+
+PlanMemo maps (role, normalized tools) to the execution plans seen for it:
+
+- plans are stored as templates: a step naming one of the subtask's own
+  tools is kept as that tool's position in the sorted tool list, so one
+  entry serves every spelling and order of the same tools; a plan's
+  ``depends_on`` (step -> steps it waits for) is part of its template,
+  mapped the same way, so plans with other dependencies count apart;
+- ``lookup`` answers only when a key has at least ``min_observations``
+  audited plans and the most common one has at least ``min_agreement`` of
+  them (ties are broken deterministically);
+- every ``check_every``-th answer is also planned by the LLM and compared,
+  which gives the disagreement rate.
+
+Observations are appended to a JSON-lines journal (``plans.jsonl``),
+replayed on start-up and compacted into counts when it grows. Lines that do
+not decode (a write cut short by a crash) are skipped and dropped by
+compacting right away, so later appends start on a clean line.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from backend.observability.metrics import record_cache_lookup, record_plan_comparison
+
+logger = logging.getLogger("blueprint_maker.plan_memo")
+
+DEFAULT_STORAGE_DIR = "data/planning"
+DEFAULT_MIN_OBSERVATIONS = 3
+DEFAULT_MIN_AGREEMENT = 0.8
+DEFAULT_CHECK_EVERY = 50
+
+MemoKey = Tuple[str, Tuple[str, ...]]
+
+
+def _norm(value: Any) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def memo_key(role: str, tools: Sequence[str]) -> MemoKey:
+    """Case-, whitespace- and order-insensitive (role, tools) key."""
+    return _norm(role), tuple(sorted({_norm(t) for t in tools or [] if _norm(t)}))
+
+
+def _slot_order(slot: Union[int, str]) -> Tuple[bool, Union[int, str]]:
+    return isinstance(slot, str), slot
+
+
+def to_template(key: MemoKey, plan: Sequence[str],
+                depends_on: Optional[Dict[str, Sequence[str]]] = None) -> str:
+    """
+    A plan with the key's tools replaced by their positions (JSON text, so it
+    can be counted). Without dependencies the template is the step list, as
+    it always was; with them it is ``{"steps": [...], "depends_on": [[step,
+    [steps it waits for]], ...]}`` in a canonical order.
+    """
+    positions = {tool: i for i, tool in enumerate(key[1])}
+
+    def slot(step: str) -> Union[int, str]:
+        return positions.get(_norm(step), str(step))
+
+    steps = [slot(step) for step in plan]
+    waits: Dict[Union[int, str], set] = {}
+    for step, deps in (depends_on or {}).items():
+        if deps:
+            waits.setdefault(slot(step), set()).update(slot(d) for d in deps)
+    if not waits:
+        return json.dumps(steps, separators=(",", ":"))
+    pairs = [[step, sorted(waits[step], key=_slot_order)] for step in sorted(waits, key=_slot_order)]
+    return json.dumps({"steps": steps, "depends_on": pairs}, separators=(",", ":"))
+
+
+def _from_slots(tools: Sequence[str]) -> Callable[[Union[int, str]], str]:
+    by_norm = {}
+    for tool in tools or []:
+        by_norm.setdefault(_norm(tool), tool)
+    ordered = [by_norm[t] for t in sorted(by_norm) if t]
+    return lambda step: ordered[step] if isinstance(step, int) else step
+
+
+def from_template(template: str, tools: Sequence[str]) -> List[str]:
+    """A plan for a subtask whose ``tools`` produced the template's key."""
+    data = json.loads(template)
+    step = _from_slots(tools)
+    return [step(s) for s in (data["steps"] if isinstance(data, dict) else data)]
+
+
+def template_dependencies(template: str, tools: Sequence[str]) -> Optional[Dict[str, List[str]]]:
+    """The ``depends_on`` of a template's plan for a subtask with ``tools``, or None if it has none."""
+    data = json.loads(template)
+    if not isinstance(data, dict):
+        return None
+    step = _from_slots(tools)
+    return {step(s): [step(d) for d in deps] for s, deps in data["depends_on"]}
+
+
+class PlanMemo:
+    """Indexed table of audited execution plans by (role, normalized tools)."""
+
+    def __init__(self, storage_dir: str = DEFAULT_STORAGE_DIR, min_observations: int = DEFAULT_MIN_OBSERVATIONS,
+                 min_agreement: float = DEFAULT_MIN_AGREEMENT, check_every: int = DEFAULT_CHECK_EVERY):
+        """
+        Args:
+            storage_dir: Directory for the journal
+            min_observations: Audited plans a key needs before it is answered from the table
+            min_agreement: Share of those plans the most common one must have
+            check_every: Every this-many answers is also planned by the LLM and compared (0 disables)
+        """
+        self.storage_dir = storage_dir
+        self.journal_file = os.path.join(storage_dir, "plans.jsonl")
+        self.min_observations = min_observations
+        self.min_agreement = min_agreement
+        self.check_every = check_every
+        os.makedirs(storage_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # key -> {template: count}
+        self._plans: Dict[MemoKey, Dict[str, int]] = {}
+        # key -> answered template when confident, else None; rebuilt on learn
+        self._answers: Dict[MemoKey, Optional[str]] = {}
+        self._journal_lines = 0
+        self._hits = 0
+        self._misses = 0
+        self._comparisons = 0
+        self._disagreements = 0
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self) -> None:
+        if not os.path.exists(self.journal_file):
+            return
+        skipped = 0
+        with open(self.journal_file, "r", encoding="utf-8", errors="replace") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                self._journal_lines += 1
+                try:
+                    row = json.loads(line)
+                    key = (row["role"], tuple(row["tools"]))
+                    plan, count = row["plan"], int(row.get("count", 1))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning("Skipping undecodable line %d of %s: %s", number, self.journal_file, e)
+                    skipped += 1
+                    continue
+                counts = self._plans.setdefault(key, {})
+                counts[plan] = counts.get(plan, 0) + count
+        for key in self._plans:
+            self._answers[key] = self._best(key)
+        if skipped or self._journal_lines > 2 * self._rows() + 100:
+            self._compact()
+
+    def _rows(self) -> int:
+        return sum(len(counts) for counts in self._plans.values())
+
+    def _append(self, row: Dict[str, Any]) -> None:
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+        self._journal_lines += 1
+        if self._journal_lines > 2 * self._rows() + 100:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.journal_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for (role, tools), counts in self._plans.items():
+                for template, count in counts.items():
+                    row = {"role": role, "tools": list(tools), "plan": template, "count": count}
+                    f.write(json.dumps(row, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.journal_file)
+        self._journal_lines = self._rows()
+
+    # ---------- table ----------
+
+    def _best(self, key: MemoKey) -> Optional[str]:
+        counts = self._plans.get(key)
+        if not counts:
+            return None
+        total = sum(counts.values())
+        # Most seen, then the shortest / lexicographically first template
+        template = min(counts, key=lambda t: (-counts[t], len(t), t))
+        if total < self.min_observations or counts[template] / total < self.min_agreement:
+            return None
+        return template
+
+    def lookup(self, role: str, tools: Sequence[str]) -> Optional[List[str]]:
+        """The memoized plan's steps for a subtask, or None when the table is not confident."""
+        details = self.lookup_details(role, tools)
+        return details["steps_executed"] if details is not None else None
+
+    def lookup_details(self, role: str, tools: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        The memoized plan for a subtask as ExecutionAgent ``details``
+        (``steps_executed`` and, when the plan has them, ``depends_on``), or
+        None when the table is not confident.
+        """
+        template = self._answers.get(memo_key(role, tools))
+        record_cache_lookup("execution_plan", template is not None)
+        with self._lock:
+            if template is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        details: Dict[str, Any] = {"steps_executed": from_template(template, tools)}
+        depends_on = template_dependencies(template, tools)
+        if depends_on:
+            details["depends_on"] = depends_on
+        return details
+
+    def should_check(self) -> bool:
+        """True for every ``check_every``-th hit (call right after a hit from ``lookup``)."""
+        return self.check_every > 0 and self._hits % self.check_every == 0
+
+    def learn(self, role: str, tools: Sequence[str], plan: Sequence[str],
+              depends_on: Optional[Dict[str, Sequence[str]]] = None) -> None:
+        """Record one audited plan (with its ``depends_on``, if any) for a subtask."""
+        key = memo_key(role, tools)
+        template = to_template(key, plan, depends_on)
+        with self._lock:
+            counts = self._plans.setdefault(key, {})
+            counts[template] = counts.get(template, 0) + 1
+            self._answers[key] = self._best(key)
+            self._append({"role": key[0], "tools": list(key[1]), "plan": template})
+
+    def compare(self, tools: Sequence[str], memo_plan: Sequence[str], llm_plan: Sequence[str],
+                memo_depends_on: Optional[Dict[str, Sequence[str]]] = None,
+                llm_depends_on: Optional[Dict[str, Sequence[str]]] = None) -> bool:
+        """Record whether an LLM plan matches a memoized one, steps and dependencies (tool spelling ignored)."""
+        role_free = ("", tuple(sorted({_norm(t) for t in tools or [] if _norm(t)})))
+        agree = (to_template(role_free, memo_plan, memo_depends_on)
+                 == to_template(role_free, llm_plan, llm_depends_on))
+        record_plan_comparison(agree)
+        with self._lock:
+            self._comparisons += 1
+            self._disagreements += 0 if agree else 1
+        return agree
+
+    def stats(self) -> Dict[str, Any]:
+        """Keys, lookups, hit rate and disagreement rate since start-up."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "keys": len(self._plans),
+                "confident_keys": sum(1 for t in self._answers.values() if t is not None),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "comparisons": self._comparisons,
+                "disagreements": self._disagreements,
+                "disagreement_rate": self._disagreements / self._comparisons if self._comparisons else 0.0,
+            }
+
+
+_memos: Dict[str, PlanMemo] = {}
+_memos_lock = threading.Lock()
+
+
+def get_plan_memo(storage_dir: str = DEFAULT_STORAGE_DIR) -> PlanMemo:
+    """Process-wide plan memo for a storage directory."""
+    with _memos_lock:
+        memo = _memos.get(storage_dir)
+        if memo is None:
+            memo = _memos[storage_dir] = PlanMemo(storage_dir)
+        return memo
@@ -0,0 +1,77 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the execution plan memo.
+
+Teaches the memo a few audited plans and checks when it answers, that its
+answer uses the subtask's own tool spelling, and that it survives a restart,
+also after a crash left a partial line in its journal.
+"""
+
+import json
+import tempfile
+
+from backend.planning.memo import PlanMemo
+
+def test_plan_memo():
+    with tempfile.TemporaryDirectory() as tmp:
+        memo = PlanMemo(tmp, min_observations=3, min_agreement=0.8)
+        for _ in range(2):
+            memo.learn("Media Buyer", ["Google Ads", "Excel"], ["Excel", "Google Ads"])
+        assert memo.lookup("media buyer", ["excel", "google ads"]) is None
+
+        memo.learn("Media Buyer", ["Excel", "Google Ads"], ["excel", "google ads", "Slack"])
+        memo.learn("Media Buyer", ["Google Ads", "Excel"], ["Excel", "Google Ads"])
+        memo.learn("Media Buyer", ["Google Ads", "Excel"], ["Excel", "Google Ads"])
+        # 4 of 5 plans agree
+        assert memo.lookup(" MEDIA buyer", ["google ads ", "EXCEL"]) == ["EXCEL", "google ads "]
+        assert memo.compare(["Excel", "Google Ads"], ["Excel", "Google Ads"], ["excel", "google ads"])
+
+        restarted = PlanMemo(tmp, min_observations=3, min_agreement=0.8)
+        assert restarted.lookup("Media Buyer", ["Excel", "Google Ads"]) == ["Excel", "Google Ads"]
+        print(memo.stats())
+
+def test_plan_dependencies():
+    with tempfile.TemporaryDirectory() as tmp:
+        memo = PlanMemo(tmp, min_observations=2, min_agreement=0.8)
+        for tools in (["DSP API", "Creative CDN"], ["dsp api", "CREATIVE CDN"]):
+            memo.learn("AdOps", tools, [tools[0], tools[1], "Slack"], {"Slack": [tools[0], tools[1]]})
+        details = memo.lookup_details("AdOps", ["Creative CDN", "DSP API"])
+        assert details["steps_executed"] == ["DSP API", "Creative CDN", "Slack"]
+        assert details["depends_on"] == {"Slack": ["Creative CDN", "DSP API"]}
+
+        # The same steps with other dependencies are another plan
+        memo.learn("AdOps", ["DSP API", "Creative CDN"], ["DSP API", "Creative CDN", "Slack"])
+        assert memo.lookup("AdOps", ["DSP API", "Creative CDN"]) is None
+
+        # Spot checks count other dependencies as a disagreement
+        plan = ["DSP API", "Creative CDN", "Slack"]
+        assert memo.compare(["DSP API", "Creative CDN"], plan, plan, {"Slack": ["DSP API", "Creative CDN"]},
+                            {"Slack": ["creative cdn", "dsp api"]})
+        assert not memo.compare(["DSP API", "Creative CDN"], plan, plan, {"Slack": ["DSP API"]}, None)
+        assert not memo.compare(["DSP API", "Creative CDN"], plan, plan, None, {"Creative CDN": ["DSP API"]})
+        assert PlanMemo(tmp, min_observations=2, min_agreement=0.6).lookup_details(
+            "AdOps", ["DSP API", "Creative CDN"])["depends_on"] == {"Slack": ["Creative CDN", "DSP API"]}
+
+def test_partial_journal_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        memo = PlanMemo(tmp, min_observations=2, min_agreement=0.8)
+        for _ in range(2):
+            memo.learn("Media Buyer", ["Excel"], ["Excel"])
+        with open(memo.journal_file, "a", encoding="utf-8") as f:
+            f.write('{"role":"media buyer","tools":["excel"],"pl')  # cut short by a crash
+
+        restarted = PlanMemo(tmp, min_observations=2, min_agreement=0.8)
+        assert restarted.lookup("Media Buyer", ["Excel"]) == ["Excel"]
+        restarted.learn("Analyst", ["Sheets"], ["Sheets"])
+        restarted.learn("Analyst", ["Sheets"], ["Sheets"])
+        with open(memo.journal_file, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        assert sum(row.get("count", 1) for row in rows) == 4
+        assert PlanMemo(tmp, min_observations=2).lookup("Analyst", ["Sheets"]) == ["Sheets"]
+
+if __name__ == "__main__":
+    test_plan_memo()
+    test_plan_dependencies()
+    test_partial_journal_line()
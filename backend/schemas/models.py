@@ -91,6 +91,8 @@ class ExecuteInput(BaseModel):
 
 class ExecuteDetails(BaseModel):
     steps_executed: List[str]
+    # Optional: step -> steps it waits for, passed on to APICallerInput.depends_on
+    depends_on: Optional[Dict[str, List[str]]] = None
 
 class ExecuteOutput(BaseModel):
     status: str
@@ -101,6 +103,8 @@ class ExecuteOutput(BaseModel):
 #
 class APICallerInput(ExecuteInput):
     plan: List[str]
+    # Optional: step -> steps it waits for; when given, unlisted steps wait for nothing
+    depends_on: Optional[Dict[str, List[str]]] = None
 
 class APICallerOutput(BaseModel):
     status: str
@@ -0,0 +1,368 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/tools/engine.py
+
+Need for this file (5th-grader explanation):
+"Each tool in a plan (the DSP, the CDN, the ad server) speaks on its own
+phone line. Instead of dialing a new call for every step, we keep the lines
+open and reuse them, never let too many people talk to the same company at
+once, hang up if nobody answers in time, and try again if the line was
+busy."
+
+ToolEngine runs plan steps through pluggable adapters:
+
+- ``MockAdapter`` answers ``{"result": "ok", "tool": ...}`` without any I/O
+  (the old behaviour, still used for tools that are not configured);
+- ``HttpAdapter`` calls a tool's HTTP API through its own pooled
+  ``httpx.AsyncClient`` (keep-alive), with a per-host concurrency limit,
+  a timeout and retries with backoff on connection errors, 429 and 5xx.
+  Every plan step sends an ``Idempotency-Key`` header that stays the same
+  across its retries, so a POST the tool already handled is not applied
+  twice; calls without a key retry POST and PATCH only when the request
+  never reached the tool (connection errors).
+
+Adapters come from ``registry.yaml`` next to this file; other adapter types
+can be added to ``ADAPTERS``. All I/O runs on one background event loop, so
+connection pools live across ``APICallerAgent.run`` calls.
+
+Plans run step by step, unless they come with ``depends_on`` annotations
+({step: [steps it waits for]}). Then they run as a DAG: every step starts as
+soon as the steps it names have succeeded, up to ``max_parallel`` at a time,
+so a plan takes about as long as its longest dependency chain.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import yaml
+
+logger = logging.getLogger("blueprint_maker.tool_engine")
+
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "registry.yaml")
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.2
+# Concurrent requests allowed to one host, across every tool that uses it
+MAX_PER_HOST = int(os.getenv("TOOL_ENGINE_MAX_PER_HOST", "8"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Methods that may be repeated after the request was sent, even without an idempotency key
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Steps of one dependency-annotated plan running at the same time
+MAX_PARALLEL_STEPS = int(os.getenv("TOOL_ENGINE_MAX_PARALLEL_STEPS", "4"))
+
+
+class ToolError(RuntimeError):
+    """A tool call failed after its retries."""
+
+
+def tool_slug(tool: str) -> str:
+    """URL-safe form of a tool name ("DSP API" -> "dsp-api")."""
+    return re.sub(r"[^a-z0-9]+", "-", tool.casefold()).strip("-") or "tool"
+
+
+def _expand_env(value: Any) -> Any:
+    """``${VAR}`` references in config strings, replaced from the environment."""
+    if isinstance(value, str):
+        return re.sub(r"\$\{(\w+)\}", lambda m: os.getenv(m.group(1), ""), value)
+    if isinstance(value, dict):
+        return {k: _expand_env(v) for k, v in value.items()}
+    return value
+
+
+def plan_dependencies(plan: List[str], depends_on: Dict[str, List[str]]) -> List[Set[int]]:
+    """
+    Indexes each plan step waits for. A step named more than once waits for
+    (and is waited on by) every occurrence.
+
+    Raises:
+        ValueError: On a dependency that is not a plan step, or a cycle
+    """
+    positions: Dict[str, List[int]] = {}
+    for i, tool in enumerate(plan):
+        positions.setdefault(tool, []).append(i)
+    unknown = [d for step, deps in depends_on.items() for d in [step, *deps] if d not in positions]
+    if unknown:
+        raise ValueError(f"Plan dependencies name steps not in the plan: {sorted(set(unknown))}")
+    deps = [
+        {d for name in depends_on.get(tool, []) for d in positions[name] if d != i}
+        for i, tool in enumerate(plan)
+    ]
+
+    # Kahn's algorithm: every step must become ready
+    waiting = [len(d) for d in deps]
+    dependents: Dict[int, List[int]] = {}
+    for i, d in enumerate(deps):
+        for j in d:
+            dependents.setdefault(j, []).append(i)
+    ready = [i for i, n in enumerate(waiting) if n == 0]
+    seen = 0
+    while ready:
+        j = ready.pop()
+        seen += 1
+        for i in dependents.get(j, []):
+            waiting[i] -= 1
+            if waiting[i] == 0:
+                ready.append(i)
+    if seen != len(plan):
+        raise ValueError("Plan dependencies contain a cycle")
+    return deps
+
+
+class ToolAdapter:
+    """
+    Calls one tool. ``request`` carries the subtask the step belongs to;
+    ``idempotency_key`` identifies the step, the same for every retry of it.
+    """
+
+    async def call(self, tool: str, request: Dict[str, Any],
+                   idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError("Must implement call()")
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MockAdapter(ToolAdapter):
+    async def call(self, tool: str, request: Dict[str, Any],
+                   idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        return {"result": "ok", "tool": tool}
+
+
+class HttpAdapter(ToolAdapter):
+    """JSON-over-HTTP tool with a pooled keep-alive client."""
+
+    def __init__(self, base_url: str, host_limit: asyncio.Semaphore, path: Optional[str] = None,
+                 method: str = "POST", headers: Optional[Dict[str, str]] = None,
+                 timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, max_connections: int = MAX_PER_HOST):
+        """
+        Args:
+            base_url: Scheme and host (and optional prefix) of the tool's API
+            host_limit: Semaphore shared by every adapter calling the same host
+            path: Request path; defaults to ``/tools/<tool slug>``
+            method: HTTP method
+            headers: Extra headers (e.g. authorization)
+            timeout: Seconds per attempt
+            retries: Extra attempts after a retryable failure (for POST and
+                PATCH without an idempotency key: connection errors only)
+            backoff: Seconds before the first retry, doubled on each one
+            max_connections: Pool size of this tool's client
+        """
+        self.base_url = base_url
+        self.path = path
+        self.method = method.upper()
+        self.retries = retries
+        self.backoff = backoff
+        self.host_limit = host_limit
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers or {},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                                keepalive_expiry=30.0),
+        )
+
+    async def call(self, tool: str, request: Dict[str, Any],
+                   idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        path = self.path or f"/tools/{tool_slug(tool)}"
+        body = {"tool": tool, "subtask": request}
+        headers = {IDEMPOTENCY_HEADER: idempotency_key} if idempotency_key else None
+        # Whether a request the tool may have received can be sent again
+        repeatable = idempotency_key is not None or self.method in IDEMPOTENT_METHODS
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                async with self.host_limit:
+                    resp = await self.client.request(self.method, path, json=body, headers=headers)
+                if resp.status_code in RETRY_STATUSES and attempt < self.retries and repeatable:
+                    raise httpx.HTTPStatusError(f"HTTP {resp.status_code}", request=resp.request, response=resp)
+                resp.raise_for_status()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                reason = f"HTTP {status}" if status else (str(e) or type(e).__name__)
+                # Connect errors and pool timeouts mean the request was never sent
+                unsent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                retryable = status in RETRY_STATUSES if status else True
+                if not retryable or not (repeatable or unsent) or attempt == self.retries:
+                    raise ToolError(f"{tool}: {reason}") from e
+                logger.warning("Retrying %s after %s (attempt %d)", tool, reason, attempt + 2)
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+            try:
+                response = resp.json() if resp.content else None
+            except ValueError:
+                # A successful call whose answer is not JSON (e.g. "OK")
+                response = resp.text
+            return {
+                "result": "ok",
+                "tool": tool,
+                "status_code": resp.status_code,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "response": response,
+            }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+# Adapter types usable in registry.yaml ("adapter: <name>")
+ADAPTERS = {"mock": MockAdapter, "http": HttpAdapter}
+
+
+class ToolEngine:
+    """Adapters per tool plus the event loop their pools live on."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, max_per_host: int = MAX_PER_HOST):
+        """
+        Args:
+            config: ``{tool name: adapter settings}``; the ``default`` entry is
+                used for tools without their own (mock if absent)
+            max_per_host: Concurrent requests allowed to one host
+        """
+        self.config = {
+            " ".join(str(name).split()).casefold(): _expand_env(settings or {})
+            for name, settings in (config or {}).items()
+        }
+        self.max_per_host = max_per_host
+        self._adapters: Dict[str, ToolAdapter] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="tool-engine", daemon=True)
+        self._thread.start()
+
+    def adapter(self, tool: str) -> ToolAdapter:
+        """The adapter for a tool, built on first use."""
+        name = " ".join(tool.split()).casefold()
+        with self._lock:
+            adapter = self._adapters.get(name)
+            if adapter is None:
+                settings = dict(self.config.get(name) or self.config.get("default") or {"adapter": "mock"})
+                kind = settings.pop("adapter", "mock")
+                if kind == "http":
+                    host = urlsplit(settings["base_url"]).netloc
+                    limit = self._host_limits.get(host)
+                    if limit is None:
+                        limit = self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+                    settings.setdefault("max_connections", self.max_per_host)
+                    adapter = HttpAdapter(host_limit=limit, **settings)
+                else:
+                    adapter = ADAPTERS[kind](**settings)
+                self._adapters[name] = adapter
+            return adapter
+
+    async def call(self, tool: str, request: Dict[str, Any],
+                   idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        return await self.adapter(tool).call(tool, request, idempotency_key)
+
+    async def execute_plan(self, plan: List[str], request: Dict[str, Any],
+                           depends_on: Optional[Dict[str, List[str]]] = None,
+                           max_parallel: int = MAX_PARALLEL_STEPS) -> Tuple[bool, List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run plan steps in order, stopping at the first failure; with
+        ``depends_on``, run them as a DAG instead (see ``_execute_dag``).
+        Each step gets its own idempotency key for this run of the plan.
+
+        Returns:
+            (all succeeded, executed steps as ``{"tool": ...}``, responses by tool)
+        """
+        run_id = uuid.uuid4().hex
+        if depends_on:
+            return await self._execute_dag(plan, request, plan_dependencies(plan, depends_on), max_parallel, run_id)
+        executed: List[Dict[str, Any]] = []
+        responses: Dict[str, Any] = {}
+        for i, tool in enumerate(plan):
+            executed.append({"tool": tool})
+            try:
+                responses[tool] = await self.call(tool, request, f"{run_id}-{i}")
+            except Exception as e:
+                logger.error("Tool step %s failed: %s", tool, e)
+                responses[tool] = {"result": "error", "tool": tool, "error": str(e)}
+                return False, executed, responses
+        return True, executed, responses
+
+    async def _execute_dag(self, plan: List[str], request: Dict[str, Any], deps: List[Set[int]],
+                           max_parallel: int, run_id: str) -> Tuple[bool, List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Start every step once its dependencies succeeded, at most
+        ``max_parallel`` at a time. Only the steps that depend (directly or
+        through other steps) on a failed one are skipped; every other step
+        still runs. ``executed`` lists the steps that ran, in plan order.
+        """
+        limit = asyncio.Semaphore(max(1, max_parallel))
+        outcomes: Dict[int, Dict[str, Any]] = {}
+        steps: Dict[int, asyncio.Future] = {}
+
+        async def step(i: int) -> bool:
+            for d in deps[i]:
+                if not await steps[d]:
+                    logger.info("Skipping tool step %s: %s did not succeed", plan[i], plan[d])
+                    return False
+            async with limit:
+                try:
+                    outcomes[i] = await self.call(plan[i], request, f"{run_id}-{i}")
+                    return True
+                except Exception as e:
+                    logger.error("Tool step %s failed: %s", plan[i], e)
+                    outcomes[i] = {"result": "error", "tool": plan[i], "error": str(e)}
+                    return False
+
+        # Every future exists before any step awaits another one
+        for i in range(len(plan)):
+            steps[i] = asyncio.ensure_future(step(i))
+        succeeded = await asyncio.gather(*(steps[i] for i in range(len(plan))))
+
+        ran = sorted(outcomes)
+        return all(succeeded), [{"tool": plan[i]} for i in ran], {plan[i]: outcomes[i] for i in ran}
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the engine loop from synchronous code and wait for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def close(self) -> None:
+        """Close every pool and stop the loop."""
+        async def close_all():
+            for adapter in list(self._adapters.values()):
+                await adapter.aclose()
+        self.run(close_all())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def load_tool_config(path: str = REGISTRY_PATH) -> Dict[str, Any]:
+    """
+    Adapter settings from the registry file. ``TOOL_ENGINE_DEFAULT_URL``
+    sends every unconfigured tool to that HTTP server (e.g. the mock ad platform).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    default_url = os.getenv("TOOL_ENGINE_DEFAULT_URL")
+    if default_url:
+        config["default"] = {"adapter": "http", "base_url": default_url}
+    return config
+
+
+_engine: Optional[ToolEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_tool_engine() -> ToolEngine:
+    """Process-wide engine built from ``registry.yaml``."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ToolEngine(load_tool_config())
+        return _engine
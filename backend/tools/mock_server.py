@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/tools/mock_server.py
+
+Need for this file (5th-grader explanation):
+"This is a toy ad company that lives on our own computer. It answers every
+tool call a little slowly, like a real one, and sometimes says 'busy, try
+again', so we can test our phone lines and time how fast they are without
+calling anyone real."
+
+Every ``POST /tools/<tool>`` answers ``{"id", "tool", "accepted": true}``
+after ``latency_ms``; a ``failure_rate`` share of calls answers 503 instead.
+Like a real ad platform it honours ``Idempotency-Key``: a repeated key gets
+the first successful answer again instead of a new id. ``POST /text/<tool>``
+accepts a call with a plain-text "OK". ``GET /stats`` reports requests,
+failures, replayed answers, distinct idempotency keys, the most calls ever
+in progress at once (``max_in_flight``: above 1 means calls overlapped) and
+distinct client connections (few connections for many requests means
+keep-alive works).
+
+Usage:
+    # Serve on a port (point TOOL_ENGINE_DEFAULT_URL at it)
+    python -m backend.tools.mock_server --port 8765 --latency-ms 20
+
+    # Benchmark the tool engine against an in-process server
+    python -m backend.tools.mock_server --bench 500 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from .engine import ToolEngine
+
+
+def create_app(latency_ms: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None) -> FastAPI:
+    """The mock ad platform as an ASGI app."""
+    app = FastAPI(title="Mock ad platform")
+    rng = random.Random(seed)
+    ids = itertools.count(1)
+    stats: Dict[str, Any] = {"requests": 0, "failures": 0, "replayed": 0, "keys": set(), "connections": set(),
+                             "in_flight": 0, "max_in_flight": 0}
+    # Idempotency key -> first successful answer
+    answers: Dict[str, Dict[str, Any]] = {}
+
+    async def receive(request: Request) -> Optional[JSONResponse]:
+        """Count the call and wait ``latency_ms``; a 503 response for the failing share."""
+        stats["requests"] += 1
+        if request.client is not None:
+            stats["connections"].add((request.client.host, request.client.port))
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await request.body()
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000)
+        finally:
+            stats["in_flight"] -= 1
+        if failure_rate and rng.random() < failure_rate:
+            stats["failures"] += 1
+            return JSONResponse({"error": "temporarily unavailable"}, status_code=503)
+        return None
+
+    @app.post("/tools/{tool}")
+    async def call_tool(tool: str, request: Request):
+        key = request.headers.get("idempotency-key")
+        if key:
+            stats["keys"].add(key)
+        failed = await receive(request)
+        if failed is not None:
+            return failed
+        if key in answers:
+            stats["replayed"] += 1
+            return answers[key]
+        answer = {"id": f"{tool}-{next(ids)}", "tool": tool, "accepted": True}
+        if key:
+            answers[key] = answer
+        return answer
+
+    @app.post("/text/{tool}")
+    async def call_text_tool(tool: str, request: Request):
+        return await receive(request) or PlainTextResponse("OK")
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"requests": stats["requests"], "failures": stats["failures"], "replayed": stats["replayed"],
+                "idempotency_keys": len(stats["keys"]), "max_in_flight": stats["max_in_flight"],
+                "connections": len(stats["connections"])}
+
+    return app
+
+
+class MockAdPlatform:
+    """The mock server running on a background thread (port 0 picks a free port)."""
+
+    def __init__(self, latency_ms: float = 0.0, failure_rate: float = 0.0, port: int = 0,
+                 seed: Optional[int] = None):
+        config = uvicorn.Config(create_app(latency_ms, failure_rate, seed), host="127.0.0.1", port=port,
+                                log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="mock-ad-platform", daemon=True)
+
+    def __enter__(self) -> "MockAdPlatform":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Mock ad platform did not start")
+            time.sleep(0.01)
+        return self
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def benchmark(subtasks: int, latency_ms: float, failure_rate: float, concurrency: int) -> None:
+    plan = ["Creative CDN", "DSP API", "Ad Server"]
+    with MockAdPlatform(latency_ms, failure_rate, seed=7) as server:
+        engine = ToolEngine({"default": {"adapter": "http", "base_url": server.url}}, max_per_host=concurrency)
+
+        async def run_all():
+            limit = asyncio.Semaphore(concurrency)
+
+            async def one(i):
+                async with limit:
+                    return await engine.execute_plan(plan, {"name": f"subtask {i}"})
+            return await asyncio.gather(*(one(i) for i in range(subtasks)))
+
+        start = time.perf_counter()
+        results = engine.run(run_all())
+        elapsed = time.perf_counter() - start
+        stats = httpx.get(f"{server.url}/stats").json()
+        engine.close()
+
+    ok = sum(1 for success, _, _ in results if success)
+    calls = subtasks * len(plan)
+    print(f"{subtasks} subtasks x {len(plan)} steps in {elapsed:.2f}s "
+          f"({calls / elapsed:.0f} calls/s), {ok}/{subtasks} succeeded")
+    print(f"server: {stats['requests']} requests ({stats['failures']} failed, retried) "
+          f"over {stats['connections']} connections")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--bench", type=int, default=0, help="Benchmark this many subtasks instead of serving")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.bench, args.latency_ms, args.failure_rate, args.concurrency)
+    else:
+        uvicorn.run(create_app(args.latency_ms, args.failure_rate), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the tool engine against the local mock ad platform.
+
+Checks the APICallerAgent response format, that retries get through a
+flaky server with one idempotency key per step, that many calls share a few
+kept-alive connections, that POSTs without a key are not repeated and that
+plain-text answers are kept, that a dead host fails only its own subtask,
+and that dependency-annotated plans run independent steps side by side.
+"""
+
+import asyncio
+
+import httpx
+
+from backend.tools.engine import HttpAdapter, ToolEngine, ToolError
+from backend.tools.mock_server import MockAdPlatform
+
+PLAN = ["Creative CDN", "DSP API"]
+
+def test_engine_against_mock_platform():
+    with MockAdPlatform(latency_ms=5, failure_rate=0.2, seed=1) as server:
+        engine = ToolEngine({"default": {"adapter": "http", "base_url": server.url, "backoff": 0.01,
+                                         "retries": 5}}, max_per_host=4)
+        try:
+            results = [engine.run(engine.execute_plan(PLAN, {"name": f"subtask {i}"})) for i in range(20)]
+            ok, executed, responses = results[0]
+            assert ok and executed == [{"tool": "Creative CDN"}, {"tool": "DSP API"}]
+            assert responses["DSP API"]["result"] == "ok" and responses["DSP API"]["response"]["accepted"]
+            assert all(r[0] for r in results)
+
+            stats = httpx.get(f"{server.url}/stats").json()
+            assert stats["failures"] > 0
+            assert stats["requests"] > 40 and stats["idempotency_keys"] == 40  # retries reuse the step's key
+            assert stats["connections"] <= 2 * 4
+            print(stats)
+        finally:
+            engine.close()
+
+def test_unkeyed_posts_and_text_answers():
+    async def call(server, path, key=None):
+        adapter = HttpAdapter(server.url, asyncio.Semaphore(4), path=path, retries=3, backoff=0.01)
+        try:
+            return await adapter.call("DSP API", {}, key)
+        finally:
+            await adapter.aclose()
+
+    with MockAdPlatform(failure_rate=1.0) as server:
+        try:
+            asyncio.run(call(server, "/tools/dsp-api"))
+            assert False, "503 accepted"
+        except ToolError:
+            pass
+        # The server may have acted on the POST: without a key it is not sent again
+        assert httpx.get(f"{server.url}/stats").json()["requests"] == 1
+
+    with MockAdPlatform() as server:
+        result = asyncio.run(call(server, "/text/dsp-api", "step-1"))
+        assert result["result"] == "ok" and result["response"] == "OK"
+        first = asyncio.run(call(server, "/tools/dsp-api", "step-2"))
+        assert asyncio.run(call(server, "/tools/dsp-api", "step-2"))["response"] == first["response"]
+        assert httpx.get(f"{server.url}/stats").json()["replayed"] == 1
+
+def test_unreachable_tool_fails_alone():
+    engine = ToolEngine({"DSP API": {"adapter": "http", "base_url": "http://127.0.0.1:9", "retries": 1,
+                                     "backoff": 0.01, "timeout": 1}})
+    try:
+        ok, executed, responses = engine.run(engine.execute_plan(["Creative CDN", "DSP API", "Ad Server"], {}))
+        assert not ok
+        assert executed == [{"tool": "Creative CDN"}, {"tool": "DSP API"}]
+        assert responses["Creative CDN"] == {"result": "ok", "tool": "Creative CDN"}
+        assert responses["DSP API"]["result"] == "error"
+    finally:
+        engine.close()
+
+def test_dependency_annotated_plan_runs_as_dag():
+    # Chains A -> C -> D and B -> D: 3 steps deep instead of 4
+    plan = ["A", "B", "C", "D"]
+    depends_on = {"C": ["A"], "D": ["B", "C"]}
+    with MockAdPlatform(latency_ms=100) as server:
+        engine = ToolEngine({"default": {"adapter": "http", "base_url": server.url},
+                             "X": {"adapter": "http", "base_url": "http://127.0.0.1:9", "retries": 1,
+                                   "backoff": 0.01, "timeout": 1}})
+        try:
+            engine.run(engine.execute_plan(plan, {}))
+            assert httpx.get(f"{server.url}/stats").json()["max_in_flight"] == 1  # one by one
+
+            ok, executed, responses = engine.run(engine.execute_plan(plan, {}, depends_on))
+            assert ok and executed == [{"tool": t} for t in plan]
+            # A and B (and then B and C) overlap; D waits for both chains
+            assert httpx.get(f"{server.url}/stats").json()["max_in_flight"] == 2
+
+            # X fails: D is skipped, the A -> C branch still runs
+            ok, executed, responses = engine.run(
+                engine.execute_plan(["A", "X", "C", "D"], {}, {"C": ["A"], "D": ["X", "C"]}))
+            assert not ok
+            assert executed == [{"tool": "A"}, {"tool": "X"}, {"tool": "C"}]
+            assert responses["X"]["result"] == "error" and "D" not in responses
+
+            try:
+                engine.run(engine.execute_plan(plan, {}, {"A": ["D"], "D": ["A"]}))
+                assert False, "cycle not detected"
+            except ValueError:
+                pass
+        finally:
+            engine.close()
+
+if __name__ == "__main__":
+    test_engine_against_mock_platform()
+    test_unkeyed_posts_and_text_answers()
+    test_unreachable_tool_fails_alone()
+    test_dependency_annotated_plan_runs_as_dag()
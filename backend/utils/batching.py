@@ -0,0 +1,73 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/utils/batching.py
+
+Need for this file (5th-grader explanation):
+"Sending the robot one tiny question at a time is slow, because every
+letter needs its own envelope and stamp. So we put several questions in one
+envelope, but never so many that the answer no longer fits on the page."
+
+TokenBudget splits work items into batches whose estimated prompt plus
+answer size stays under a token budget. The answer size per item starts as
+a guess and is corrected from the token counts the API reports, so batch
+sizes adapt to what the model actually writes.
+"""
+
+import json
+import threading
+from typing import Any, Callable, List
+
+# Rough tokens-per-character ratio of English text and JSON for GPT-4 class models
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate token count of a string (or of its JSON form)."""
+    text = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class TokenBudget:
+    """Token-budgeted batch sizing with a learned answer size per item."""
+
+    def __init__(self, budget: int, output_per_item: int, max_items: int = 50, smoothing: float = 0.3):
+        """
+        Args:
+            budget: Estimated prompt + answer tokens allowed per batch
+            output_per_item: Initial guess of answer tokens per item
+            max_items: Upper bound on items per batch
+            smoothing: Weight of each new observation in the answer-size estimate
+        """
+        self.budget = budget
+        self.output_per_item = float(output_per_item)
+        self.max_items = max(1, max_items)
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def chunks(self, items: List[Any], cost: Callable[[Any], int] = estimate_tokens) -> List[List[int]]:
+        """
+        Indexes of ``items`` grouped into batches, in order. Every batch has
+        at least one item, even if that item alone exceeds the budget.
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for i, item in enumerate(items):
+            need = cost(item) + int(self.output_per_item)
+            if current and (used + need > self.budget or len(current) >= self.max_items):
+                batches.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += need
+        if current:
+            batches.append(current)
+        return batches
+
+    def observe(self, items: int, completion_tokens: int) -> None:
+        """Update the answer-size estimate from one batch's reported completion tokens."""
+        if items <= 0 or not completion_tokens:
+            return
+        with self._lock:
+            self.output_per_item += self.smoothing * (completion_tokens / items - self.output_per_item)
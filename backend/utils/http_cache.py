@@ -0,0 +1,339 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/utils/http_cache.py
+
+Need for this file (5th-grader explanation):
+"Before mailing a big letter we fold it up small (compression), and we
+write a fingerprint on the envelope (ETag). Next time the browser asks for
+the same letter, it shows us the fingerprint it already has, and if nothing
+changed we just say 'you already have it' instead of mailing it again."
+
+Two pieces:
+
+- ``CompressionMiddleware`` (ASGI) for API responses: negotiates brotli or
+  gzip from Accept-Encoding, adds a content-hashed ETag to GET responses
+  (answering a matching If-None-Match with 304) and applies a per-route
+  Cache-Control policy to successful (2xx and 304) responses;
+- ``PrecompressedStaticFiles``: StaticFiles that builds gzip/brotli variants
+  of the text assets once at start-up, serves them with content-hashed
+  ETags, and rebuilds an asset only when its file changes.
+
+Brotli is used when the ``brotli`` package is installed; otherwise only gzip
+is offered.
+"""
+
+import gzip
+import hashlib
+import os
+from mimetypes import guess_type
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Encodings in server preference order
+ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml",
+    "image/svg+xml", "application/x-ndjson",
+)
+
+# Never buffered or compressed: each event must reach the browser as soon as it is sent
+STREAMING_TYPES = ("text/event-stream",)
+
+DEFAULT_MIN_SIZE = 1024
+
+# Bodies at least this large are compressed on a worker thread, not the event loop
+THREADED_MIN_SIZE = 64 * 1024
+
+# Dynamic responses favour speed; static variants are built once, so use the best ratio
+DYNAMIC_LEVELS = {"br": 4, "gzip": 6}
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+
+# Static Cache-Control by file suffix. File names are not content-hashed, so
+# pages revalidate every time (cheap with the ETag) while other assets are
+# cached for a day.
+STATIC_CACHE_CONTROL = {".html": "no-cache"}
+DEFAULT_STATIC_CACHE_CONTROL = "public, max-age=86400"
+
+# Largest file kept (with its variants) in memory
+MAX_STATIC_FILE_SIZE = 4 * 1024 * 1024
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Sequence[str] = ENCODINGS) -> Optional[str]:
+    """
+    Pick the content coding to send for an Accept-Encoding header.
+
+    Returns:
+        The available coding with the highest q-value (ties go to the order of
+        ``available``), or None for identity
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=DYNAMIC_LEVELS["br"] if level is None else level)
+    return gzip.compress(body, compresslevel=DYNAMIC_LEVELS["gzip"] if level is None else level, mtime=0)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (which may list several tags) against an ETag."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the (uncompressed) content."""
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    if content_type.startswith(STREAMING_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _add_vary(headers: MutableHeaders, value: str) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = value
+    elif value.lower() not in vary.lower():
+        headers["Vary"] = f"{vary}, {value}"
+
+
+class CompressionMiddleware:
+    """
+    Compress, ETag and set Cache-Control on HTTP responses.
+
+    Only complete bodies are touched; streamed responses (more than one body
+    message, e.g. SSE) and responses that already carry a Content-Encoding
+    pass through unchanged apart from the Cache-Control policy.
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int = DEFAULT_MIN_SIZE,
+                 cache_policies: Iterable[Tuple[str, str]] = (), etags: bool = True,
+                 threaded_min_size: int = THREADED_MIN_SIZE):
+        """
+        Args:
+            app: The wrapped ASGI application
+            min_size: Smaller bodies are sent uncompressed
+            cache_policies: (path prefix, Cache-Control) pairs; the first matching prefix
+                wins. Errors are not given a policy, so they are never cached.
+            etags: Add content-hashed ETags to GET responses that have none
+            threaded_min_size: Larger bodies are compressed in the threadpool
+        """
+        self.app = app
+        self.min_size = min_size
+        self.threaded_min_size = threaded_min_size
+        self.cache_policies: List[Tuple[str, str]] = list(cache_policies)
+        self.etags = etags
+
+    def cache_control_for(self, path: str) -> Optional[str]:
+        for prefix, value in self.cache_policies:
+            if path.startswith(prefix):
+                return value
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"))
+        if_none_match = request_headers.get("if-none-match")
+        cacheable = scope["method"] in ("GET", "HEAD")
+        cache_control = self.cache_control_for(scope["path"])
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            headers = MutableHeaders(scope=start)
+            status = start["status"]
+            if (cache_control and "cache-control" not in headers
+                    and (200 <= status < 300 or status == 304)):
+                headers["Cache-Control"] = cache_control
+
+            if message.get("more_body", False):
+                # Streamed body: send as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+
+            etag = headers.get("etag")
+            if etag is None and self.etags and cacheable and status == 200:
+                etag = content_etag(body)
+                headers["ETag"] = etag
+            if etag is not None and cacheable and status == 200 and etag_matches(if_none_match, etag.removeprefix("W/")):
+                if is_compressible(headers.get("content-type")):
+                    _add_vary(headers, "Accept-Encoding")
+                del headers["content-length"]
+                del headers["content-type"]
+                start["status"] = 304
+                await send(start)
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            if (encoding is not None and len(body) >= self.min_size
+                    and "content-encoding" not in headers and is_compressible(headers.get("content-type"))):
+                if len(body) >= self.threaded_min_size:
+                    # Brotli on a large body takes long enough to stall every other request
+                    body = await run_in_threadpool(compress, body, encoding)
+                else:
+                    body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                _add_vary(headers, "Accept-Encoding")
+                if etag is not None and not etag.startswith("W/"):
+                    # Same content, different bytes: the tag becomes weak
+                    headers["ETag"] = f"W/{etag}"
+            elif is_compressible(headers.get("content-type")) and len(body) >= self.min_size:
+                _add_vary(headers, "Accept-Encoding")
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class _StaticAsset:
+    """A static file with its precompressed variants."""
+
+    __slots__ = ("path", "mtime", "size", "media_type", "etag", "bodies")
+
+    def __init__(self, path: str, stat: os.stat_result, media_type: str, body: bytes):
+        self.path = path
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.media_type = media_type
+        self.etag = content_etag(body)
+        self.bodies: Dict[Optional[str], bytes] = {None: body}
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding, STATIC_LEVELS[encoding])
+            if len(compressed) < len(body):
+                self.bodies[encoding] = compressed
+
+    def is_current(self, stat: os.stat_result) -> bool:
+        return stat.st_mtime_ns == self.mtime and stat.st_size == self.size
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles serving gzip/brotli variants built at start-up.
+
+    Compressible files up to MAX_STATIC_FILE_SIZE are read once, compressed
+    at the highest level and served from memory with a content-hashed ETag.
+    Every request still stats the file, so an edited file is picked up (and
+    recompressed) on its next request. Anything else is served by StaticFiles.
+    """
+
+    def __init__(self, *, directory: str, html: bool = False, min_size: int = DEFAULT_MIN_SIZE, **kwargs):
+        super().__init__(directory=directory, html=html, **kwargs)
+        self.min_size = min_size
+        self._assets: Dict[str, _StaticAsset] = {}
+        self._build()
+
+    def _build(self) -> None:
+        root = os.path.realpath(self.directory)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                self._load(os.path.normpath(os.path.relpath(full_path, root)), full_path)
+
+    def _load(self, key: str, full_path: str) -> Optional[_StaticAsset]:
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            self._assets.pop(key, None)
+            return None
+        media_type = guess_type(full_path)[0] or "text/plain"
+        if stat.st_size < self.min_size or stat.st_size > MAX_STATIC_FILE_SIZE or not is_compressible(media_type):
+            self._assets.pop(key, None)
+            return None
+        with open(full_path, "rb") as f:
+            body = f.read()
+        asset = self._assets[key] = _StaticAsset(full_path, stat, media_type, body)
+        return asset
+
+    def _asset_for(self, path: str, scope: Scope) -> Optional[_StaticAsset]:
+        key = path
+        if self.html and (path == "." or scope["path"].endswith("/")):
+            key = os.path.normpath(os.path.join(path, "index.html"))
+        asset = self._assets.get(key)
+        if asset is None:
+            return None
+        try:
+            stat = os.stat(asset.path)
+        except OSError:
+            self._assets.pop(key, None)
+            return None
+        if not asset.is_current(stat):
+            asset = self._load(key, asset.path)
+        return asset
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self._asset_for(path, scope) if scope["method"] in ("GET", "HEAD") else None
+        if asset is None:
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        suffix = os.path.splitext(asset.path)[1].lower()
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": STATIC_CACHE_CONTROL.get(suffix, DEFAULT_STATIC_CACHE_CONTROL),
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request_headers.get("if-none-match"), asset.etag):
+            return Response(status_code=304, headers=headers)
+
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"), [e for e in asset.bodies if e])
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(asset.bodies[encoding], media_type=asset.media_type, headers=headers)
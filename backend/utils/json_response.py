@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/utils/json_response.py
+
+Need for this file (5th-grader explanation):
+"Turning a giant campaign package into text for the browser used to be done
+by hand, one little piece at a time. Now a very fast machine (orjson) does
+it in one go, and we keep the old way around so we can race them."
+
+FastAPI runs every returned value through ``jsonable_encoder`` (which copies
+the whole structure) and then the standard ``json`` module. Endpoints that
+return large documents (director packages, workflow state) return
+``json_response(...)`` instead, which writes the original objects straight
+to bytes with orjson.
+
+Set ``FAST_JSON=0`` (or call ``set_fast_json(False)``) to go back to the
+default FastAPI encoding; the ``X-JSON-Encoder`` header says which one was
+used. One behavioural difference: orjson writes NaN and +/-Infinity as
+``null``, where the default encoder refuses them (a 500 for the request).
+Compare both on a synthetic package with:
+
+    python -m backend.utils.json_response --size-mb 5
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+_fast_json = os.getenv("FAST_JSON", "1") != "0"
+
+
+def set_fast_json(enabled: bool) -> None:
+    """Switch every ``json_response`` between orjson and the default encoder."""
+    global _fast_json
+    _fast_json = enabled
+
+
+def fast_json_enabled() -> bool:
+    return _fast_json
+
+
+def _default(obj: Any) -> Any:
+    # Types orjson does not know (pydantic models, sets, Decimal, ...)
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize with orjson, falling back to the default encoder for values it
+    rejects (e.g. integers wider than 64 bits). Non-finite floats become null.
+    """
+    try:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    except TypeError:
+        return default_dumps(content)
+
+
+def default_dumps(content: Any) -> bytes:
+    """What FastAPI's own JSONResponse would produce."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, without a jsonable_encoder pass."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, status_code: int = 200,
+                  headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """
+    JSON response for a large document, using the encoder selected by FAST_JSON.
+
+    Return it from the endpoint (rather than the plain value) so FastAPI does
+    not encode the content itself first.
+    """
+    headers = dict(headers or {})
+    if _fast_json:
+        headers["X-JSON-Encoder"] = "orjson"
+        return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+    headers["X-JSON-Encoder"] = "default"
+    return JSONResponse(content=jsonable_encoder(content), status_code=status_code, headers=headers)
+
+
+# ---------- benchmark ----------
+
+def sample_package(size_mb: float = 5.0) -> Dict[str, Any]:
+    """
+    A package shaped like the director's final campaign package (the value
+    stored for /api/campaigns/{id}/results) of roughly ``size_mb`` megabytes.
+    """
+    tools = ["Google Ads", "Meta Ads Manager"]
+
+    def item(name: str, role: str) -> Dict[str, Any]:
+        return {"name": name, "role": role, "tools": tools, "deliverable": f"{name} brief",
+                "time_estimate": "2h", "subitems": []}
+
+    root = item("Marketing Campaign Execution", "CMO")
+    levels: Dict[str, Any] = {"L0": [root], "L1": [], "L2": [], "L3": [], "L4": []}
+    package: Dict[str, Any] = {
+        "campaign_id": "benchmark",
+        "spec": {"campaign_id": "benchmark", "objectives": "Grow trial sign-ups", "budget": 250000.0,
+                 "KPIs": ["ctr", "cpa"], "notes": "Synthetic package"},
+        "strategy": {"segments": ["smb", "enterprise"], "themes": ["speed", "trust"],
+                     "channel_mix": {"search": 0.5, "social": 0.3, "display": 0.2}},
+        "blueprint": {"levels": levels},
+        "executions": [],
+        "real_executions": [],
+        "report": {"report": {"summary": "Synthetic run", "KPIs": {"total_tasks": 0, "successful": 0, "failed": 0},
+                              "tools_used": tools}},
+    }
+    i = 0
+    while len(orjson.dumps(package)) < size_mb * 1_000_000:
+        for _ in range(50):
+            # One L1 process -> L2 activity -> L3 task chain with eight L4 subtasks per task
+            process, activity, task = (item(f"{lvl} item {i}", "Marketing Manager") for lvl in ("L1", "L2", "L3"))
+            subtasks = [item(f"Subtask {i}.{j}", "Media Planner") for j in range(8)]
+            root["subitems"].append(process)
+            process["subitems"].append(activity)
+            activity["subitems"].append(task)
+            task["subitems"] = subtasks
+            for lvl, node in (("L1", process), ("L2", activity), ("L3", task)):
+                levels[lvl].append(node)
+            levels["L4"].extend(subtasks)
+
+            fields = {k: task[k] for k in ("name", "role", "tools", "deliverable", "time_estimate")}
+            micro = [{k: s[k] for k in fields} for s in subtasks]
+            package["executions"].append({**fields, "subtasks": micro})
+            for subtask in micro[:2]:
+                steps = [f"{tool}: step {k}" for k, tool in enumerate(tools * 2)]
+                package["real_executions"].append({
+                    "subtask": subtask,
+                    "plan": steps,
+                    "api": {"status": "success", "details": {
+                        "executed": {tool: {"tool": tool} for tool in tools},
+                        "responses": {tool: {"result": "ok", "tool": tool, "id": f"{tool}-{i}"} for tool in tools},
+                    }},
+                })
+            i += 1
+    kpis = package["report"]["report"]["KPIs"]
+    kpis["total_tasks"] = kpis["successful"] = len(package["real_executions"])
+    return package
+
+
+def _measure(render, content: Any, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render(content)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    render(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_mb": peak / 1e6, "bytes": len(body)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare orjson and default JSON responses")
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    package = sample_package(args.size_mb)
+    results = {
+        "default": _measure(lambda c: JSONResponse(content=jsonable_encoder(c)).body, package, args.repeat),
+        "orjson": _measure(lambda c: FastJSONResponse(content=c).body, package, args.repeat),
+    }
+    for name, r in results.items():
+        print(f"{name:8s} {r['seconds'] * 1000:8.1f} ms  peak {r['peak_mb']:7.1f} MB  {r['bytes'] / 1e6:.1f} MB body")
+    print(f"speed-up x{results['default']['seconds'] / results['orjson']['seconds']:.1f}, "
+          f"memory x{results['default']['peak_mb'] / results['orjson']['peak_mb']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,33 +32,45 @@
 #   - Define and manage default model names and parameters
 #   - Consistent error handling (catch OpenAIError)
 #   - Simplify API usage for all downstream agents
+#   - Record request counts, latency and token usage per agent/model (/metrics)
 
 from dotenv import load_dotenv
 load_dotenv()  # load OPENAI_API_KEY into environment
 
 import os
+import time
 from openai import OpenAI, OpenAIError
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from backend.observability.metrics import record_llm_call
+
 # Instantiate a single OpenAI client with the API key
 _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-def chat_completion(messages, functions=None, model="gpt-4o", temperature=0.2):
+def chat_completion(messages, functions=None, model="gpt-4o", temperature=0.2, agent="unknown"):
     """
     Wrapper for OpenAI Chat Completion with retry logic.
     :param messages: list of dicts [{role, content}, ...]
     :param functions: optional list of function schemas for function-calling
     :param model: LLM model name
     :param temperature: sampling temperature
+    :param agent: agent key the call is attributed to in metrics
     :return: OpenAI API response
     """
-    return _client.chat.completions.create(
-        model=model,
-        messages=messages,
-        functions=functions,
-        temperature=temperature,
-    )
+    start = time.perf_counter()
+    try:
+        resp = _client.chat.completions.create(
+            model=model,
+            messages=messages,
+            functions=functions,
+            temperature=temperature,
+        )
+    except Exception:
+        record_llm_call(agent, model, "error", time.perf_counter() - start)
+        raise
+    record_llm_call(agent, model, "success", time.perf_counter() - start, getattr(resp, "usage", None))
+    return resp
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
 def create_embedding(text, model="text-embedding-3-small"):
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+File: backend/utils/snapshot_cache.py
+
+Need for this file (5th-grader explanation):
+"When ten people walk up to the notice board at once, we don't write ten
+copies of the notice. One person writes it, everyone reads the same sheet,
+and we throw the sheet away as soon as something changes (or after a couple
+of seconds, whichever comes first)."
+
+SnapshotCache holds one expensive-to-build value (e.g. the serialized
+dashboard snapshot) with:
+
+- a short TTL;
+- ``invalidate()`` for write paths, which makes the next read rebuild;
+- single flight: concurrent readers of a stale value wait for one build
+  instead of each starting their own.
+
+Hits and misses are recorded in the ``agency_cache_requests_total`` metric.
+"""
+
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from backend.observability.metrics import record_cache_lookup
+
+T = TypeVar("T")
+
+
+class SnapshotCache(Generic[T]):
+    """A single value rebuilt at most once per TTL or write, shared by all readers."""
+
+    def __init__(self, name: str, build: Callable[[], T], ttl: float = 2.0):
+        """
+        Args:
+            name: Cache label for metrics
+            build: Computes a fresh value
+            ttl: Seconds a value is served after it was built
+        """
+        self.name = name
+        self.build = build
+        self.ttl = ttl
+
+        self._build_lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._built_at = 0.0
+        self._generation = 0
+        self._value_generation = -1
+
+    def invalidate(self) -> None:
+        """Drop the cached value; a build already running will not be served either."""
+        self._generation += 1
+
+    def _fresh(self) -> bool:
+        return (self._value_generation == self._generation
+                and time.monotonic() - self._built_at < self.ttl)
+
+    def get(self) -> T:
+        if self._fresh():
+            record_cache_lookup(self.name, True)
+            return self._value
+        with self._build_lock:
+            # Someone else may have rebuilt it while we waited for the lock
+            if self._fresh():
+                record_cache_lookup(self.name, True)
+                return self._value
+            record_cache_lookup(self.name, False)
+            generation = self._generation
+            value = self.build()
+            self._value, self._built_at, self._value_generation = value, time.monotonic(), generation
+            return value
+
+    @property
+    def age(self) -> float:
+        """Seconds since the current value was built."""
+        return time.monotonic() - self._built_at
@@ -0,0 +1,183 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the director's workflow options, with stubbed agents in
+place of the LLM-backed ones.
+
+Checks that subtasks_from_blueprint, set per campaign through the payload's
+"options", takes the blueprint's L4 subitems without calling
+MicroDecompAgent, that the default still calls it for every L3 task, that
+execution_batch plans a subtask alone when its batch plan failed, that
+usable depends_on annotations of a plan reach APICallerAgent (also when the
+plan comes from the plan memo), and that unknown options are rejected
+before a campaign starts.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # agent modules create the client on import; no call is made
+
+import backend.agents.openai.director_agent as director
+import backend.agents.openai.execution_agent as execution
+from backend.agents.openai.director_agent import DirectorAgent
+from backend.agents.openai.execution_agent import ExecutionAgent
+from backend.campaigns.repository import CampaignRepository
+from backend.planning.memo import PlanMemo
+
+FIELDS = {"role": "Planner", "tools": ["Docs"], "deliverable": "Doc", "time_estimate": "1h"}
+
+def _item(name, subitems=()):
+    return {"name": name, **FIELDS, "subitems": list(subitems)}
+
+def _blueprint():
+    tasks = [_item(f"T{t}", [_item(f"T{t}.S{s}") for s in (1, 2)]) for t in (1, 2)]
+    root = _item("Campaign", [_item("P1", [_item("A1", tasks)])])
+    levels, row = {}, [root]
+    for level in ("L0", "L1", "L2", "L3", "L4"):
+        levels[level] = row
+        row = [sub for item in row for sub in item["subitems"]]
+    return {"levels": levels}
+
+class _Agents:
+    """Stand-ins for every agent the director calls; records MicroDecompAgent and ExecutionAgent calls."""
+
+    def __init__(self):
+        self.micro_calls = []
+        self.execute_calls = []
+        self.depends_on = {}
+        self.plan_dependencies = {}
+        self.real = {}
+
+    def __call__(self, name):
+        if name in self.real:
+            return self.real[name]
+        return _Stub(getattr(self, name), getattr(self, f"{name}_batch", None))
+
+    def intake(self, payload):
+        return {"campaign_id": payload["campaign_id"], "objectives": payload["goals"],
+                "budget": payload["budget"], "KPIs": payload["KPIs"], "notes": ""}
+
+    def strategy(self, payload):
+        return {"strategy": {"segments": ["all"], "themes": ["launch"], "channel_mix": {"search": 1.0}}}
+
+    def decomp(self, payload):
+        return _blueprint()
+
+    def micro_decomp(self, payload):
+        self.micro_calls.append(payload["name"])
+        return {"subtasks": [{"name": f"{payload['name']} from LLM", **FIELDS}]}
+
+    def execute(self, payload):
+        self.execute_calls.append(payload["name"])
+        details = {"steps_executed": [f"do {payload['name']}", "check"]}
+        if payload["name"] in self.plan_dependencies:
+            details["depends_on"] = self.plan_dependencies[payload["name"]]
+        return {"status": "success", "details": details}
+
+    def execute_batch(self, subtasks):
+        # What ExecutionAgent.run_batch returns for a subtask it could not plan
+        return {sid: {"status": "error", "details": {"steps_executed": [], "error": "timeout"}} if sid == "0.1"
+                else {"status": "success", "details": {"steps_executed": [f"batch {p['name']}"]}}
+                for sid, p in subtasks.items()}
+
+    def apicaller(self, payload):
+        self.depends_on[payload["name"]] = payload.get("depends_on")
+        return {"status": "success", "details": {"executed": [{"tool": "Docs", "status": "success"}],
+                                                 "responses": {}}}
+
+    def report(self, payload):
+        return {"report": {"summary": "done", "KPIs": {"total_tasks": 1, "successful": 1, "failed": 0},
+                           "tools_used": ["Docs"]}}
+
+class _Stub:
+    def __init__(self, run, run_batch=None):
+        self.run = run
+        self.run_batch = run_batch
+
+@contextmanager
+def _director(agents):
+    real = director.get_agent, director.get_campaign_repository
+    with tempfile.TemporaryDirectory() as storage_dir:
+        director.get_agent = agents
+        director.get_campaign_repository = lambda: CampaignRepository(storage_dir)
+        try:
+            yield DirectorAgent()
+        finally:
+            director.get_agent, director.get_campaign_repository = real
+
+def _payload(**options):
+    return {"client_brief": "Brief", "goals": "Launch", "budget": 1000, "KPIs": ["ctr"], "options": options}
+
+def test_subtasks_from_blueprint_skips_micro_decomp():
+    agents = _Agents()
+    with _director(agents) as agent:
+        package = agent.run(_payload(subtasks_from_blueprint=True))["campaign_package"]
+        assert agents.micro_calls == []
+        assert [s["name"] for s in package["executions"][1]["subtasks"]] == ["T2.S1", "T2.S2"]
+        assert len(package["real_executions"]) == 4
+
+        # Without the option every L3 task goes to MicroDecompAgent
+        package = agent.run(_payload())["campaign_package"]
+        assert agents.micro_calls == ["T1", "T2"]
+        assert package["executions"][0]["subtasks"][0]["name"] == "T1 from LLM"
+
+def test_failed_batch_plan_is_planned_alone():
+    agents = _Agents()
+    with _director(agents) as agent:
+        package = agent.run(_payload(subtasks_from_blueprint=True, execution_batch=True))["campaign_package"]
+    assert agents.execute_calls == ["T1.S2"]
+    assert [r["plan"] for r in package["real_executions"][:2]] == [["batch T1.S1"], ["do T1.S2", "check"]]
+
+def test_depends_on_reaches_apicaller():
+    agents = _Agents()
+    agents.plan_dependencies = {"T1.S1": {"check": ["do T1.S1"]}, "T1.S2": {"check": ["publish"]}}
+    with _director(agents) as agent:
+        agent.run(_payload(subtasks_from_blueprint=True))
+    assert agents.depends_on["T1.S1"] == {"check": ["do T1.S1"]}
+    # Names a step that is not in the plan: the plan runs step by step
+    assert agents.depends_on["T1.S2"] is None and agents.depends_on["T2.S1"] is None
+
+def test_memoized_plan_keeps_depends_on():
+    calls = []
+
+    def llm(messages, **kwargs):
+        calls.append(messages)
+        plan = {"status": "success", "details": {"steps_executed": ["Docs", "Sheets", "Review"],
+                                                 "depends_on": {"Review": ["Docs", "Sheets"]}}}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(plan)))])
+
+    agents = _Agents()
+    real_llm = execution.chat_completion
+    execution.chat_completion = llm
+    try:
+        with tempfile.TemporaryDirectory() as memo_dir, _director(agents) as agent:
+            planner = agents.real["execute"] = ExecutionAgent()
+            planner.memo = PlanMemo(memo_dir, min_observations=1, check_every=0)
+            agent.run(_payload(subtasks_from_blueprint=True))
+    finally:
+        execution.chat_completion = real_llm
+    # Every subtask shares (role, tools): one LLM plan, three memo hits
+    assert len(calls) == 1 and planner.memo.stats()["hits"] == 3
+    assert all(d == {"Review": ["Docs", "Sheets"]} for d in agents.depends_on.values()), agents.depends_on
+
+def test_unknown_option_rejected():
+    agents = _Agents()
+    with _director(agents) as agent:
+        try:
+            agent.run(_payload(subtasks_from_bluprint=True))
+            assert False, "unknown option accepted"
+        except ValueError:
+            pass
+        assert len(agent.campaigns) == 0
+
+if __name__ == "__main__":
+    test_subtasks_from_blueprint_skips_micro_decomp()
+    test_failed_batch_plan_is_planned_alone()
+    test_depends_on_reaches_apicaller()
+    test_memoized_plan_keeps_depends_on()
+    test_unknown_option_rejected()
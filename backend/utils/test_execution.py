@@ -17,5 +17,21 @@ def test_execution():
     print("ExecutionAgent output:")
     print(json.dumps(result, indent=2))
 
+def test_execution_batch():
+    agent = ExecutionAgent()
+    subtasks = {
+        "0.0": {"name": "Upload banner to DSP", "role": "AdOps Manager",
+                "tools": ["DSP API", "Creative CDN"], "deliverable": "Banner asset live in DSP",
+                "time_estimate": "15 minutes"},
+        "0.1": {"name": "Set daily budget cap", "role": "Media Buyer",
+                "tools": ["Google Ads API"], "deliverable": "Budget cap applied",
+                "time_estimate": "5 minutes"},
+    }
+    results = agent.run_batch(subtasks)
+    assert list(results) == list(subtasks)
+    print("ExecutionAgent batched output:")
+    print(json.dumps(results, indent=2))
+
 if __name__ == "__main__":
     test_execution()
+    test_execution_batch()
@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for hierarchical blueprint generation, with a stubbed LLM.
+
+Checks that expanded activities are merged into ``levels`` in tree order,
+that activities are expanded concurrently, that one failing activity does
+not discard the others, and that a JSON array where an object was asked for
+is treated like malformed JSON.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # the client is created on import; no call is made
+
+import backend.agents.openai.func_decomp_agent as func_decomp
+from backend.agents.openai.func_decomp_agent import FuncArchAgent
+from backend.blueprints.store import BlueprintStore
+from backend.blueprints.taxonomy import get_taxonomy_index
+
+class _StubLLM:
+    """Answers outline and expansion prompts; ``broken`` activities always get a JSON array."""
+
+    def __init__(self, broken=(), outline=None):
+        self.broken = set(broken)
+        self.outline = outline
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        if 'top-level key "function"' in prompt:
+            answer = self.outline if self.outline is not None else {"function": {
+                "name": "Marketing", "subitems": [
+                    {"name": f"P{p}", "subitems": [{"name": f"A{p}.{a}"} for a in (1, 2)]} for p in (1, 2)
+                ]}}
+        else:
+            activity = json.loads(re.search(r"into L3 tasks and L4 subtasks:\n(.*)\n", prompt).group(1))["name"]
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.05)
+            with self.lock:
+                self.active -= 1
+            answer = ([] if activity in self.broken else
+                      {"items": [{"name": f"T {activity}", "subitems": [{"name": f"S {activity}"}]}]})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))])
+
+@contextmanager
+def _llm(stub):
+    real = func_decomp.chat_completion
+    func_decomp.chat_completion = stub
+    try:
+        yield stub
+    finally:
+        func_decomp.chat_completion = real
+
+def _agent(storage_dir):
+    agent = FuncArchAgent.__new__(FuncArchAgent)
+    agent.store = BlueprintStore(storage_dir)
+    agent.taxonomy = get_taxonomy_index()
+    return agent
+
+def test_merge_and_concurrency():
+    with _llm(_StubLLM()) as llm, tempfile.TemporaryDirectory() as storage_dir:
+        blueprint = _agent(storage_dir).generate("Marketing", "APQC", "agency", mode="hierarchical")
+    levels = blueprint.to_dict()["levels"]
+    assert [t["name"] for t in levels["L3"]] == ["T A1.1", "T A1.2", "T A2.1", "T A2.2"]
+    assert [s["name"] for s in levels["L4"]] == ["S A1.1", "S A1.2", "S A2.1", "S A2.2"]
+    assert levels["L2"][3]["subitems"][0]["name"] == "T A2.2"
+    assert llm.max_active > 1
+    assert "incomplete" not in blueprint.extra
+
+def test_failed_branch_keeps_the_rest():
+    with _llm(_StubLLM(broken={"A1.2"})), tempfile.TemporaryDirectory() as storage_dir:
+        agent = _agent(storage_dir)
+        blueprint = agent.generate("Marketing", "APQC", "agency", mode="hierarchical")
+        levels = blueprint.to_dict()["levels"]
+        assert [t["name"] for t in levels["L3"]] == ["T A1.1", "T A2.1", "T A2.2"]
+        assert "JSON object" in levels["L2"][1]["expansion_error"]
+        assert blueprint.extra["incomplete"] == ["A1.2"]
+
+        # Served once, regenerated on the next request
+        agent.decompose_blueprint("Marketing", "APQC", "agency", mode="hierarchical", use_taxonomy=False)
+        func_decomp.chat_completion = _StubLLM()  # restored by _llm
+        again = agent.decompose_blueprint("Marketing", "APQC", "agency", mode="hierarchical", use_taxonomy=False)
+        assert "incomplete" not in again.extra and len(again.level("L3")) == 4
+
+def test_array_answers_are_malformed():
+    with _llm(_StubLLM(broken={"A1.1", "A1.2", "A2.1", "A2.2"})) as broken, \
+            tempfile.TemporaryDirectory() as storage_dir:
+        agent = _agent(storage_dir)
+        for llm in (broken, _StubLLM(outline=[{"name": "Marketing"}])):
+            func_decomp.chat_completion = llm
+            try:
+                agent.generate("Marketing", "APQC", "agency", mode="hierarchical")
+                assert False, "malformed answer accepted"
+            except RuntimeError:
+                pass
+
+if __name__ == "__main__":
+    test_merge_and_concurrency()
+    test_failed_branch_keeps_the_rest()
+    test_array_answers_are_malformed()
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Vamsi Duvvuri
+
+"""
+Test script for the HTTP compression and caching middleware.
+
+Checks Accept-Encoding negotiation, ETags with 304 answers (also for the
+weak tag of a compressed response), and that the API's per-route
+Cache-Control policies leave per-agent routes and error responses
+uncacheable.
+"""
+
+import os
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("OPENAI_API_KEY", "test")  # agent modules create the client on import; no call is made
+
+from backend.main import CACHE_POLICIES
+from backend.utils.http_cache import CompressionMiddleware, negotiate_encoding
+
+BIG = {"rows": [{"id": i, "name": f"campaign {i}"} for i in range(200)]}
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, cache_policies=CACHE_POLICIES)
+
+    @app.get("/api/agents")
+    async def agents():
+        return BIG
+
+    @app.get("/api/agents/{agent_id}/logs")
+    async def logs(agent_id: str):
+        if agent_id != "director":
+            raise HTTPException(status_code=404, detail="Agent not found")
+        return {"entries": ["started"]}
+
+    @app.get("/api/analytics/overview")
+    async def overview():
+        return {"impressions": 1}
+
+    @app.get("/api/campaigns")
+    async def campaigns():
+        return {"campaigns": []}
+
+    return TestClient(app)
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.2", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("br, gzip", ("br", "gzip")) == "br"  # ties go to server order
+    assert negotiate_encoding("*", ("gzip",)) == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("gzip;q=oops") is None
+
+def test_etags_and_304():
+    client = _client()
+    small = client.get("/api/campaigns", headers={"Accept-Encoding": "identity"})
+    etag = small.headers["etag"]
+    assert not etag.startswith("W/")
+    again = client.get("/api/campaigns", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+
+    # Compressed: same content, different bytes, so the tag is weak; either form revalidates
+    big = client.get("/api/agents", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip" and big.json() == BIG
+    weak = big.headers["etag"]
+    assert weak.startswith("W/") and "Accept-Encoding" in big.headers["vary"]
+    for tag in (weak, weak[2:], f'"other", {weak}'):
+        revalidated = client.get("/api/agents", headers={"Accept-Encoding": "gzip", "If-None-Match": tag})
+        assert revalidated.status_code == 304, tag
+        assert revalidated.headers["cache-control"] == "private, max-age=30"
+    plain = client.get("/api/agents", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == weak[2:]
+
+def test_cache_policies_per_route():
+    client = _client()
+    assert client.get("/api/agents").headers["cache-control"] == "private, max-age=30"
+    assert client.get("/api/agents/director/logs").headers["cache-control"] == "no-cache"
+    assert client.get("/api/analytics/overview").headers["cache-control"] == "private, max-age=5"
+    assert client.get("/api/campaigns").headers["cache-control"] == "no-cache"
+
+    missing = client.get("/api/agents/nobody/logs")
+    assert missing.status_code == 404 and "cache-control" not in missing.headers
+
+if __name__ == "__main__":
+    test_negotiate_encoding()
+    test_etags_and_304()
+    test_cache_policies_per_route()
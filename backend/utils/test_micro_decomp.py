@@ -17,5 +17,22 @@ def test_micro():
     print("MicroDecompAgent subtasks:")
     print(json.dumps(result, indent=2))
 
+def test_micro_batch():
+    agent = MicroDecompAgent()
+    tasks = [
+        {"name": "Develop creative brief", "role": "Creative Director",
+         "tools": ["Google Docs", "Brand Guidelines"], "deliverable": "Creative brief document",
+         "time_estimate": "2 days"},
+        {"name": "Set up campaign tracking", "role": "Analytics Lead",
+         "tools": ["Google Analytics", "Tag Manager"], "deliverable": "Tracking plan",
+         "time_estimate": "1 day"},
+    ]
+    results = agent.run_batch(tasks)
+    assert len(results) == len(tasks)
+    assert all(r["subtasks"] for r in results)
+    print("MicroDecompAgent batched subtasks:")
+    print(json.dumps(results, indent=2))
+
 if __name__ == "__main__":
     test_micro()
+    test_micro_batch()